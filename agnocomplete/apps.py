@@ -2,10 +2,11 @@
 Django app definition.
 
 The :class:`AgnocompleteConfig` class should start the agnocomplete
-autodiscover.
+autodiscover, or load the lazy registry manifest.
 """
 
 from django.apps import AppConfig
+from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +20,30 @@ class AgnocompleteConfig(AppConfig):
 
     def ready(self):
         """
-        Initialize the autodiscover when ready
+        Initialize the autodiscover when ready, and freeze the registry
+
+        If the ``AGNOCOMPLETE_REGISTRY_MANIFEST`` setting is set, the classes
+        listed in the manifest are imported on first use instead, and their
+        result cache invalidation signals are connected right away.
         """
         from . import autodiscover
-        autodiscover()
+        from .cache import connect_lazy_cache_invalidation
+        from .constants import AGNOCOMPLETE_REGISTRY_MANIFEST
+        from .register import get_agnocomplete_registry
+        from .register import load_registry_manifest
+        registry = get_agnocomplete_registry()
+        path = getattr(
+            settings, 'AGNOCOMPLETE_REGISTRY_MANIFEST',
+            AGNOCOMPLETE_REGISTRY_MANIFEST)
+        manifest = load_registry_manifest(path) if path else None
+        if manifest is None:
+            if path:
+                logger.warning(
+                    "The agnocomplete registry manifest `%s` doesn't exist, "
+                    "falling back to the autodiscover", path)
+            autodiscover()
+        else:
+            registry.add_lazy(manifest.get('classes', {}))
+            for slug, labels in manifest.get('cache_invalidation', {}).items():
+                connect_lazy_cache_invalidation(slug, labels)
+        registry.freeze()
@@ -0,0 +1,205 @@
+"""
+Agnocomplete result cache
+"""
+from collections import OrderedDict
+from threading import Lock
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.db.models.signals import post_save, post_delete
+
+from .constants import AGNOCOMPLETE_CACHE_LRU_MAXSIZE
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    In-process, thread-safe, size-bounded cache.
+
+    It implements the subset of the Django cache API used by agnocomplete
+    (``get``, ``set``, ``add``, ``delete``, ``clear``). When the cache is full,
+    the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = getattr(
+                settings, 'AGNOCOMPLETE_CACHE_LRU_MAXSIZE',
+                AGNOCOMPLETE_CACHE_LRU_MAXSIZE)
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _expiry(self, timeout):
+        if timeout is None:
+            return None
+        return time.monotonic() + timeout
+
+    def _get(self, key):
+        """
+        Return the (value, expiry) pair if the key exists and is not expired.
+
+        The lock must be held by the caller.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expiry = entry
+        if expiry is not None and expiry <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _set(self, key, value, timeout):
+        """
+        Store the value and evict the oldest entries if needed.
+
+        The lock must be held by the caller.
+        """
+        self._data[key] = (value, self._expiry(timeout))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._get(key)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            self._set(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        """
+        Store the value only if the key doesn't exist yet.
+
+        Return True if the value has been stored.
+        """
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._set(key, value, timeout)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Process-wide fallback cache
+_lru_cache = None
+_lru_cache_lock = Lock()
+
+
+def get_lru_cache():
+    """
+    Return the process-wide in-memory LRU cache.
+    """
+    global _lru_cache
+    if _lru_cache is None:
+        with _lru_cache_lock:
+            if _lru_cache is None:
+                _lru_cache = LRUCache()
+    return _lru_cache
+
+
+def get_cache(backend):
+    """
+    Return the cache object matching the ``backend`` argument.
+
+    * ``None`` means that the cache is disabled,
+    * a string is a Django cache alias (from the ``CACHES`` setting). If this
+      alias is not configured, the in-process LRU cache is used instead,
+    * any other object is considered as a cache object.
+    """
+    if backend is None:
+        return None
+    if isinstance(backend, str):
+        try:
+            return caches[backend]
+        except InvalidCacheBackendError:
+            logger.warning(
+                "Unknown cache alias `%s`, falling back to the in-process"
+                " LRU cache", backend)
+            return get_lru_cache()
+    return backend
+
+
+# Models watched by connect_cache_invalidation(), by class
+_cache_invalidation_models = {}
+
+
+def connect_cache_invalidation(klass, *models):
+    """
+    Invalidate the ``klass`` result cache each time an instance of one of the
+    ``models`` is saved or deleted.
+
+    If no model is given, the ``klass.model`` property is used.
+
+    Example::
+
+        connect_cache_invalidation(AutocompletePerson)
+        connect_cache_invalidation(AutocompletePersonTags, Person, Tag)
+
+    """
+    models = models or (klass.model,)
+
+    def invalidate(sender, **kwargs):
+        klass.invalidate_cache()
+
+    for model in models:
+        _connect_invalidation(invalidate, klass.slug, model)
+        _cache_invalidation_models.setdefault(klass, set()).add(
+            model._meta.label_lower)
+    return klass
+
+
+def get_cache_invalidation_models(klass):
+    """
+    Return the labels of the models invalidating the ``klass`` result cache,
+    as connected by :func:`connect_cache_invalidation`.
+    """
+    return sorted(_cache_invalidation_models.get(klass, ()))
+
+
+def connect_lazy_cache_invalidation(slug, labels):
+    """
+    Invalidate the result cache of the registered class ``slug`` each time an
+    instance of one of the models ``labels`` is saved or deleted.
+
+    Used by the lazy registry: the class is only imported when one of these
+    models changes.
+    """
+    from .register import get_agnocomplete_registry
+
+    def invalidate(sender, **kwargs):
+        get_agnocomplete_registry()[slug].invalidate_cache()
+
+    for label in labels:
+        _connect_invalidation(invalidate, slug, apps.get_model(label))
+
+
+def _connect_invalidation(invalidate, slug, model):
+    # Same dispatch_uid: a handler is connected once per class and model
+    dispatch_uid = 'agnocomplete-cache-{}-{}'.format(
+        slug, model._meta.label_lower)
+    post_save.connect(
+        invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(
+        invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
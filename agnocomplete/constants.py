@@ -22,3 +22,72 @@ AGNOCOMPLETE_DATA_ATTRIBUTE = 'agnocomplete'
 
 "The context attribute name given to fields"
 AGNOCOMPLETE_USER_ATTRIBUTE = '__user'
+
+"Agnocomplete default result cache timeout, in seconds"
+AGNOCOMPLETE_CACHE_TIMEOUT = 300
+
+"Agnocomplete in-process LRU cache maximum number of entries"
+AGNOCOMPLETE_CACHE_LRU_MAXSIZE = 1024
+
+"URL proxies: number of connection pools (i.e. hosts) to cache"
+AGNOCOMPLETE_HTTP_POOL_CONNECTIONS = 10
+
+"URL proxies: maximum number of connections to keep alive per host"
+AGNOCOMPLETE_HTTP_POOL_MAXSIZE = 10
+
+"URL proxies: maximum number of retries for each HTTP call"
+AGNOCOMPLETE_HTTP_MAX_RETRIES = 0
+
+"Instrumentation: dotted paths of the metrics sinks"
+AGNOCOMPLETE_METRICS_SINKS = ()
+
+"Instrumentation: add the Server-Timing header, disabled by default"
+AGNOCOMPLETE_SERVER_TIMING = False
+
+"URL proxies: maximum number of concurrent item calls in selected()"
+AGNOCOMPLETE_SELECTED_CONCURRENCY = 4
+
+"Agnocomplete default search backend for model-based classes"
+AGNOCOMPLETE_SEARCH_BACKEND = 'agnocomplete.search.QSearchBackend'
+
+"Agnocomplete request coalescing (single-flight), disabled by default"
+AGNOCOMPLETE_SINGLE_FLIGHT = False
+
+"Maximum time to wait for a cross-process in-flight request, in seconds"
+AGNOCOMPLETE_SINGLE_FLIGHT_TIMEOUT = 10
+
+"Cache coalescing the requests across processes (current process if unset)"
+AGNOCOMPLETE_SINGLE_FLIGHT_CACHE = None
+
+"Incremental narrowing: maximum number of candidates remembered per query"
+AGNOCOMPLETE_NARROWING_THRESHOLD = 200
+
+"Incremental narrowing: maximum number of remembered queries"
+AGNOCOMPLETE_NARROWING_MAXSIZE = 256
+
+"Incremental narrowing: lifetime of the remembered candidates, in seconds"
+AGNOCOMPLETE_NARROWING_TIMEOUT = 30
+
+"Model fields: maximum number of choices rendered when iterating them"
+AGNOCOMPLETE_CHOICES_ITERATION_LIMIT = 0
+
+"Stream the JSON payload of the views, disabled by default"
+AGNOCOMPLETE_STREAMING = False
+
+"Number of items per chunk of the streamed JSON payload"
+AGNOCOMPLETE_STREAMING_CHUNK_SIZE = 100
+
+"JSON encoder of the views"
+AGNOCOMPLETE_JSON_ENCODER = 'agnocomplete.encoders.DjangoEncoder'
+
+"Client-side manifests: use the prebuilt static files instead of the view"
+AGNOCOMPLETE_MANIFEST_STATIC = False
+
+"Client-side manifests: max-age of the manifest view responses, in seconds"
+AGNOCOMPLETE_MANIFEST_MAX_AGE = 31536000
+
+"Client-side manifests: output directory of the static manifest files"
+AGNOCOMPLETE_MANIFEST_ROOT = None
+
+"Lazy registry: path of the registry manifest (autodiscover if unset)"
+AGNOCOMPLETE_REGISTRY_MANIFEST = None
@@ -2,27 +2,85 @@
 The different agnocomplete classes to be discovered
 """
 from copy import copy
+from functools import lru_cache, partial, reduce
+import operator
 from abc import abstractmethod, ABCMeta
+from contextlib import nullcontext
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+from uuid import uuid4
 import logging
 
-from django.db.models import Q
-from django.core.exceptions import ImproperlyConfigured
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Case, IntegerField, Model, Q, QuerySet
+from django.db.models import Value, When
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import NoReverseMatch, reverse
 from django.utils.encoding import force_str as text
+from django.utils.translation import get_language
 from django.conf import settings
 import requests
+from requests.adapters import HTTPAdapter
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
 
+from . import get_namespace
 from .constants import AGNOCOMPLETE_DEFAULT_PAGESIZE
 from .constants import AGNOCOMPLETE_MIN_PAGESIZE
 from .constants import AGNOCOMPLETE_MAX_PAGESIZE
 from .constants import AGNOCOMPLETE_DEFAULT_QUERYSIZE
 from .constants import AGNOCOMPLETE_MIN_QUERYSIZE
+from .constants import AGNOCOMPLETE_CACHE_TIMEOUT
+from .constants import AGNOCOMPLETE_HTTP_POOL_CONNECTIONS
+from .constants import AGNOCOMPLETE_HTTP_POOL_MAXSIZE
+from .constants import AGNOCOMPLETE_HTTP_MAX_RETRIES
+from .constants import AGNOCOMPLETE_SELECTED_CONCURRENCY
+from .constants import AGNOCOMPLETE_SEARCH_BACKEND
+from .constants import AGNOCOMPLETE_SINGLE_FLIGHT
+from .constants import AGNOCOMPLETE_SINGLE_FLIGHT_TIMEOUT
+from .constants import AGNOCOMPLETE_SINGLE_FLIGHT_CACHE
+from .constants import AGNOCOMPLETE_NARROWING_THRESHOLD
+from .constants import AGNOCOMPLETE_NARROWING_TIMEOUT
+from .cache import get_cache
+from .singleflight import CacheSingleFlight, get_single_flight_group
+from .singleflight import get_async_single_flight_group
 from .exceptions import AuthenticationRequiredAgnocompleteException
 from .exceptions import SkipItem
 from .exceptions import ItemNotFound
+from .index import ChoicesIndex
+from .memo import get_selected_memo, memoize_selected
+from .pagination import InvalidCursor, get_keyset_filter
+from .pagination import decode_cursor, encode_cursor, normalize_position
+from .narrowing import NARROWING_LOOKUPS, CandidateSet
+from .narrowing import get_narrowing_cache
+from .search import QSearchBackend, get_search_backend, split_field_name
+from .plan import get_query_plan
 
 
 logger = logging.getLogger(__name__)
 
+# Protects the HTTP session creation of the URL proxies
+_http_session_lock = Lock()
+
+
+async def _close_on_shutdown(client):
+    """
+    Asynchronous generator closing the HTTP client when it's finalized by the
+    event loop.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
 
 class ClassPropertyDescriptor:
     """
@@ -77,9 +135,12 @@ def classproperty(func):
     return ClassPropertyDescriptor(func)
 
 
+@lru_cache(maxsize=None)
 def load_settings_sizes():
     """
     Load sizes from settings or fallback to the module constants
+
+    The result is cached, until one of the settings is changed.
     """
     page_size = AGNOCOMPLETE_DEFAULT_PAGESIZE
     settings_page_size = getattr(
@@ -113,6 +174,12 @@ def load_settings_sizes():
     )
 
 
+@receiver(setting_changed)
+def reset_settings_sizes(setting, **kwargs):
+    if setting.startswith('AGNOCOMPLETE_'):
+        load_settings_sizes.cache_clear()
+
+
 class AgnocompleteBase(metaclass=ABCMeta):
     """
     Base class for Agnocomplete tools.
@@ -126,7 +193,32 @@ class AgnocompleteBase(metaclass=ABCMeta):
     query_size_min = None
     url = None
 
-    def __init__(self, user=None, page_size=None, url=None):
+    # Result cache: disabled by default
+    cache_backend = None
+    cache_timeout = None
+    cache_key_extra = None
+    cache_per_user = False
+
+    # Coalesce identical concurrent requests, fallback to settings if unset.
+    # `single_flight_cache` is a cache to coalesce them across processes.
+    single_flight = None
+    single_flight_cache = None
+
+    # Set to False if the synchronous methods used by the asynchronous ones
+    # (e.g. ``item()`` or ``label()``) can't run in an event loop.
+    async_native = True
+
+    # Phase timings, set by the views (see :mod:`agnocomplete.instrumentation`)
+    timings = None
+
+    # HTTP caching: max-age of the responses (no cache headers if None),
+    # whether they depend on the user (default: if the class does) and if
+    # shared caches may store them (default: if they don't depend on the user)
+    http_cache_max_age = None
+    vary_on_user = None
+    http_cache_public = None
+
+    def __init__(self, user=None, page_size=None, url=None, cursor=None):
         # Loading the user context
         self.user = user
 
@@ -154,9 +246,70 @@ class AgnocompleteBase(metaclass=ABCMeta):
         # Eventual custom URL
         self._url = url
 
+        # Cursor pagination: the requested page, and the one after it
+        self._cursor = cursor or None
+        self.next_cursor = None
+
+    def __copy__(self):
+        """
+        Return a copy sharing the configuration, without the request state
+        (cursors and timings).
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._cursor = None
+        clone.next_cursor = None
+        clone.__dict__.pop('timings', None)
+        return clone
+
+    def __deepcopy__(self, memo):
+        # The configuration isn't modified after the instantiation, there's
+        # no need to copy it.
+        return self.__copy__()
+
     def set_agnocomplete_field(self, field):
         self.agnocomplete_field = field
 
+    @classmethod
+    def compile(cls):
+        """
+        Precompute and validate what can be, once per class.
+
+        It's called by :func:`agnocomplete.register.register`, so
+        misconfigured classes fail at startup.
+        """
+        pass
+
+    @classmethod
+    def get_metadata(cls):
+        """
+        Return the description of the class, served by the catalog view.
+
+        It's computed once by the registry, see
+        :class:`agnocomplete.register.AgnocompleteRegistry`.
+        """
+        page_size, page_size_min, page_size_max, query_size, \
+            query_size_min = load_settings_sizes()
+        url = cls.url
+        if not url:
+            try:
+                url = reverse(
+                    '{}:agnocomplete'.format(get_namespace()),
+                    args=[cls.slug])
+            except NoReverseMatch:
+                url = None
+        return {
+            'kind': None,
+            'page_size': cls.page_size or page_size,
+            'page_size_min': cls.page_size_min or page_size_min,
+            'page_size_max': cls.page_size_max or page_size_max,
+            'query_size': cls.query_size or query_size,
+            'query_size_min': cls.query_size_min or query_size_min,
+            'requires_authentication': bool(
+                getattr(cls, 'requires_authentication', False)),
+            'url': text(url) if url else None,
+        }
+
     @classproperty
     def slug(cls):
         """
@@ -183,6 +336,28 @@ class AgnocompleteBase(metaclass=ABCMeta):
         """
         return self._page_size
 
+    def get_cursor(self):
+        """
+        Return the position decoded from the cursor, or None if the first
+        page is requested.
+
+        An :class:`agnocomplete.pagination.InvalidCursor` exception is raised
+        if the cursor is invalid.
+        """
+        if self._cursor is None:
+            return None
+        return decode_cursor(self._cursor)
+
+    def set_next_cursor(self, position):
+        """
+        Set the cursor of the next page, from the position of the last item
+        of the current page. ``None`` means that there's no next page.
+        """
+        if position is None:
+            self.next_cursor = None
+        else:
+            self.next_cursor = encode_cursor(position)
+
     def get_query_size(self):
         """
         Return the computed default query size
@@ -222,6 +397,26 @@ class AgnocompleteBase(metaclass=ABCMeta):
         """
         pass
 
+    def get_selected_prefetch_key(self):
+        """
+        Return the key grouping the instances whose selected values may be
+        resolved by a single :meth:`selected()` call, or None to resolve
+        them one by one.
+
+        See :class:`agnocomplete.forms.SelectedPrefetcher`.
+        """
+        return (self.__class__, getattr(self.user, 'pk', None))
+
+    def timing(self, phase):
+        """
+        Return a context manager measuring the duration of the given phase.
+
+        It does nothing if the instance is not instrumented.
+        """
+        if self.timings is None:
+            return nullcontext()
+        return self.timings.phase(phase)
+
     def is_valid_query(self, query):
         """
         Return True if the search query is valid.
@@ -238,6 +433,326 @@ class AgnocompleteBase(metaclass=ABCMeta):
             return False
         return True
 
+    @classmethod
+    def get_cache(cls):
+        """
+        Return the result cache object, or None if the cache is disabled.
+
+        ``cache_backend`` can be a Django cache alias or a cache object, like
+        an instance of :class:`agnocomplete.cache.LRUCache`.
+        """
+        return get_cache(cls.cache_backend)
+
+    def get_cache_timeout(self):
+        """
+        Return the result cache timeout, in seconds.
+        """
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(
+            settings, 'AGNOCOMPLETE_CACHE_TIMEOUT',
+            AGNOCOMPLETE_CACHE_TIMEOUT)
+
+    def get_cache_key_extra(self):
+        """
+        Return an extra value to be added to the result cache key.
+
+        By default, it returns the ``cache_key_extra`` property.
+        """
+        return self.cache_key_extra
+
+    def is_user_dependent(self):
+        """
+        Return True if the results depend on the user context.
+        """
+        return bool(
+            self.cache_per_user
+            or getattr(self, 'requires_authentication', False)
+        )
+
+    def normalize_cache_query(self, query):
+        """
+        Return the query as it should be used in the result cache key.
+
+        By default, it returns the query verbatim. You may override this if
+        your search is case-insensitive, for example.
+        """
+        return query
+
+    @classmethod
+    def _get_cache_generation(cls, cache):
+        """
+        Return the current cache generation token of this class.
+
+        Every cache key includes this token, so changing it invalidates every
+        cached result of the class at once.
+        """
+        key = 'agnocomplete:{}:generation'.format(cls.slug)
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, uuid4().hex, None)
+            generation = cache.get(key)
+        return generation
+
+    @classmethod
+    def invalidate_cache(cls):
+        """
+        Invalidate every cached result of this class.
+        """
+        cache = cls.get_cache()
+        if cache is not None:
+            key = 'agnocomplete:{}:generation'.format(cls.slug)
+            cache.set(key, uuid4().hex, None)
+
+    def get_request_signature(self, query, **kwargs):
+        """
+        Return a hash identifying the items of this query, or None if they
+        depend on a user that can't be identified.
+        """
+        user_key = None
+        if self.is_user_dependent():
+            user_key = getattr(self.user, 'pk', None)
+            # No user identifier, no signature
+            if user_key is None:
+                return None
+        signature = repr((
+            self.normalize_cache_query(query),
+            self.get_page_size(),
+            self._cursor,
+            sorted(kwargs.items()),
+            user_key,
+            self.get_cache_key_extra(),
+        ))
+        return sha1(signature.encode('utf-8')).hexdigest()
+
+    def get_cache_key(self, query, **kwargs):
+        """
+        Return the result cache key for this query, or None if the result
+        should not be cached.
+        """
+        signature = self.get_request_signature(query, **kwargs)
+        if signature is None:
+            return None
+        return 'agnocomplete:{}:{}:{}'.format(
+            self.slug,
+            self._get_cache_generation(self.get_cache()),
+            signature,
+        )
+
+    def is_vary_on_user(self):
+        """
+        Return True if the HTTP responses depend on the user.
+        """
+        if self.vary_on_user is not None:
+            return self.vary_on_user
+        return self.is_user_dependent()
+
+    def get_http_cache_control(self):
+        """
+        Return the ``Cache-Control`` directives of the HTTP responses, as a
+        dictionary, or None if they should not be cached.
+        """
+        if self.http_cache_max_age is None:
+            return None
+        public = self.http_cache_public
+        if public is None:
+            public = not self.is_vary_on_user()
+        if public:
+            return {'public': True, 'max_age': self.http_cache_max_age}
+        return {'private': True, 'max_age': self.http_cache_max_age}
+
+    def get_content_version(self):
+        """
+        Return a token that changes whenever the items may change, or None if
+        it's unknown.
+
+        By default, it's the result cache generation, if the cache is enabled
+        (see :meth:`invalidate_cache`).
+        """
+        cache = self.get_cache()
+        if cache is None:
+            return None
+        return self._get_cache_generation(cache)
+
+    def get_etag(self, query, **kwargs):
+        """
+        Return the ETag of the items of this query, or None if it can't be
+        computed without fetching the items.
+        """
+        version = self.get_content_version()
+        if version is None:
+            return None
+        signature = self.get_request_signature(query, **kwargs)
+        if signature is None:
+            return None
+        user_key = None
+        if self.is_vary_on_user():
+            user_key = getattr(self.user, 'pk', None)
+        signature = '{}:{}:{}'.format(version, signature, user_key)
+        return sha1(signature.encode('utf-8')).hexdigest()
+
+    def is_single_flight(self):
+        """
+        Return True if identical concurrent requests should be coalesced.
+
+        User-dependent requests are never coalesced.
+        """
+        enabled = self.single_flight
+        if enabled is None:
+            enabled = getattr(
+                settings, 'AGNOCOMPLETE_SINGLE_FLIGHT',
+                AGNOCOMPLETE_SINGLE_FLIGHT)
+        return bool(enabled) and not self.is_user_dependent()
+
+    def get_single_flight_cache(self):
+        """
+        Return the cache used to coalesce requests across processes, or None
+        to coalesce them in the current process only.
+        """
+        backend = self.single_flight_cache
+        if backend is None:
+            backend = getattr(
+                settings, 'AGNOCOMPLETE_SINGLE_FLIGHT_CACHE',
+                AGNOCOMPLETE_SINGLE_FLIGHT_CACHE)
+        return get_cache(backend)
+
+    def get_single_flight_timeout(self):
+        """
+        Return the maximum time, in seconds, to wait for the cross-process
+        in-flight computation.
+        """
+        return getattr(
+            settings, 'AGNOCOMPLETE_SINGLE_FLIGHT_TIMEOUT',
+            AGNOCOMPLETE_SINGLE_FLIGHT_TIMEOUT)
+
+    def get_single_flight_key(self, query, **kwargs):
+        return 'agnocomplete:{}:flight:{}'.format(
+            self.slug, self.get_request_signature(query, **kwargs))
+
+    def compute_items(self, query=None, **kwargs):
+        """
+        Return the items, sharing the computation with the identical
+        concurrent requests if the single-flight is enabled.
+        """
+        if not self.is_single_flight() or not self.is_valid_query(query):
+            return self.items(query=query, **kwargs)
+        key = self.get_single_flight_key(query, **kwargs)
+
+        def compute():
+            # The next cursor is shared along with the items
+            return self.items(query=query, **kwargs), self.next_cursor
+
+        func = compute
+        cache = self.get_single_flight_cache()
+        if cache is not None:
+            flight = CacheSingleFlight(cache, self.get_single_flight_timeout())
+            func = partial(flight.do, key, compute)
+        result, self.next_cursor = get_single_flight_group().do(key, func)
+        return result
+
+    async def acompute_items(self, query=None, **kwargs):
+        """
+        Asynchronous version of :meth:`compute_items`.
+
+        Requests are coalesced within the running event loop.
+        """
+        if not self.is_single_flight() or not self.is_valid_query(query):
+            return await self.aitems(query=query, **kwargs)
+        key = await sync_to_async(self.get_single_flight_key)(
+            query, **kwargs)
+
+        async def compute():
+            return await self.aitems(query=query, **kwargs), self.next_cursor
+
+        group = get_async_single_flight_group()
+        result, self.next_cursor = await group.do(key, compute)
+        return result
+
+    def fetch_items(self, query=None, **kwargs):
+        """
+        Return the items to be sent to the client, using the result cache if
+        it's enabled.
+
+        This is the method the views are calling.
+        """
+        cache = self.get_cache()
+        if cache is None or not self.is_valid_query(query):
+            return self.compute_items(query=query, **kwargs)
+        key = self.get_cache_key(query, **kwargs)
+        if key is None:
+            return self.compute_items(query=query, **kwargs)
+        with self.timing('cache'):
+            cached = cache.get(key)
+        self._set_cache_hit(cached is not None)
+        if cached is not None:
+            # The next cursor is cached along with the items
+            result, self.next_cursor = cached
+            return result
+        result = self.compute_items(query=query, **kwargs)
+        with self.timing('cache'):
+            cache.set(
+                key, (result, self.next_cursor), self.get_cache_timeout())
+        return result
+
+    def iter_items(self, query=None, **kwargs):
+        """
+        Return an iterator over the items to be sent to the client.
+
+        This is the method the streaming views are calling. By default, the
+        items are fetched at once, using :meth:`fetch_items`.
+        """
+        return iter(self.fetch_items(query=query, **kwargs))
+
+    def _set_cache_hit(self, hit):
+        if self.timings is not None:
+            self.timings.cache_hit = hit
+
+    def _overrides(self, name, klass):
+        """
+        Return True if the method ``name`` of ``klass`` is overridden in the
+        current class.
+        """
+        return getattr(type(self), name) is not getattr(klass, name)
+
+    async def aitems(self, query=None, **kwargs):
+        """
+        Asynchronous version of :meth:`items`.
+
+        By default, the synchronous :meth:`items` method is run in a thread.
+        """
+        return await sync_to_async(self.items)(query=query, **kwargs)
+
+    async def aselected(self, ids):
+        """
+        Asynchronous version of :meth:`selected`.
+
+        By default, the synchronous :meth:`selected` method is run in a
+        thread.
+        """
+        return await sync_to_async(self.selected)(ids)
+
+    async def afetch_items(self, query=None, **kwargs):
+        """
+        Asynchronous version of :meth:`fetch_items`.
+        """
+        cache = self.get_cache()
+        if cache is None or not self.is_valid_query(query):
+            return await self.acompute_items(query=query, **kwargs)
+        key = await sync_to_async(self.get_cache_key)(query, **kwargs)
+        if key is None:
+            return await self.acompute_items(query=query, **kwargs)
+        with self.timing('cache'):
+            cached = await sync_to_async(cache.get)(key)
+        self._set_cache_hit(cached is not None)
+        if cached is not None:
+            result, self.next_cursor = cached
+            return result
+        result = await self.acompute_items(query=query, **kwargs)
+        with self.timing('cache'):
+            await sync_to_async(cache.set)(
+                key, (result, self.next_cursor), self.get_cache_timeout())
+        return result
+
 
 class AgnocompleteChoices(AgnocompleteBase):
     """
@@ -252,35 +767,81 @@ class AgnocompleteChoices(AgnocompleteBase):
 
     """
     choices = ()
+    # Send the whole choices list to the browser, in a manifest
+    client_side = False
 
     def get_choices(self):
         return self.choices
 
+    def get_manifest_items(self):
+        """
+        Return every item, for the client-side manifest.
+        """
+        return [self.item(item) for item in self.get_choices()]
+
     def item(self, current_item):
         value, label = current_item
         return dict(value=value, label=label)
 
+    def get_content_version(self):
+        """
+        Return the hash of the choices, computed once along with their index.
+        """
+        return self.get_choices_index().content_hash
+
+    def get_choices_index(self):
+        """
+        Return the prefix index built over the choices.
+
+        The index is built once, on first use, and stored on the class. If
+        the choices are overridden on the instance, the index is stored on
+        the instance instead. Lazy labels get one index per language.
+        """
+        choices = self.choices
+        owner = self if 'choices' in vars(self) else type(self)
+        indexes = vars(owner).get('_choices_indexes', {})
+        index = indexes.get(None) or indexes.get(get_language())
+        if index is not None and not index.is_valid_for(choices):
+            # The choices have changed, every language is stale
+            indexes, index = {}, None
+        if index is None:
+            index = ChoicesIndex(choices)
+            indexes[index.language] = index
+            setattr(owner, '_choices_indexes', indexes)
+        return index
+
     def items(self, query=None, **kwargs):
         if not self.is_valid_query(query):
             return []
 
-        result = copy(self.choices)
-        if query:
-            result = filter(lambda x: x[1].lower().startswith(query), result)
-            result = tuple(result)
-
-        # Slicing before rendering
-        result = result[:self.get_page_size()]
-        return [self.item(item) for item in result]
+        page_size = self.get_page_size()
+        after = self.get_cursor()
+        if after is not None and not isinstance(after, int):
+            raise InvalidCursor("Invalid cursor")
+        with self.timing('search'):
+            positions = self.get_choices_index().search_positions(
+                query, page_size, after=after)
+        # The cursor is the position of the last choice in the page
+        if len(positions) == page_size:
+            self.set_next_cursor(positions[-1])
+        items = self.get_choices_index().get_items(positions)
+        return [self.item(item) for item in items]
 
     def selected(self, ids):
         """
         Return the selected options as a list of tuples
         """
-        result = copy(self.choices)
-        result = filter(lambda x: x[0] in ids, result)
-        # result = ((item, item) for item in result)
-        return list(result)
+        return self.get_choices_index().selected(ids)
+
+    @classmethod
+    def get_metadata(cls):
+        metadata = super().get_metadata()
+        metadata.update(kind='choices', client_side=bool(cls.client_side))
+        return metadata
+
+    def get_selected_prefetch_key(self):
+        # Nothing to gain: the selected values are looked up in the index
+        return None
 
 
 class AgnocompleteModelBase(AgnocompleteBase, metaclass=ABCMeta):
@@ -297,6 +858,17 @@ class AgnocompleteModelBase(AgnocompleteBase, metaclass=ABCMeta):
         raise NotImplementedError(
             "Integrator: You must have a `fields` property")
 
+    @classmethod
+    def get_metadata(cls):
+        metadata = super().get_metadata()
+        fields = cls.fields
+        metadata.update(
+            kind='model',
+            model=cls.model._meta.label if cls.model else None,
+            fields=list(fields) if isinstance(fields, (list, tuple)) else None,
+        )
+        return metadata
+
     def get_model(self):
         """
         Return the class Model used by this Agnocomplete
@@ -330,6 +902,9 @@ class AgnocompleteModelBase(AgnocompleteBase, metaclass=ABCMeta):
             return self.agnocomplete_field.to_field_name or 'pk'
         return 'pk'
 
+    def get_selected_prefetch_key(self):
+        return super().get_selected_prefetch_key() + (self.get_field_name(),)
+
 
 class AgnocompleteModel(AgnocompleteModelBase):
     """
@@ -347,10 +922,33 @@ class AgnocompleteModel(AgnocompleteModelBase):
 
     """
 
+    # "Values mode": the label is built from these columns (joined using the
+    # label_separator) or this DB expression, without model instantiation.
+    label_fields = None
+    label_separator = ' '
+    label_expression = None
+    # Columns to load if the label is built from the model instance
+    only_fields = None
+    # Search backend: dotted path, class or instance
+    search_backend = None
+    # Relevance ranking: exact > prefix > word prefix > substring matches,
+    # multiplied by the optional per-field weights (default: 1)
+    ranking = False
+    field_weights = None
+    # Incremental narrowing: remember the candidates of the queries matching
+    # less than `narrowing_threshold` rows (fallback to settings if unset)
+    narrowing = False
+    narrowing_threshold = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__final_queryset = None
 
+    def __copy__(self):
+        clone = super().__copy__()
+        clone.__final_queryset = None
+        return clone
+
     def _construct_qs_filter(self, field_name):
         """
         Using a field name optionnaly prefixed by `^`, `=`, `@`, return a
@@ -366,6 +964,18 @@ class AgnocompleteModel(AgnocompleteModelBase):
         else:
             return "%s__icontains" % field_name
 
+    @classmethod
+    def get_search_backend(cls):
+        """
+        Return the search backend used to filter the queryset.
+        """
+        backend = cls.search_backend
+        if backend is None:
+            backend = getattr(
+                settings, 'AGNOCOMPLETE_SEARCH_BACKEND',
+                AGNOCOMPLETE_SEARCH_BACKEND)
+        return get_search_backend(backend)
+
     def get_queryset(self):
         if not hasattr(self, 'model') or not self.model:
             raise NotImplementedError(
@@ -374,10 +984,44 @@ class AgnocompleteModel(AgnocompleteModelBase):
             )
         return self.model.objects.all()
 
+    @classmethod
+    def compile(cls):
+        """
+        Compile the query plan of the class, validating its ``fields``
+        against its ``model``.
+
+        An ``ImproperlyConfigured`` exception is raised if a field doesn't
+        exist.
+        """
+        cls.get_query_plan()
+
+    @classmethod
+    def get_query_plan(cls):
+        """
+        Return the compiled query plan of the class.
+
+        It returns None if ``fields`` is not a list (e.g. a property), or if
+        :meth:`_construct_qs_filter` is overridden.
+        """
+        fields = cls.fields
+        if not isinstance(fields, (list, tuple)):
+            return None
+        if cls._construct_qs_filter is not \
+                AgnocompleteModel._construct_qs_filter:
+            return None
+        return get_query_plan(cls, cls.model, fields)
+
     def get_queryset_filters(self, query):
         """
         Return the filtered queryset
         """
+        # The plan is compiled from the class fields, not the instance ones
+        if 'fields' in vars(self):
+            plan = None
+        else:
+            plan = self.get_query_plan()
+        if plan is not None:
+            return plan.get_filters(query)
         conditions = Q()
         for field_name in self.fields:
             conditions |= Q(**{
@@ -406,11 +1050,217 @@ class AgnocompleteModel(AgnocompleteModelBase):
     def final_raw_queryset(self):
         return self.__final_queryset
 
+    def is_values_mode(self):
+        """
+        Return True if the items can be built from the value and label
+        columns only, without instantiating the model objects.
+
+        It's the case if the class has a ``label_fields`` or a
+        ``label_expression`` property and doesn't override the :meth:`item`
+        or :meth:`label` methods.
+        """
+        if not self.label_fields and self.label_expression is None:
+            return False
+        return not any(
+            self._overrides(name, AgnocompleteModel)
+            for name in ('item', 'label')
+        )
+
+    def get_serialized_queryset(self, queryset, cursor_fields=()):
+        """
+        Return the queryset reduced to the columns needed by the items.
+
+        In "values mode", it returns a ``values_list()`` of the value and the
+        label columns, followed by the ``cursor_fields``. Otherwise, if
+        ``only_fields`` is set, only these fields (and the value and cursor
+        fields) are loaded.
+        """
+        field_name = self.get_field_name()
+        if self.is_values_mode():
+            if self.label_expression is not None:
+                queryset = queryset.annotate(
+                    agnocomplete_label=self.label_expression)
+                return queryset.values_list(
+                    field_name, 'agnocomplete_label', *cursor_fields)
+            return queryset.values_list(
+                field_name, *self.label_fields, *cursor_fields)
+        if self.only_fields:
+            cursor_fields = [
+                name for name in cursor_fields
+                if name != 'pk' and '__' not in name
+                and name not in queryset.query.annotations
+            ]
+            return queryset.only(
+                field_name, *self.only_fields, *cursor_fields)
+        return queryset
+
+    def serialize_row(self, row):
+        """
+        Return the item for a row of the serialized queryset.
+        """
+        if not self.is_values_mode():
+            return self.item(row)
+        value, *labels = row
+        return {
+            'value': text(value),
+            'label': self.label_separator.join(
+                text(label) for label in labels if label is not None),
+        }
+
+    def get_cursor_ordering(self, queryset):
+        """
+        Return the stable ordering used by the cursor pagination: the queryset
+        ordering, with the primary key as a tie-breaker.
+
+        It returns None if the cursor pagination is not possible, i.e. if the
+        queryset is ordered using expressions.
+        """
+        query = queryset.query
+        ordering = query.order_by
+        if not ordering and query.default_ordering:
+            ordering = query.get_meta().ordering
+        if not all(isinstance(name, str) for name in ordering) \
+                or '?' in ordering:
+            return None
+        ordering = list(ordering)
+        names = {name.lstrip('-') for name in ordering}
+        if not names & {'pk', query.get_meta().pk.name}:
+            ordering.append('pk')
+        return ordering
+
+    def apply_cursor(self, queryset):
+        """
+        Order the queryset using the cursor ordering and, if a cursor has been
+        given, keep only the rows after it.
+        """
+        ordering = self.get_cursor_ordering(queryset)
+        if ordering is None:
+            if self._cursor is not None:
+                raise InvalidCursor("Cursor pagination is not available")
+            return queryset
+        queryset = queryset.order_by(*ordering)
+        values = self.get_cursor()
+        if values is None:
+            return queryset
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise InvalidCursor("Invalid cursor")
+        nullable = [
+            name.lstrip('-') for name in ordering
+            if self._is_nullable(queryset, name.lstrip('-'))
+        ]
+        features = connections[queryset.db].features
+        return queryset.filter(get_keyset_filter(
+            ordering, values, nullable, features.nulls_order_largest))
+
+    def _is_nullable(self, queryset, name):
+        """
+        Return True if the ordering field ``name`` may be NULL.
+
+        Annotations and unknown names are considered nullable.
+        """
+        if name == 'pk':
+            return False
+        model = queryset.model
+        *path, last = name.split('__')
+        try:
+            for attr in path:
+                field = model._meta.get_field(attr)
+                if field.null or not field.many_to_one:
+                    return True
+                model = field.related_model
+            field = model._meta.get_field(last)
+        except FieldDoesNotExist:
+            return True
+        return field.null or not field.concrete
+
+    def get_cursor_value(self, instance, name):
+        """
+        Return the value of the ordering field ``name`` for the instance.
+        """
+        if name == 'pk':
+            return instance.pk
+        value = instance
+        for attr in name.split('__'):
+            value = getattr(value, attr)
+        if isinstance(value, Model):
+            return value.pk
+        return value
+
+    def _get_cursor_fields(self, queryset):
+        ordering = self.get_cursor_ordering(queryset) or ()
+        return [name.lstrip('-') for name in ordering]
+
+    def _get_row_position(self, row, cursor_fields):
+        """
+        Return the cursor position of a row of the serialized queryset.
+        """
+        if not cursor_fields:
+            return None
+        if self.is_values_mode():
+            return list(row[-len(cursor_fields):])
+        return [self.get_cursor_value(row, name) for name in cursor_fields]
+
+    def _split_cursor_rows(self, rows, cursor_fields):
+        """
+        Return the serializable rows and set the next cursor, using the last
+        row of the page.
+        """
+        position = None
+        if rows:
+            position = self._get_row_position(rows[-1], cursor_fields)
+        if self.is_values_mode() and cursor_fields:
+            size = len(cursor_fields)
+            rows = [row[:-size] for row in rows]
+        if len(rows) < self.get_page_size():
+            # Incomplete page, it's the last one
+            position = None
+        self.set_next_cursor(position)
+        return rows
+
     def serialize(self, queryset):
-        result = []
-        for item in self.paginate(queryset):
-            result.append(self.item(item))
-        return result
+        cursor_fields = self._get_cursor_fields(queryset)
+        queryset = self.paginate(
+            self.get_serialized_queryset(queryset, cursor_fields))
+        with self.timing('db'):
+            rows = list(queryset)
+        with self.timing('serialize'):
+            rows = self._split_cursor_rows(rows, cursor_fields)
+            return [self.serialize_row(row) for row in rows]
+
+    def iter_serialize(self, queryset):
+        """
+        Generator version of :meth:`serialize`: the items are yielded while
+        the rows are fetched. The next cursor is set after the last one.
+        """
+        cursor_fields = self._get_cursor_fields(queryset)
+        queryset = self.paginate(
+            self.get_serialized_queryset(queryset, cursor_fields))
+        size = 0
+        if self.is_values_mode():
+            size = len(cursor_fields)
+        count, last = 0, None
+        for row in queryset.iterator():
+            count, last = count + 1, row
+            if size:
+                row = row[:-size]
+            yield self.serialize_row(row)
+        position = None
+        if count >= self.get_page_size():
+            position = self._get_row_position(last, cursor_fields)
+        self.set_next_cursor(position)
+
+    async def aserialize(self, queryset):
+        """
+        Asynchronous version of :meth:`serialize`.
+        """
+        cursor_fields = self._get_cursor_fields(queryset)
+        queryset = self.paginate(
+            self.get_serialized_queryset(queryset, cursor_fields))
+        with self.timing('db'):
+            rows = [row async for row in queryset]
+        with self.timing('serialize'):
+            rows = self._split_cursor_rows(rows, cursor_fields)
+            return [self.serialize_row(row) for row in rows]
 
     def item(self, current_item):
         """
@@ -460,23 +1310,59 @@ class AgnocompleteModel(AgnocompleteModelBase):
         """
         # Take the basic queryset
         qs = self.get_queryset()
-        # filter it via the query conditions
-        qs = qs.filter(self.get_queryset_filters(query))
+        # filter it via the search backend
+        qs = self.get_search_backend().filter(self, qs, query)
         return self.build_extra_filtered_queryset(qs, **kwargs)
 
-    def items(self, query=None, **kwargs):
+    def get_field_weight(self, field_name):
         """
-        Return the items to be sent to the client
+        Return the ranking weight of the field (without its lookup prefix).
         """
-        # Cut this, we don't need no empty query
-        if not query:
-            self.__final_queryset = self.get_model().objects.none()
-            return self.serialize(self.__final_queryset)
-        # Query is too short, no item
-        if len(query) < self.get_query_size_min():
-            self.__final_queryset = self.get_model().objects.none()
-            return self.serialize(self.__final_queryset)
+        return (self.field_weights or {}).get(field_name, 1)
 
+    def get_ranking_expression(self, query):
+        """
+        Return the relevance expression of a row for the given query.
+
+        Each field scores 8 for an exact match, 4 for a prefix match, 2 for a
+        word-prefix match and 1 for a substring match, times its weight.
+        """
+        scores = []
+        for field_name in self.fields:
+            _, name = split_field_name(field_name)
+            weight = self.get_field_weight(name)
+            scores.append(Case(
+                When(Q(**{name + '__iexact': query}),
+                     then=Value(8 * weight)),
+                When(Q(**{name + '__istartswith': query}),
+                     then=Value(4 * weight)),
+                When(Q(**{name + '__icontains': ' ' + query}),
+                     then=Value(2 * weight)),
+                When(Q(**{name + '__icontains': query}),
+                     then=Value(weight)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+        return reduce(operator.add, scores)
+
+    def rank_queryset(self, queryset, query):
+        """
+        Order the queryset by relevance if the ranking is enabled.
+
+        The previous ordering is kept to break ties.
+        """
+        if not self.ranking or not self.fields:
+            return queryset
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.annotate(
+            agnocomplete_relevance=self.get_ranking_expression(query),
+        ).order_by('-agnocomplete_relevance', *ordering)
+
+    def check_authentication(self):
+        """
+        Raise an exception if the class requires an authenticated user and
+        the user is not authenticated.
+        """
         if self.requires_authentication:
             if not self.user:
                 raise AuthenticationRequiredAgnocompleteException(
@@ -487,14 +1373,237 @@ class AgnocompleteModel(AgnocompleteModelBase):
                     "Authentication is required to use this autocomplete"
                 )
 
-        qs = self.build_filtered_queryset(query, **kwargs)
+    def get_items_queryset(self, query=None, **kwargs):
+        """
+        Return the final queryset for the query, before pagination.
+        """
+        # Cut this, we don't need no empty query
+        if not query:
+            self.__final_queryset = self.get_model().objects.none()
+            return self.__final_queryset
+        # Query is too short, no item
+        if len(query) < self.get_query_size_min():
+            self.__final_queryset = self.get_model().objects.none()
+            return self.__final_queryset
+
+        self.check_authentication()
+
+        with self.timing('query'):
+            qs = self.build_filtered_queryset(query, **kwargs)
+            qs = self.rank_queryset(qs, query)
+            qs = self.apply_cursor(qs)
         # The final queryset is the paginated queryset
         self.__final_queryset = qs
-        return self.serialize(qs)
+        return qs
 
-    def selected(self, ids):
+    def items(self, query=None, **kwargs):
         """
-        Return the selected options as a list of tuples
+        Return the items to be sent to the client
+        """
+        if self.is_narrowing(query):
+            return self.narrowed_items(query, **kwargs)
+        return self.serialize(self.get_items_queryset(query, **kwargs))
+
+    def can_stream(self, query):
+        """
+        Return True if the items can be serialized while the rows are
+        fetched, i.e. if they're not cached, coalesced or narrowed, and if
+        the serialization is not overridden.
+        """
+        if self.get_cache() is not None or self.is_single_flight():
+            return False
+        if self.is_narrowing(query):
+            return False
+        return not any(
+            self._overrides(name, AgnocompleteModel)
+            for name in ('items', 'serialize')
+        )
+
+    def iter_items(self, query=None, **kwargs):
+        """
+        Return an iterator over the items, serialized while the rows are
+        fetched, if possible.
+        """
+        if not self.is_valid_query(query) or not self.can_stream(query):
+            return super().iter_items(query, **kwargs)
+        return self.iter_serialize(self.get_items_queryset(query, **kwargs))
+
+    def get_narrowing_threshold(self):
+        if self.narrowing_threshold is not None:
+            return self.narrowing_threshold
+        return getattr(
+            settings, 'AGNOCOMPLETE_NARROWING_THRESHOLD',
+            AGNOCOMPLETE_NARROWING_THRESHOLD)
+
+    def get_narrowing_lookups(self):
+        """
+        Return the (lookup, field name) pairs of the searched fields, or None
+        if the narrowing can't be done in memory.
+        """
+        lookups = [split_field_name(field_name) for field_name in self.fields]
+        for lookup, name in lookups:
+            if lookup not in NARROWING_LOOKUPS or '__' in name:
+                return None
+        return lookups
+
+    def is_narrowing(self, query):
+        """
+        Return True if this query can use the incremental narrowing.
+
+        It's only possible with the default search backend, without ranking,
+        and if every field uses the ``icontains`` or ``istartswith`` lookup.
+        """
+        if not self.narrowing or not self.is_valid_query(query):
+            return False
+        if self.ranking or not isinstance(
+                self.get_search_backend(), QSearchBackend):
+            return False
+        if self._overrides('serialize', AgnocompleteModel):
+            return False
+        if self.is_user_dependent() and getattr(self.user, 'pk', None) is None:
+            return False
+        return self.get_narrowing_lookups() is not None
+
+    @classmethod
+    def invalidate_cache(cls):
+        """
+        Invalidate every cached result and remembered candidates of this class.
+        """
+        super().invalidate_cache()
+        key = 'agnocomplete:{}:generation'.format(cls.slug)
+        get_narrowing_cache().set(key, uuid4().hex, None)
+
+    def get_narrowing_key(self, query, **kwargs):
+        """
+        Return the key of the candidates remembered for this query.
+        """
+        user_key = None
+        if self.is_user_dependent():
+            user_key = self.user.pk
+        signature = repr((
+            query.casefold(),
+            sorted(kwargs.items()),
+            user_key,
+            self.get_cache_key_extra(),
+        ))
+        return 'agnocomplete:{}:narrowing:{}:{}'.format(
+            self.slug,
+            self._get_cache_generation(get_narrowing_cache()),
+            sha1(signature.encode('utf-8')).hexdigest(),
+        )
+
+    def get_candidate_set(self, query, **kwargs):
+        """
+        Return the candidates remembered for the query or one of its
+        prefixes, or None.
+        """
+        cache = get_narrowing_cache()
+        for size in range(len(query), self.get_query_size_min() - 1, -1):
+            candidates = cache.get(
+                self.get_narrowing_key(query[:size], **kwargs))
+            if candidates is not None:
+                return candidates
+        return None
+
+    def _build_candidates(self, rows, cursor_fields, names):
+        """
+        Yield the (item, position, texts) triples of the fetched rows.
+        """
+        if self.is_values_mode():
+            size = len(cursor_fields) + len(names)
+            for row in rows:
+                extra = row[len(row) - size:]
+                yield (
+                    self.serialize_row(row[:len(row) - size]),
+                    list(extra[:len(cursor_fields)]),
+                    extra[len(cursor_fields):],
+                )
+            return
+        for row in rows:
+            yield (
+                self.serialize_row(row),
+                [self.get_cursor_value(row, name) for name in cursor_fields],
+                [getattr(row, name) for name in names],
+            )
+
+    def narrowed_items(self, query, **kwargs):
+        """
+        Return the items using the remembered candidates of a previous query.
+
+        If there are none, the query candidates are fetched, up to the
+        narrowing threshold, and remembered if they're all fetched.
+        """
+        self.check_authentication()
+        page_size = self.get_page_size()
+        after = self.get_cursor()
+        candidate_set = self.get_candidate_set(query, **kwargs)
+        if candidate_set is None:
+            if after is not None:
+                return self.serialize(self.get_items_queryset(query, **kwargs))
+            lookups = self.get_narrowing_lookups()
+            names = [name for _, name in lookups]
+            queryset = self.get_items_queryset(query, **kwargs)
+            cursor_fields = self._get_cursor_fields(queryset)
+            threshold = self.get_narrowing_threshold()
+            # Fetch at least one page, plus one row to detect the next one
+            limit = max(threshold, page_size) + 1
+            queryset = self.get_serialized_queryset(
+                queryset, cursor_fields + names)[:limit]
+            with self.timing('db'):
+                rows = list(queryset)
+            complete = len(rows) <= threshold
+            if not complete:
+                # Too many candidates to remember them, only use this page
+                rows = rows[:page_size + 1]
+            with self.timing('serialize'):
+                candidate_set = CandidateSet(
+                    [lookup for lookup, _ in lookups],
+                    [
+                        (item, normalize_position(position), texts)
+                        for item, position, texts in self._build_candidates(
+                            rows, cursor_fields, names)
+                    ],
+                )
+            if complete:
+                get_narrowing_cache().set(
+                    self.get_narrowing_key(query, **kwargs), candidate_set,
+                    getattr(settings, 'AGNOCOMPLETE_NARROWING_TIMEOUT',
+                            AGNOCOMPLETE_NARROWING_TIMEOUT))
+        with self.timing('search'):
+            result = candidate_set.page(query, page_size, after)
+        if result is None:
+            # Unknown cursor position
+            return self.serialize(self.get_items_queryset(query, **kwargs))
+        page, more = result
+        self.set_next_cursor(page[-1].position if more else None)
+        return [candidate.item for candidate in page]
+
+    def is_async_native(self):
+        """
+        Return True if the asynchronous methods can use the async ORM.
+
+        It's not the case if the synchronous methods have been overridden, or
+        if the Django version doesn't support asynchronous queryset iteration.
+        """
+        if not self.async_native or not hasattr(QuerySet, '__aiter__'):
+            return False
+        return not any(
+            self._overrides(name, AgnocompleteModel)
+            for name in ('items', 'selected', 'serialize')
+        )
+
+    async def aitems(self, query=None, **kwargs):
+        """
+        Return the items to be sent to the client, using the async ORM.
+        """
+        if not self.is_async_native() or self.is_narrowing(query):
+            return await super().aitems(query, **kwargs)
+        return await self.aserialize(
+            self.get_items_queryset(query, **kwargs))
+
+    def get_selected_queryset(self, ids):
+        """
+        Return the queryset of the selected items
         """
         # Cleanup the ID list
         if self.get_field_name() == 'pk':
@@ -503,11 +1612,97 @@ class AgnocompleteModel(AgnocompleteModelBase):
             ids = filter(lambda x: len("{}".format(x)) > 0, copy(ids))
         # Prepare the QS
         # TODO: not contextually filtered, check if it's possible at some point
-        qs = self.get_model_queryset().filter(
+        return self.get_model_queryset().filter(
             **{'{}__in'.format(self.get_field_name()): ids})
+
+    def get_selected_memo_key(self, kind, ids):
+        """
+        Return the key of the selected ids in the request-scoped memo.
+        """
+        return (
+            self.__class__, self.get_field_name(),
+            getattr(self.user, 'pk', None), kind,
+            frozenset(text(_id) for _id in ids),
+        )
+
+    def get_selected_objects(self, ids):
+        """
+        Return the model instances of the selected ids.
+
+        Within a request using the :class:`SelectedMemoMiddleware`, they're
+        fetched once per id set.
+        """
+        ids = list(ids)
+        return memoize_selected(
+            self.get_selected_memo_key('objects', ids),
+            lambda: list(self.get_selected_queryset(ids)))
+
+    def selected(self, ids):
+        """
+        Return the selected options as a list of tuples
+        """
+        memo = get_selected_memo()
+        if memo is None:
+            return self._fetch_selected(ids)
+        ids = list(ids)
+        if self.is_values_mode():
+            objects = memo.get(self.get_selected_memo_key('objects', ids))
+            if objects is not None and self._has_local_labels():
+                # Already fetched by the field validation
+                return [
+                    self._serialize_object(obj) for obj in objects
+                ]
+            # Only the value and label columns are fetched
+            return memoize_selected(
+                self.get_selected_memo_key('selected', ids),
+                lambda: self._fetch_selected(ids))
         result = []
-        for item in qs:
-            item_repr = self.item(item)
+        for row in self.get_selected_objects(ids):
+            item_repr = self.serialize_row(row)
+            result.append((item_repr['value'], item_repr['label']))
+        return result
+
+    def _has_local_labels(self):
+        """
+        Return True if the labels of the "values mode" can be read from the
+        model instances without any query.
+        """
+        return self.label_expression is None and all(
+            '__' not in name for name in self.label_fields)
+
+    def _serialize_object(self, obj):
+        """
+        Return the (value, label) tuple of a model instance, in "values mode".
+        """
+        row = [
+            obj.serializable_value(name)
+            for name in (self.get_field_name(), *self.label_fields)
+        ]
+        item_repr = self.serialize_row(row)
+        return (item_repr['value'], item_repr['label'])
+
+    def _fetch_selected(self, ids):
+        result = []
+        queryset = self.get_serialized_queryset(
+            self.get_selected_queryset(ids))
+        for row in queryset:
+            item_repr = self.serialize_row(row)
+            result.append(
+                (item_repr['value'], item_repr['label'])
+            )
+        return result
+
+    async def aselected(self, ids):
+        """
+        Return the selected options as a list of tuples, using the async ORM.
+        """
+        if not self.is_async_native():
+            return await super().aselected(ids)
+        result = []
+        queryset = self.get_serialized_queryset(
+            self.get_selected_queryset(ids))
+        async for row in queryset:
+            item_repr = self.serialize_row(row)
             result.append(
                 (item_repr['value'], item_repr['label'])
             )
@@ -524,6 +1719,23 @@ class AgnocompleteUrlProxy(AgnocompleteBase, metaclass=ABCMeta):
     method = 'get'
     data_key = 'data'
 
+    # HTTP connection pool, fallback to settings if unset
+    http_pool_connections = None
+    http_pool_maxsize = None
+    http_max_retries = None
+    # Maximum number of concurrent item calls, fallback to settings if unset
+    selected_concurrency = None
+    # Cursor pagination: the API page token is read from the `next_page_key`
+    # of the search result, and sent back as the `page_key` argument.
+    page_key = None
+    next_page_key = None
+
+    @classmethod
+    def get_metadata(cls):
+        metadata = super().get_metadata()
+        metadata['kind'] = 'url-proxy'
+        return metadata
+
     def get_search_url(self):
         raise NotImplementedError(
             "Integrator: You must implement a `get_search_url` method"
@@ -537,9 +1749,181 @@ class AgnocompleteUrlProxy(AgnocompleteBase, metaclass=ABCMeta):
         raise NotImplementedError(
             "Integrator: You must implement a `get_item_url` method")
 
+    def get_items_url(self, ids):
+        """
+        Return the URL to fetch several items at once, or None if the API
+        doesn't support it.
+
+        If you return a URL, you may want to override the
+        :meth:`get_batch_http_call_kwargs` method too.
+        """
+        return None
+
+    def get_batch_http_call_kwargs(self, ids):
+        """
+        Return the HTTP query arguments for the multiple items call.
+        """
+        return {}
+
+    def get_selected_concurrency(self):
+        """
+        Return the maximum number of concurrent item calls in
+        :meth:`selected`.
+        """
+        if self.selected_concurrency is not None:
+            return self.selected_concurrency
+        return getattr(
+            settings, 'AGNOCOMPLETE_SELECTED_CONCURRENCY',
+            AGNOCOMPLETE_SELECTED_CONCURRENCY)
+
     def get_choices(self):
         return []
 
+    @classmethod
+    def _get_http_setting(cls, name, default):
+        value = getattr(cls, name.lower())
+        if value is None:
+            value = getattr(settings, 'AGNOCOMPLETE_' + name, default)
+        return value
+
+    @classmethod
+    def build_http_session(cls):
+        """
+        Return a new HTTP session, with its connection pool.
+
+        The pool size and the retry policy are taken from the class properties
+        or from the settings. ``http_max_retries`` can be an integer or a
+        ``urllib3.util.Retry`` instance.
+        """
+        adapter = HTTPAdapter(
+            pool_connections=cls._get_http_setting(
+                'HTTP_POOL_CONNECTIONS', AGNOCOMPLETE_HTTP_POOL_CONNECTIONS),
+            pool_maxsize=cls._get_http_setting(
+                'HTTP_POOL_MAXSIZE', AGNOCOMPLETE_HTTP_POOL_MAXSIZE),
+            max_retries=cls._get_http_setting(
+                'HTTP_MAX_RETRIES', AGNOCOMPLETE_HTTP_MAX_RETRIES),
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # The session is shared between users and threads: never keep cookies
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    @classmethod
+    def get_http_session(cls):
+        """
+        Return the HTTP session shared by every instance of this class.
+
+        The session is created on first use. Its connections are kept alive
+        and reused by the following calls. The underlying connection pool is
+        thread-safe.
+        """
+        session = vars(cls).get('_http_session')
+        if session is None:
+            with _http_session_lock:
+                session = vars(cls).get('_http_session')
+                if session is None:
+                    session = cls.build_http_session()
+                    cls._http_session = session
+        return session
+
+    @classmethod
+    def close_http_session(cls):
+        """
+        Close the HTTP session of this class and its pooled connections.
+
+        The asynchronous HTTP clients of this class are dropped too, their
+        event loops close them. New ones will be created on the next call.
+        """
+        with _http_session_lock:
+            session = vars(cls).get('_http_session')
+            if session is not None:
+                del cls._http_session
+            if '_async_http_clients' in vars(cls):
+                del cls._async_http_clients
+        if session is not None:
+            session.close()
+
+    @classmethod
+    def build_async_http_client(cls):
+        """
+        Return a new asynchronous HTTP client, with its connection pool.
+
+        The pool is configured by the same class properties and settings as
+        :meth:`build_http_session`. The retries only apply to the connection
+        errors.
+        """
+        connections = cls._get_http_setting(
+            'HTTP_POOL_CONNECTIONS', AGNOCOMPLETE_HTTP_POOL_CONNECTIONS)
+        maxsize = cls._get_http_setting(
+            'HTTP_POOL_MAXSIZE', AGNOCOMPLETE_HTTP_POOL_MAXSIZE)
+        retries = cls._get_http_setting(
+            'HTTP_MAX_RETRIES', AGNOCOMPLETE_HTTP_MAX_RETRIES)
+        if not isinstance(retries, int):
+            # urllib3 ``Retry`` instance
+            retries = retries.total if isinstance(retries.total, int) else 0
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=connections * maxsize,
+            ),
+            retries=retries,
+        )
+        client = httpx.AsyncClient(transport=transport)
+        # The client is shared between users: never keep cookies
+        client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    @classmethod
+    async def aget_http_client(cls):
+        """
+        Return the asynchronous HTTP client shared by every instance of this
+        class in the running event loop.
+
+        The client is created on first use, its connections are kept alive
+        and reused by the following calls. It's closed when the event loop
+        shuts down its asynchronous generators (e.g. at the end of
+        ``asyncio.run()`` or of an ``async_to_sync()`` call).
+        """
+        loop = asyncio.get_running_loop()
+        with _http_session_lock:
+            clients = vars(cls).get('_async_http_clients')
+            if clients is None:
+                clients = cls._async_http_clients = {}
+            for closed in [key for key in clients if key.is_closed()]:
+                del clients[closed]
+            if loop in clients:
+                return clients[loop][0]
+            client = cls.build_async_http_client()
+            closer = _close_on_shutdown(client)
+            clients[loop] = (client, closer)
+        # Registers the generator with the loop
+        await closer.__anext__()
+        return client
+
+    @classmethod
+    async def aclose_http_client(cls):
+        """
+        Close the asynchronous HTTP client of this class in the running event
+        loop, and its pooled connections.
+        """
+        loop = asyncio.get_running_loop()
+        with _http_session_lock:
+            clients = vars(cls).get('_async_http_clients', {})
+            _, closer = clients.pop(loop, (None, None))
+        if closer is not None:
+            await closer.aclose()
+
+    @classmethod
+    def close_http_sessions(cls):
+        """
+        Close the HTTP sessions of this class and of all its subclasses.
+        """
+        cls.close_http_session()
+        for subclass in cls.__subclasses__():
+            subclass.close_http_sessions()
+
     def get_http_method_arg_name(self):
         """
         Return the HTTP function to call and the params/data argument name
@@ -548,7 +1932,7 @@ class AgnocompleteUrlProxy(AgnocompleteBase, metaclass=ABCMeta):
             arg_name = 'params'
         else:
             arg_name = 'data'
-        return getattr(requests, self.method), arg_name
+        return getattr(self.get_http_session(), self.method), arg_name
 
     def http_call(self, url=None, **kwargs):
         """
@@ -574,6 +1958,41 @@ class AgnocompleteUrlProxy(AgnocompleteBase, metaclass=ABCMeta):
             response.raise_for_status()
         return response.json()
 
+    async def ahttp_call(self, url=None, **kwargs):
+        """
+        Asynchronous version of :meth:`http_call`, using ``httpx``.
+
+        Errors are raised as ``requests`` exceptions, to be handled the same
+        way as the synchronous calls.
+        """
+        if not url:
+            url = self.search_url
+        _, arg_name = self.get_http_method_arg_name()
+        # Build the argument dictionary to pass in the http function
+        _kwargs = {
+            arg_name: kwargs,
+        }
+        client = await self.aget_http_client()
+        try:
+            response = await client.request(
+                self.method.upper(),
+                url.format(**kwargs),
+                headers=self.get_http_headers(),
+                **_kwargs
+            )
+        except httpx.TimeoutException as exc:
+            raise requests.Timeout(exc)
+        # Error handling
+        if response.status_code != 200:
+            logger.warning('Invalid Request for `%s`', response.url)
+            if response.is_error:
+                raise requests.HTTPError(
+                    '{} Error for url: {}'.format(
+                        response.status_code, response.url),
+                    response=response,
+                )
+        return response.json()
+
     def item(self, current_item):
         return dict(
             value=text(current_item[self.value_key]),
@@ -606,15 +2025,35 @@ class AgnocompleteUrlProxy(AgnocompleteBase, metaclass=ABCMeta):
         """
         return {'q': query}
 
-    def items(self, query=None, **kwargs):
-        if not self.is_valid_query(query):
-            return []
-        # Call to search URL
-        http_result = self.http_call(
-            **self.get_http_call_kwargs(query, **kwargs)
-        )
-        # In case of error, on the API side, the error is raised and handled
-        # in the view.
+    def get_search_call_kwargs(self, query, **kwargs):
+        """
+        Return the search HTTP query arguments, including the API page token
+        if a cursor has been given.
+        """
+        call_kwargs = self.get_http_call_kwargs(query, **kwargs)
+        page = self.get_cursor()
+        if page is not None:
+            if not self.page_key:
+                raise InvalidCursor("Cursor pagination is not available")
+            call_kwargs[self.page_key] = page
+        return call_kwargs
+
+    def get_http_next_page(self, http_result):
+        """
+        Return the token of the next page from the search HTTP result, or
+        None if there's no next page.
+
+        By default, it's the ``next_page_key`` value of the result, if this
+        property is set.
+        """
+        if not self.next_page_key:
+            return None
+        return http_result.get(self.next_page_key)
+
+    def serialize(self, http_result):
+        """
+        Return the items to be sent to the client from the search HTTP result
+        """
         http_result = self.get_http_result(http_result)
         result = []
         for item in http_result:
@@ -625,22 +2064,123 @@ class AgnocompleteUrlProxy(AgnocompleteBase, metaclass=ABCMeta):
                 continue
         return result
 
+    def items(self, query=None, **kwargs):
+        if not self.is_valid_query(query):
+            return []
+        # Call to search URL
+        with self.timing('http'):
+            http_result = self.http_call(
+                **self.get_search_call_kwargs(query, **kwargs)
+            )
+        # In case of error, on the API side, the error is raised and handled
+        # in the view.
+        self.set_next_cursor(self.get_http_next_page(http_result))
+        with self.timing('serialize'):
+            return self.serialize(http_result)
+
+    def serialize_selected(self, result):
+        """
+        Return the selected options from an item HTTP result
+        """
+        data = []
+        if self.data_key in result and len(result[self.data_key]):
+            for item in result[self.data_key]:
+                data.append(
+                    (
+                        text(item[self.value_key]),
+                        text(item[self.label_key])
+                    )
+                )
+        return data
+
+    def sort_selected(self, ids, data):
+        """
+        Return the selected options in the order of the given ids.
+        """
+        positions = {text(_id): position for position, _id in enumerate(ids)}
+        return sorted(
+            data, key=lambda item: positions.get(item[0], len(positions)))
+
     def selected(self, ids):
+        # Filter out "falsy IDs" (empty string, None, 0...)
+        ids = [_id for _id in ids if _id]
+        if not ids:
+            return []
+        # Multiple items call
+        url = self.get_items_url(ids)
+        if url:
+            result = self.http_call(
+                url=url, **self.get_batch_http_call_kwargs(ids))
+            return self.sort_selected(ids, self.serialize_selected(result))
+
+        # One call per item, concurrently
+        urls = [self.get_item_url(pk=_id) for _id in ids]
+        concurrency = min(self.get_selected_concurrency(), len(urls))
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(
+                    lambda url: self.http_call(url=url), urls))
+        else:
+            results = [self.http_call(url=url) for url in urls]
         data = []
+        for result in results:
+            data.extend(self.serialize_selected(result))
+        return data
+
+    def is_async_native(self):
+        """
+        Return True if the asynchronous methods can use the async HTTP client.
+
+        It's not the case if ``httpx`` is not installed or if the synchronous
+        methods have been overridden.
+        """
+        if not self.async_native or httpx is None:
+            return False
+        return not any(
+            self._overrides(name, AgnocompleteUrlProxy)
+            for name in ('items', 'selected', 'http_call')
+        )
+
+    async def aitems(self, query=None, **kwargs):
+        if not self.is_async_native():
+            return await super().aitems(query, **kwargs)
+        if not self.is_valid_query(query):
+            return []
+        with self.timing('http'):
+            http_result = await self.ahttp_call(
+                **self.get_search_call_kwargs(query, **kwargs)
+            )
+        self.set_next_cursor(self.get_http_next_page(http_result))
+        with self.timing('serialize'):
+            return self.serialize(http_result)
+
+    async def aselected(self, ids):
+        if not self.is_async_native():
+            return await super().aselected(ids)
         # Filter out "falsy IDs" (empty string, None, 0...)
-        ids = filter(lambda x: x, ids)
-        for _id in ids:
-            if _id:
-                # Call to the item URL
-                result = self.http_call(url=self.get_item_url(pk=_id))
-                if self.data_key in result and len(result[self.data_key]):
-                    for item in result[self.data_key]:
-                        data.append(
-                            (
-                                text(item[self.value_key]),
-                                text(item[self.label_key])
-                            )
-                        )
+        ids = [_id for _id in ids if _id]
+        if not ids:
+            return []
+        # Multiple items call
+        url = self.get_items_url(ids)
+        if url:
+            result = await self.ahttp_call(
+                url=url, **self.get_batch_http_call_kwargs(ids))
+            return self.sort_selected(ids, self.serialize_selected(result))
+
+        # One call per item, concurrently
+        semaphore = asyncio.Semaphore(max(1, self.get_selected_concurrency()))
+
+        async def _call(url):
+            async with semaphore:
+                return await self.ahttp_call(url=url)
+
+        results = await asyncio.gather(*(
+            _call(self.get_item_url(pk=_id)) for _id in ids
+        ))
+        data = []
+        for result in results:
+            data.extend(self.serialize_selected(result))
         return data
 
     def validate(self, value):
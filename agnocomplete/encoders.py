@@ -0,0 +1,105 @@
+"""
+Agnocomplete JSON encoders
+
+The views encode their JSON payloads using the encoder defined by the
+``AGNOCOMPLETE_JSON_ENCODER`` setting (or their ``json_encoder`` property).
+"""
+from functools import lru_cache
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class JSONEncoder:
+    """
+    Base class for the JSON encoders.
+    """
+
+    def encode(self, obj):
+        """
+        Return the JSON representation of the object, as bytes.
+        """
+        raise NotImplementedError(
+            "Integrator: You must implement an `encode` method")
+
+
+class DjangoEncoder(JSONEncoder):
+    """
+    Default encoder: the standard library ``json`` module, using the
+    ``DjangoJSONEncoder`` for dates, decimals, UUIDs, lazy strings, etc.
+    """
+
+    def __init__(self):
+        self.encoder = DjangoJSONEncoder()
+
+    def encode(self, obj):
+        return self.encoder.encode(obj).encode('utf-8')
+
+
+class PlainEncoder(JSONEncoder):
+    """
+    Standard library encoder without any type dispatch, nor circular
+    references check.
+
+    Only use it if your items are made of plain strings, numbers, lists and
+    dicts (no lazy translation strings, for example).
+    """
+
+    def __init__(self):
+        self.encoder = json.JSONEncoder(
+            check_circular=False, separators=(',', ':'))
+
+    def encode(self, obj):
+        return self.encoder.encode(obj).encode('utf-8')
+
+
+class OrjsonEncoder(JSONEncoder):
+    """
+    Encoder using `orjson <https://github.com/ijl/orjson>`_, if installed.
+
+    The types unknown to orjson (e.g. decimals or lazy strings) are handled
+    by the ``DjangoJSONEncoder``. If orjson is not installed, it falls back to
+    the :class:`DjangoEncoder`.
+    """
+
+    def __init__(self):
+        self.default = DjangoJSONEncoder().default
+        if orjson is None:
+            logger.warning(
+                "orjson is not installed, falling back to the stdlib encoder")
+            self.fallback = DjangoEncoder()
+        else:
+            self.fallback = None
+
+    def encode(self, obj):
+        if self.fallback is not None:
+            return self.fallback.encode(obj)
+        return orjson.dumps(obj, default=self.default)
+
+
+@lru_cache(maxsize=None)
+def _load_json_encoder(path):
+    return import_string(path)()
+
+
+def get_json_encoder(encoder):
+    """
+    Return a JSON encoder instance, from an instance, a class or a dotted
+    path.
+
+    Dotted paths are loaded and instantiated once.
+    """
+    if isinstance(encoder, str):
+        return _load_json_encoder(encoder)
+    if isinstance(encoder, type):
+        return encoder()
+    return encoder
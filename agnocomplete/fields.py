@@ -2,13 +2,22 @@
 Agnocomplete specific form fields.
 
 """
+from copy import copy
+import logging
+
 from django import forms
-from .core import AgnocompleteBase
+from django.conf import settings
+from django.db import router, transaction
+from django.forms.models import ModelChoiceIterator
+from django.utils.encoding import force_str as text
+from .core import AgnocompleteBase, AgnocompleteModel
 from .constants import AGNOCOMPLETE_USER_ATTRIBUTE
+from .constants import AGNOCOMPLETE_CHOICES_ITERATION_LIMIT
 from .widgets import AgnocompleteSelect, AgnocompleteMultiSelect
 from .register import get_agnocomplete_registry
 from .exceptions import ItemNotFound
 from .exceptions import UnregisteredAgnocompleteException
+from .memo import get_selected_memo
 
 
 __all__ = [
@@ -18,16 +27,105 @@ __all__ = [
     'AgnocompleteModelMultipleField',
 ]
 
+logger = logging.getLogger(__name__)
+
+
+class AgnocompleteModelChoiceIterator(ModelChoiceIterator):
+    """
+    Choices of the model fields, refusing to iterate over the whole table.
+
+    The widgets only render the selected values, and the values are validated
+    using a filter on the queryset. Iterating over the choices would load
+    every row, so only ``AGNOCOMPLETE_CHOICES_ITERATION_LIMIT`` choices (none
+    by default) can be iterated. If there are more, a warning is logged and
+    no choice is returned.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    @property
+    def queryset(self):
+        # Read on use, not to resolve the agnocomplete at field construction
+        return self.field.queryset
+
+    def get_limit(self):
+        return getattr(
+            settings, 'AGNOCOMPLETE_CHOICES_ITERATION_LIMIT',
+            AGNOCOMPLETE_CHOICES_ITERATION_LIMIT)
+
+    def get_objects(self):
+        """
+        Return the objects of the choices, if they don't exceed the limit.
+        """
+        limit = self.get_limit()
+        objects = list(self.queryset[:limit + 1])
+        if len(objects) > limit:
+            logger.warning(
+                "Refusing to iterate over the `%s` choices of the "
+                "`%s` agnocomplete field (more than %d choices)",
+                self.queryset.model.__name__,
+                self.field.agnocomplete.slug,
+                limit,
+            )
+            return []
+        return objects
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.get_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        count = self.queryset[:self.get_limit() + 1].count()
+        if count > self.get_limit():
+            count = 0
+        return count + (1 if self.field.empty_label is not None else 0)
+
 
 class AgnocompleteMixin:
     """
     Handles the Agnocomplete generic handling for fields.
     """
     widget = AgnocompleteSelect
+    # Agnocomplete class and user context, instantiated on first use
+    _agnocomplete_class = None
+    _agnocomplete_user = None
+    _agnocomplete = None
 
     def _setup_agnocomplete_widget(self):
-        # Update the widget with the target agnocomplete
-        self.widget.agnocomplete = self.agnocomplete
+        # The widget uses the agnocomplete of the field
+        self.widget.agnocomplete_field = self
+
+    @property
+    def agnocomplete(self):
+        """
+        Return the agnocomplete instance, created on first use.
+        """
+        if self._agnocomplete is None:
+            self.agnocomplete = self._agnocomplete_class(
+                user=self._agnocomplete_user)
+        return self._agnocomplete
+
+    @agnocomplete.setter
+    def agnocomplete(self, instance):
+        instance.set_agnocomplete_field(self)
+        self._agnocomplete = instance
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        if self._agnocomplete is not None:
+            # Cheap copy, bound to the new field
+            result.agnocomplete = copy(self._agnocomplete)
+        result._setup_agnocomplete_widget()
+        return result
+
+    def get_agnocomplete_choices(self):
+        """
+        Return the choices of the agnocomplete, evaluated on use.
+        """
+        return self.agnocomplete.get_choices()
 
     def set_agnocomplete(self, klass_or_instance, user):
         """
@@ -50,6 +148,9 @@ class AgnocompleteMixin:
         be instanciated also, using the name of the class as the key to
         fetch the actual class.
 
+        Classes are instantiated on first use of the ``agnocomplete``
+        property, and each form gets a cheap copy of the instance.
+
         """
         # If string, use register to fetch the class
         if isinstance(klass_or_instance, str):
@@ -59,12 +160,12 @@ class AgnocompleteMixin:
                     "Unregistered Agnocomplete class: {} is unknown".format(klass_or_instance)  # noqa
                 )
             klass_or_instance = registry[klass_or_instance]
-        # If not an instance, instanciate this
+        # If not an instance, it'll be instantiated on first use
         if not isinstance(klass_or_instance, AgnocompleteBase):
-            klass_or_instance = klass_or_instance(user=user)
-        # Pass the field when we have an AgnocompleteBase instance
-        if isinstance(klass_or_instance, AgnocompleteBase):
-            klass_or_instance.set_agnocomplete_field(self)
+            self._agnocomplete_class = klass_or_instance
+            self._agnocomplete_user = user
+            self._agnocomplete = None
+            return
         # Store it in the instance
         self.agnocomplete = klass_or_instance
         self.agnocomplete.user = user
@@ -101,6 +202,17 @@ class AgnocompleteMixin:
 
 
 class AgnocompleteContextQuerysetMixin:
+    @property
+    def queryset(self):
+        if self._queryset is None:
+            # The agnocomplete queryset, on first use
+            self._queryset = self.get_agnocomplete_choices().all()
+        return self._queryset
+
+    @queryset.setter
+    def queryset(self, queryset):
+        forms.ModelChoiceField.queryset.fset(self, queryset)
+
     def transmit_agnocomplete_context(self):
         """
         We'll reset the current queryset only if the user is set.
@@ -111,27 +223,73 @@ class AgnocompleteContextQuerysetMixin:
         return user
 
 
+class AgnocompleteSelectedMemoMixin:
+    """
+    Validate the model choices using the selected objects memo of the
+    current request (see :class:`agnocomplete.memo.SelectedMemoMiddleware`),
+    shared with the widget rendering.
+    """
+    def use_selected_memo(self):
+        """
+        Return True if the memo is active, and the field queryset is the
+        unfiltered queryset of the agnocomplete model (i.e. not filtered by
+        the user context).
+        """
+        if get_selected_memo() is None:
+            return False
+        if not isinstance(self.agnocomplete, AgnocompleteModel):
+            return False
+        field_name = self.to_field_name or 'pk'
+        return self.queryset.model is self.agnocomplete.get_model() \
+            and not self.queryset.query.has_filters() \
+            and field_name == self.agnocomplete.get_field_name()
+
+    def get_selected_objects(self, values):
+        """
+        Return the memoized model instances of the values, by value.
+        """
+        field_name = self.agnocomplete.get_field_name()
+        return {
+            text(getattr(obj, field_name)): obj
+            for obj in self.agnocomplete.get_selected_objects(values)
+        }
+
+
 class AgnocompleteField(AgnocompleteMixin, forms.ChoiceField):
     """
     Agnocomplete Field class for simple Choice fields.
     """
     def __init__(self, agnocomplete, user=None, **kwargs):
         self.set_agnocomplete(agnocomplete, user)
-        super().__init__(choices=self.agnocomplete.get_choices(), **kwargs)
+        super().__init__(choices=self.get_agnocomplete_choices, **kwargs)
         self._setup_agnocomplete_widget()
 
 
-class AgnocompleteModelField(AgnocompleteContextQuerysetMixin,
+class AgnocompleteModelField(AgnocompleteSelectedMemoMixin,
+                             AgnocompleteContextQuerysetMixin,
                              AgnocompleteMixin,
                              forms.ModelChoiceField):
     """
     Agnocomplete Field class for Choice fields based on models / querysets.
     """
+    iterator = AgnocompleteModelChoiceIterator
+
     def __init__(self, agnocomplete, user=None, **kwargs):
         self.set_agnocomplete(agnocomplete, user)
-        super().__init__(self.agnocomplete.get_choices(), **kwargs)
+        super().__init__(None, **kwargs)
         self._setup_agnocomplete_widget()
 
+    def to_python(self, value):
+        if value in self.empty_values or not self.use_selected_memo():
+            return super().to_python(value)
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, self.to_field_name or 'pk')
+        obj = self.get_selected_objects([value]).get(text(value))
+        if obj is None:
+            # Let the regular validation raise the appropriate error
+            return super().to_python(value)
+        return obj
+
 
 class AgnocompleteMultipleMixin(AgnocompleteMixin):
     """
@@ -183,21 +341,27 @@ class AgnocompleteMultipleField(AgnocompleteMultipleMixin,
                  create=False, create_field=False, **kwargs):
         self.set_agnocomplete(agnocomplete, user)
         self.set_create_field(create=create, create_field=create_field)
-        super().__init__(choices=self.agnocomplete.get_choices(), **kwargs)
+        super().__init__(choices=self.get_agnocomplete_choices, **kwargs)
         self._setup_agnocomplete_widget()
 
 
-class AgnocompleteModelMultipleField(AgnocompleteContextQuerysetMixin,
+class AgnocompleteModelMultipleField(AgnocompleteSelectedMemoMixin,
+                                     AgnocompleteContextQuerysetMixin,
                                      AgnocompleteMultipleMixin,
                                      forms.ModelMultipleChoiceField):
     """
     Field class for multiple selection on Django models.
     """
+    iterator = AgnocompleteModelChoiceIterator
+    # Create the new values using bulk queries, unless create_item() is
+    # overridden. Model.save() and the post_save signal are bypassed.
+    bulk_create = False
+
     def __init__(self, agnocomplete, user=None,
                  create=False, create_field=False, **kwargs):
         self.set_agnocomplete(agnocomplete, user)
         self.set_create_field(create=create, create_field=create_field)
-        super().__init__(self.agnocomplete.get_choices(), **kwargs)
+        super().__init__(None, **kwargs)
         self._setup_agnocomplete_widget()
         self._new_values = []
 
@@ -211,6 +375,16 @@ class AgnocompleteModelMultipleField(AgnocompleteContextQuerysetMixin,
         """
         return self.queryset.model.objects.none()
 
+    def _check_values(self, value):
+        if not self.use_selected_memo():
+            return super()._check_values(value)
+        objects = self.get_selected_objects(value)
+        if not all(text(v) in objects for v in value):
+            # Let the regular validation raise the appropriate error
+            return super()._check_values(value)
+        key = self.to_field_name or 'pk'
+        return self.queryset.filter(**{'{}__in'.format(key): value})
+
     def create_item(self, **kwargs):
         """
         Return a model instance created from kwargs.
@@ -227,10 +401,51 @@ class AgnocompleteModelMultipleField(AgnocompleteContextQuerysetMixin,
         """
         return {}
 
+    def is_bulk_create(self):
+        """
+        Return True if the new values can be created using bulk queries.
+        """
+        klass = AgnocompleteModelMultipleField
+        return self.bulk_create and \
+            type(self).create_item is klass.create_item
+
+    def bulk_create_new_values(self):
+        """
+        Create the new values using two queries, in a transaction: one to find
+        the existing values and one to insert the missing ones. A third one
+        fetches them all, in the same transaction.
+
+        Return the model instances QS, already evaluated.
+        """
+        model = self.queryset.model
+        lookup = '{}__in'.format(self.create_field)
+        extra_create_kwargs = self.extra_create_kwargs()
+        values = list(dict.fromkeys(self._new_values))
+        with transaction.atomic(using=router.db_for_write(model)):
+            existing = set(
+                model.objects.filter(
+                    **extra_create_kwargs, **{lookup: values}
+                ).values_list(self.create_field, flat=True)
+            )
+            model.objects.bulk_create(
+                [
+                    model(**{self.create_field: value}, **extra_create_kwargs)
+                    for value in values if value not in existing
+                ],
+                ignore_conflicts=True,
+            )
+            queryset = model.objects.filter(
+                **extra_create_kwargs, **{lookup: values})
+            # Fetch them before leaving the transaction
+            list(queryset)
+        return queryset
+
     def create_new_values(self):
         """
         Create values created by the user input. Return the model instances QS.
         """
+        if self.is_bulk_create():
+            return self.bulk_create_new_values()
         model = self.queryset.model
         pks = []
         extra_create_kwargs = self.extra_create_kwargs()
@@ -1,4 +1,8 @@
+from django.utils.encoding import force_str as text
+from django.utils.functional import cached_property
+
 from .constants import AGNOCOMPLETE_USER_ATTRIBUTE
+from .widgets import AgnocompleteWidgetMixin
 
 
 class UserContextFormMixin:
@@ -18,3 +22,112 @@ class UserContextFormMixin:
         if self.user:
             for field in self.fields.values():
                 setattr(field, AGNOCOMPLETE_USER_ATTRIBUTE, self.user)
+
+
+class SelectedPrefetcher:
+    """
+    Resolve the selected values of the agnocomplete widgets of one or
+    several forms at once.
+
+    When the first widget is rendered, the selected ids of every registered
+    form are gathered, and resolved with a single :meth:`selected()` call per
+    agnocomplete class (see :meth:`get_selected_prefetch_key()`), instead of
+    one call per widget.
+    """
+
+    def __init__(self):
+        self.forms = []
+        self.results = None
+
+    def add_form(self, form):
+        """
+        Register the agnocomplete widgets of the form.
+        """
+        for field in form.fields.values():
+            if isinstance(field.widget, AgnocompleteWidgetMixin):
+                field.widget.selected_prefetcher = self
+        self.forms.append(form)
+        # Resolve again, including this form
+        self.results = None
+
+    def get_selected_ids(self):
+        """
+        Return the agnocomplete instances and the selected ids of every
+        registered form, by prefetch key.
+        """
+        selected_ids = {}
+        for form in self.forms:
+            for name, field in form.fields.items():
+                widget = field.widget
+                if not isinstance(widget, AgnocompleteWidgetMixin):
+                    continue
+                key = widget.agnocomplete.get_selected_prefetch_key()
+                if key is None:
+                    continue
+                value = widget.format_value(form[name].value())
+                ids = {text(v) for v in value} - {''}
+                if not ids:
+                    continue
+                instance, key_ids = selected_ids.setdefault(
+                    key, (widget.agnocomplete, set()))
+                key_ids.update(ids)
+        return selected_ids
+
+    def prefetch(self):
+        """
+        Resolve the selected values, with one call per prefetch key.
+        """
+        self.results = {}
+        for key, (instance, ids) in self.get_selected_ids().items():
+            self.results[key] = (ids, instance.selected(ids))
+
+    def selected(self, agnocomplete, ids):
+        """
+        Return the selected options of the given ids as a list of tuples,
+        like :meth:`selected()`.
+        """
+        key = agnocomplete.get_selected_prefetch_key()
+        if key is None:
+            return agnocomplete.selected(ids)
+        ids = {text(_id) for _id in ids} - {''}
+        if not ids:
+            return []
+        if self.results is None:
+            self.prefetch()
+        prefetched_ids, choices = self.results.get(key, (set(), []))
+        if not ids <= prefetched_ids:
+            # Not gathered (e.g. rendered with another value)
+            return agnocomplete.selected(ids)
+        return [choice for choice in choices if text(choice[0]) in ids]
+
+
+class SelectedPrefetchFormMixin:
+    """
+    Form Mixin resolving the selected values of all its agnocomplete fields
+    at once, using a :class:`SelectedPrefetcher`.
+
+    Pass the same ``selected_prefetcher`` to several forms to share it.
+    """
+    def __init__(self, *args, selected_prefetcher=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if selected_prefetcher is None:
+            selected_prefetcher = SelectedPrefetcher()
+        self.selected_prefetcher = selected_prefetcher
+        self.selected_prefetcher.add_form(self)
+
+
+class SelectedPrefetchFormSetMixin:
+    """
+    FormSet Mixin resolving the selected values of the agnocomplete fields
+    of all its forms at once, using a :class:`SelectedPrefetcher`.
+
+    It works with any form class, e.g. in the admin inlines.
+    """
+    @cached_property
+    def selected_prefetcher(self):
+        return SelectedPrefetcher()
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        self.selected_prefetcher.add_form(form)
+        return form
@@ -0,0 +1,120 @@
+"""
+Agnocomplete in-memory indexes
+"""
+from bisect import bisect_left
+from hashlib import sha1
+from heapq import nsmallest
+
+from django.utils.encoding import force_str as text
+from django.utils.functional import Promise, cached_property
+from django.utils.translation import get_language
+
+
+class ChoicesIndex:
+    """
+    Prefix index over a static list of ``(value, label)`` choices.
+
+    Labels are lowercased once and kept in a sorted array, so a prefix
+    search is a binary search instead of a scan over every choice. Values are
+    mapped to their position(s) in the original choices to resolve selected
+    ids with dictionary lookups.
+
+    Results are always returned in the original choices order.
+    """
+
+    def __init__(self, choices):
+        self.choices = choices
+        self._items = tuple(choices)
+        # Lazy labels (e.g. ``gettext_lazy``) depend on the active language
+        self.language = None
+        if any(isinstance(label, Promise) for _, label in self._items):
+            self.language = get_language()
+
+        entries = sorted(
+            (text(label).lower(), position)
+            for position, (_, label) in enumerate(self._items)
+        )
+        self._keys = [key for key, _ in entries]
+        self._positions = [position for _, position in entries]
+
+        self._values = {}
+        for position, (value, _) in enumerate(self._items):
+            self._values.setdefault(value, []).append(position)
+
+    def is_valid_for(self, choices):
+        """
+        Return True if this index can be used for the given choices.
+        """
+        if self.choices is not choices:
+            return False
+        if self.language is not None:
+            return self.language == get_language()
+        return True
+
+    @cached_property
+    def content_hash(self):
+        """
+        Return a hash of the choices values and labels.
+        """
+        signature = repr([
+            (text(value), text(label)) for value, label in self._items])
+        return sha1(signature.encode('utf-8')).hexdigest()
+
+    def _prefix_range(self, prefix):
+        """
+        Return the (low, high) bounds of the keys starting with ``prefix``
+        """
+        low = bisect_left(self._keys, prefix)
+        last = ord(prefix[-1])
+        if last >= 0x10ffff:
+            return low, len(self._keys)
+        upper = prefix[:-1] + chr(last + 1)
+        return low, bisect_left(self._keys, upper, low)
+
+    def search_positions(self, prefix, limit, after=None):
+        """
+        Return the positions of the first ``limit`` choices which label starts
+        with ``prefix``.
+
+        If ``after`` is set, only the choices after this position are
+        returned.
+
+        The matching range is found in O(log n), but picking the first
+        positions in the choices order is O(m log limit), ``m`` being the
+        number of labels starting with ``prefix``.
+        """
+        start = 0 if after is None else after + 1
+        if not prefix:
+            return list(range(start, min(start + limit, len(self._items))))
+        low, high = self._prefix_range(prefix)
+        positions = self._positions[low:high]
+        if start:
+            positions = [
+                position for position in positions if position >= start]
+        if len(positions) > limit:
+            positions = nsmallest(limit, positions)
+        else:
+            positions.sort()
+        return positions
+
+    def get_items(self, positions):
+        """
+        Return the choices at the given positions.
+        """
+        return [self._items[position] for position in positions]
+
+    def search(self, prefix, limit, after=None):
+        """
+        Return the first ``limit`` choices which label starts with ``prefix``.
+        """
+        return self.get_items(self.search_positions(prefix, limit, after))
+
+    def selected(self, ids):
+        """
+        Return the choices matching the given values.
+        """
+        positions = []
+        for _id in set(ids):
+            positions.extend(self._values.get(_id, ()))
+        positions.sort()
+        return [self._items[position] for position in positions]
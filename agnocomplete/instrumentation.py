@@ -0,0 +1,120 @@
+"""
+Agnocomplete instrumentation
+
+Phase timings are collected while a view handles an autocomplete request.
+They are sent along with the ``agnocomplete_request_finished`` signal, to the
+metrics sinks and, optionally, in the ``Server-Timing`` response header.
+"""
+from contextlib import contextmanager
+from functools import lru_cache
+from time import perf_counter
+import logging
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .constants import AGNOCOMPLETE_METRICS_SINKS
+
+logger = logging.getLogger(__name__)
+
+
+class Timings:
+    """
+    Collect the durations of the different phases of a request.
+
+    Durations are expressed in seconds. If a phase is entered several times,
+    its durations are added.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.count = None
+        self.cache_hit = None
+
+    def add(self, name, duration):
+        """
+        Add a duration to the given phase.
+        """
+        self.phases[name] = self.phases.get(name, 0) + duration
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def as_server_timing(self):
+        """
+        Return the phases formatted as a ``Server-Timing`` header value.
+        """
+        return ', '.join(
+            '{};dur={:.3f}'.format(name, duration * 1000)
+            for name, duration in self.phases.items()
+        )
+
+
+class MetricsSink:
+    """
+    Base class for the metrics sinks.
+
+    Sinks are listed, as dotted paths, in the ``AGNOCOMPLETE_METRICS_SINKS``
+    setting. They are instantiated once, and their :meth:`record` method is
+    called at the end of every agnocomplete request.
+    """
+
+    def record(self, slug, timings, status):
+        """
+        Record the metrics of a request.
+
+        * ``slug``: the agnocomplete slug, or None for the catalog view,
+        * ``timings``: a :class:`Timings` instance,
+        * ``status``: the response HTTP status code.
+        """
+        raise NotImplementedError(
+            "Integrator: You must implement a `record` method")
+
+
+class LoggingMetricsSink(MetricsSink):
+    """
+    Metrics sink that logs the request timings, at the DEBUG level.
+    """
+
+    def record(self, slug, timings, status):
+        logger.debug(
+            'agnocomplete `%s` [%s]: %s (count=%s, cache_hit=%s)',
+            slug, status, timings.as_server_timing(),
+            timings.count, timings.cache_hit,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_metrics_sinks():
+    """
+    Return the metrics sink instances defined in the settings.
+    """
+    paths = getattr(
+        settings, 'AGNOCOMPLETE_METRICS_SINKS', AGNOCOMPLETE_METRICS_SINKS)
+    return tuple(import_string(path)() for path in paths)
+
+
+def record_metrics(slug, timings, status):
+    """
+    Send the request metrics to every metrics sink.
+
+    A failing sink is logged and never breaks the response.
+    """
+    for sink in get_metrics_sinks():
+        try:
+            sink.record(slug, timings, status)
+        except Exception:
+            logger.exception('Metrics sink %r failed', sink)
+
+
+@receiver(setting_changed)
+def reset_metrics_sinks(setting, **kwargs):
+    if setting == 'AGNOCOMPLETE_METRICS_SINKS':
+        get_metrics_sinks.cache_clear()
@@ -0,0 +1,53 @@
+"""
+Prebuild the client-side manifests as static files.
+"""
+import glob
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...constants import AGNOCOMPLETE_JSON_ENCODER
+from ...constants import AGNOCOMPLETE_MANIFEST_ROOT
+from ...encoders import get_json_encoder
+from ...manifest import MANIFEST_STATIC_DIR
+from ...manifest import get_client_side_classes, write_manifest
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the manifests of the registered `client_side` agnocomplete "
+        "classes in a static files directory, to be collected by "
+        "collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None,
+            help="Static files directory to write the manifests to "
+                 "(default: the AGNOCOMPLETE_MANIFEST_ROOT setting).")
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Remove the previous versions of the manifests.")
+
+    def handle(self, *args, **options):
+        root = options['output'] or getattr(
+            settings, 'AGNOCOMPLETE_MANIFEST_ROOT', AGNOCOMPLETE_MANIFEST_ROOT)
+        if not root:
+            raise CommandError(
+                "Use the --output option or the AGNOCOMPLETE_MANIFEST_ROOT "
+                "setting")
+        directory = os.path.join(root, *MANIFEST_STATIC_DIR.split('/'))
+        os.makedirs(directory, exist_ok=True)
+        encoder = get_json_encoder(getattr(
+            settings, 'AGNOCOMPLETE_JSON_ENCODER', AGNOCOMPLETE_JSON_ENCODER))
+        for slug, klass in sorted(get_client_side_classes().items()):
+            instance = klass()
+            path = write_manifest(instance, directory, encoder)
+            if options['clear']:
+                pattern = os.path.join(
+                    directory, '{}.*.json'.format(glob.escape(slug)))
+                for previous in glob.glob(pattern):
+                    if previous != path:
+                        os.remove(previous)
+            self.stdout.write("Wrote {}".format(path))
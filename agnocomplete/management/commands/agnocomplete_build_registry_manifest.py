@@ -0,0 +1,66 @@
+"""
+Build the manifest of the lazy agnocomplete registry.
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import autodiscover
+from ...cache import get_cache_invalidation_models
+from ...constants import AGNOCOMPLETE_REGISTRY_MANIFEST
+from ...register import get_agnocomplete_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the dotted paths of the registered agnocomplete classes, by "
+        "slug, and the models invalidating their result cache, in the "
+        "registry manifest used by the lazy registry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None,
+            help="Path of the manifest "
+                 "(default: the AGNOCOMPLETE_REGISTRY_MANIFEST setting).")
+
+    def get_manifest(self):
+        """
+        Return the dotted paths of the registered classes, by slug, and the
+        labels of the models invalidating their result cache.
+        """
+        # In lazy mode, the autocomplete modules haven't been imported
+        autodiscover()
+        classes = {}
+        cache_invalidation = {}
+        for slug, klass in sorted(get_agnocomplete_registry().items()):
+            if '<locals>' in klass.__qualname__:
+                self.stderr.write(
+                    "Skipping {}: it can't be imported".format(slug))
+                continue
+            classes[slug] = '{}.{}'.format(
+                klass.__module__, klass.__qualname__)
+            models = get_cache_invalidation_models(klass)
+            if models:
+                cache_invalidation[slug] = models
+        return {
+            'classes': classes,
+            'cache_invalidation': cache_invalidation,
+        }
+
+    def handle(self, *args, **options):
+        path = options['output'] or getattr(
+            settings, 'AGNOCOMPLETE_REGISTRY_MANIFEST',
+            AGNOCOMPLETE_REGISTRY_MANIFEST)
+        if not path:
+            raise CommandError(
+                "Use the --output option or the "
+                "AGNOCOMPLETE_REGISTRY_MANIFEST setting")
+        manifest = self.get_manifest()
+        with open(path, 'w') as fd:
+            json.dump(manifest, fd, indent=2, sort_keys=True)
+            fd.write('\n')
+        self.stdout.write(
+            "Wrote {} agnocomplete classes to {}".format(
+                len(manifest['classes']), path))
@@ -0,0 +1,103 @@
+"""
+Create the database indexes needed by the agnocomplete search backends.
+"""
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ...core import AgnocompleteModel
+from ...register import get_agnocomplete_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the PostgreSQL indexes (trigram, full-text) needed by the "
+        "search backends of the registered agnocomplete classes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database alias to create the indexes on.")
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Print the SQL statements instead of executing them.")
+        parser.add_argument(
+            '--concurrently', action='store_true',
+            help="Use CREATE INDEX CONCURRENTLY (no table lock).")
+
+    def get_model(self, klass):
+        try:
+            return klass().get_model()
+        except Exception:
+            return None
+
+    def get_indexes(self):
+        """
+        Return the (model, index) pairs and the extensions needed, by
+        registered class.
+        """
+        indexes = {}
+        extensions = set()
+        for slug, klass in sorted(get_agnocomplete_registry().items()):
+            if not issubclass(klass, AgnocompleteModel):
+                continue
+            fields = klass.fields
+            if not isinstance(fields, (list, tuple)):
+                continue
+            model = self.get_model(klass)
+            if model is None:
+                self.stderr.write(
+                    "Skipping `{}`: unable to determine its model".format(
+                        slug))
+                continue
+            backend = klass.get_search_backend()
+            for index in backend.get_indexes(model, fields):
+                indexes.setdefault(index.name, (model, index))
+                extensions.update(backend.extensions)
+        return list(indexes.values()), sorted(extensions)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                "Search backend indexes are only supported on PostgreSQL"
+                " (database `{}` is {})".format(
+                    options['database'], connection.vendor))
+
+        if options['concurrently'] and django.VERSION[:2] < (3, 0):
+            raise CommandError("--concurrently requires Django 3.0+")
+
+        indexes, extensions = self.get_indexes()
+        if not indexes:
+            self.stdout.write("No index to create.")
+            return
+
+        dry_run = options['dry_run']
+        concurrently = options['concurrently']
+        with connection.cursor() as cursor:
+            existing = set()
+            for table in {model._meta.db_table for model, _ in indexes}:
+                existing.update(connection.introspection.get_constraints(
+                    cursor, table))
+
+        with connection.schema_editor(
+                collect_sql=dry_run, atomic=not concurrently) as editor:
+            for extension in extensions:
+                editor.execute(
+                    'CREATE EXTENSION IF NOT EXISTS {}'.format(
+                        editor.quote_name(extension)))
+            for model, index in indexes:
+                if index.name in existing:
+                    if options['verbosity'] > 1:
+                        self.stdout.write(
+                            "Index {} already exists".format(index.name))
+                    continue
+                editor.add_index(model, index, concurrently=concurrently)
+                if not dry_run:
+                    self.stdout.write("Created index {} on {}".format(
+                        index.name, model._meta.db_table))
+
+        if dry_run:
+            for statement in editor.collected_sql:
+                self.stdout.write(statement)
@@ -0,0 +1,86 @@
+"""
+Agnocomplete client-side manifests
+
+The full value/label list of a small ``AgnocompleteChoices`` class flagged
+``client_side`` is sent to the browser once, in a manifest whose URL includes
+a hash of its content, and filtered there.
+"""
+import os
+
+from django.conf import settings
+from django.templatetags.static import static
+from django.urls import reverse
+
+from . import get_namespace
+from .constants import AGNOCOMPLETE_MANIFEST_STATIC
+from .core import AgnocompleteChoices
+from .register import get_agnocomplete_registry
+
+"Directory of the prebuilt manifests, relative to the static root"
+MANIFEST_STATIC_DIR = 'agnocomplete/manifests'
+
+
+def is_client_side(klass_or_instance):
+    """
+    Return True if the agnocomplete class (or instance) has a manifest.
+    """
+    klass = klass_or_instance
+    if not isinstance(klass, type):
+        klass = type(klass_or_instance)
+    if not issubclass(klass, AgnocompleteChoices):
+        return False
+    return bool(klass_or_instance.client_side)
+
+
+def get_manifest(instance):
+    """
+    Return the manifest payload of an agnocomplete instance.
+    """
+    return {
+        'version': instance.get_content_version(),
+        'data': instance.get_manifest_items(),
+    }
+
+
+def get_manifest_filename(instance):
+    """
+    Return the content-hashed file name of the manifest.
+    """
+    return '{}.{}.json'.format(instance.slug, instance.get_content_version())
+
+
+def get_manifest_url(instance):
+    """
+    Return the URL of the manifest: the prebuilt static file if the
+    ``AGNOCOMPLETE_MANIFEST_STATIC`` setting is True, the manifest view
+    otherwise.
+    """
+    if getattr(settings, 'AGNOCOMPLETE_MANIFEST_STATIC',
+               AGNOCOMPLETE_MANIFEST_STATIC):
+        return static('{}/{}'.format(
+            MANIFEST_STATIC_DIR, get_manifest_filename(instance)))
+    return reverse(
+        '{}:manifest'.format(get_namespace()),
+        args=[instance.slug, instance.get_content_version()],
+    )
+
+
+def get_client_side_classes():
+    """
+    Return the registered classes having a manifest, by slug.
+    """
+    return {
+        slug: klass
+        for slug, klass in get_agnocomplete_registry().items()
+        if is_client_side(klass)
+    }
+
+
+def write_manifest(instance, directory, encoder):
+    """
+    Write the manifest of the instance in the directory, and return its path.
+    """
+    path = os.path.join(directory, get_manifest_filename(instance))
+    with open(path, 'wb') as fd:
+        fd.write(encoder.encode(get_manifest(instance)))
+    return path
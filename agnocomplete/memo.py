@@ -0,0 +1,60 @@
+"""
+Agnocomplete request-scoped memo
+
+Within a request, the selected objects of the model autocompletes are
+fetched once per id set, and shared by the field validation and the widget
+rendering (e.g. when an invalid form is displayed again).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_selected_memo = ContextVar('agnocomplete_selected_memo', default=None)
+
+
+def get_selected_memo():
+    """
+    Return the memo dictionary of the current request, or None if there's
+    no active memo.
+    """
+    return _selected_memo.get()
+
+
+@contextmanager
+def selected_memo():
+    """
+    Context manager activating a new memo, cleared when it exits.
+
+    Use it to get the memo outside of the requests (e.g. in a task).
+    """
+    token = _selected_memo.set({})
+    try:
+        yield
+    finally:
+        _selected_memo.reset(token)
+
+
+def memoize_selected(key, fetch):
+    """
+    Return the memoized value of the key, computed by the ``fetch`` function
+    the first time it's needed. Without active memo, ``fetch()`` is
+    returned.
+    """
+    memo = get_selected_memo()
+    if memo is None:
+        return fetch()
+    if key not in memo:
+        memo[key] = fetch()
+    return memo[key]
+
+
+class SelectedMemoMiddleware:
+    """
+    Activate the selected objects memo for the duration of each request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with selected_memo():
+            return self.get_response(request)
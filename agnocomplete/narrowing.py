@@ -0,0 +1,98 @@
+"""
+Agnocomplete incremental narrowing
+
+Queries usually arrive as a growing prefix sequence ("jo", "joh", "john").
+If the candidates of a short query are few enough, they're remembered and the
+longer queries are answered by filtering them in memory.
+"""
+from collections import namedtuple
+from threading import Lock
+
+from django.conf import settings
+from django.utils.encoding import force_str as text
+
+from .cache import LRUCache
+from .constants import AGNOCOMPLETE_NARROWING_MAXSIZE
+
+"Lookups whose matches for a query include the matches of its extensions"
+NARROWING_LOOKUPS = ('icontains', 'istartswith')
+
+"A remembered row: its item, its cursor position and its searched texts"
+Candidate = namedtuple('Candidate', 'item position texts')
+
+
+def _normalize(value):
+    if value is None:
+        return None
+    return text(value).casefold()
+
+
+class CandidateSet:
+    """
+    The complete, ordered list of the candidates matching a query.
+    """
+
+    def __init__(self, lookups, candidates):
+        self.lookups = tuple(lookups)
+        self.candidates = [
+            Candidate(item, position, tuple(_normalize(t) for t in texts))
+            for item, position, texts in candidates
+        ]
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def match(self, candidate, query):
+        """
+        Return True if the candidate matches the (normalized) query.
+        """
+        for lookup, value in zip(self.lookups, candidate.texts):
+            if value is None:
+                continue
+            if lookup == 'istartswith':
+                if value.startswith(query):
+                    return True
+            elif query in value:
+                return True
+        return False
+
+    def page(self, query, page_size, after=None):
+        """
+        Return the candidates of the page and a boolean telling if there are
+        more matches, or None if the cursor position is unknown.
+        """
+        query = _normalize(query)
+        candidates = iter(self.candidates)
+        if after is not None:
+            for candidate in candidates:
+                if candidate.position == after:
+                    break
+            else:
+                return None
+        page = []
+        for candidate in candidates:
+            if not self.match(candidate, query):
+                continue
+            if len(page) == page_size:
+                return page, True
+            page.append(candidate)
+        return page, False
+
+
+# Process-wide candidate sets cache
+_narrowing_cache = None
+_narrowing_cache_lock = Lock()
+
+
+def get_narrowing_cache():
+    """
+    Return the process-wide, size-bounded cache of the candidate sets.
+    """
+    global _narrowing_cache
+    if _narrowing_cache is None:
+        with _narrowing_cache_lock:
+            if _narrowing_cache is None:
+                _narrowing_cache = LRUCache(maxsize=getattr(
+                    settings, 'AGNOCOMPLETE_NARROWING_MAXSIZE',
+                    AGNOCOMPLETE_NARROWING_MAXSIZE))
+    return _narrowing_cache
@@ -0,0 +1,94 @@
+"""
+Agnocomplete cursor pagination
+"""
+import json
+
+from django.core import signing
+from django.core.exceptions import SuspiciousOperation
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+CURSOR_SALT = 'agnocomplete.cursor'
+
+
+class InvalidCursor(SuspiciousOperation):
+    """
+    Occurs when the cursor has been tampered with, or is malformed.
+    """
+    pass
+
+
+class CursorSerializer:
+    """
+    JSON serializer accepting dates, decimals, UUIDs, etc.
+    """
+    def dumps(self, obj):
+        return json.dumps(
+            obj, separators=(',', ':'), cls=DjangoJSONEncoder,
+        ).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def encode_cursor(position):
+    """
+    Return the opaque (signed) cursor for the given position.
+
+    ``position`` must be JSON-serializable.
+    """
+    return signing.dumps(
+        position, salt=CURSOR_SALT, serializer=CursorSerializer)
+
+
+def decode_cursor(cursor):
+    """
+    Return the position of the given cursor.
+    """
+    try:
+        return signing.loads(
+            cursor, salt=CURSOR_SALT, serializer=CursorSerializer)
+    except (signing.BadSignature, ValueError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def normalize_position(position):
+    """
+    Return the position as it is once decoded from a cursor (e.g. dates are
+    strings).
+    """
+    serializer = CursorSerializer()
+    return serializer.loads(serializer.dumps(position))
+
+
+def get_keyset_filter(ordering, values, nullable=(), nulls_largest=False):
+    """
+    Return the condition selecting the rows that come after the given values
+    in the ordering.
+
+    ``ordering`` is a list of field names, optionally prefixed by ``-``.
+    ``nullable`` lists the names of the fields that may be NULL, and
+    ``nulls_largest`` tells if the database sorts the NULLs as larger than
+    any other value (e.g. PostgreSQL) or as smaller (e.g. SQLite, MySQL).
+    """
+    conditions = Q()
+    equals = Q()
+    for name, value in zip(ordering, values):
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        # Do the NULLs come after the other values in this direction?
+        nulls_after = nulls_largest != descending
+        if value is None:
+            after = None if nulls_after else Q(
+                **{'{}__isnull'.format(name): False})
+            equal = Q(**{'{}__isnull'.format(name): True})
+        else:
+            lookup = 'lt' if descending else 'gt'
+            after = Q(**{'{}__{}'.format(name, lookup): value})
+            if nulls_after and name in nullable:
+                after |= Q(**{'{}__isnull'.format(name): True})
+            equal = Q(**{name: value})
+        if after is not None:
+            conditions |= equals & after
+        equals &= equal
+    return conditions
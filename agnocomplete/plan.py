@@ -0,0 +1,96 @@
+"""
+Agnocomplete compiled query plans
+
+The ``fields`` of an :class:`agnocomplete.core.AgnocompleteModel` class are
+parsed and validated once per class. Searching then only binds the query to
+the precomputed filter keywords.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db.models import Q
+from django.dispatch import receiver
+
+from .search import split_field_name
+
+
+class QueryPlan:
+    """
+    Immutable, precomputed search plan of an agnocomplete class.
+    """
+    __slots__ = ('lookups', 'filter_keys')
+
+    def __init__(self, fields):
+        lookups = tuple(split_field_name(field) for field in fields)
+        filter_keys = tuple(
+            '{}__{}'.format(name, lookup) for lookup, name in lookups)
+        object.__setattr__(self, 'lookups', lookups)
+        object.__setattr__(self, 'filter_keys', filter_keys)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QueryPlan objects are immutable")
+
+    def __repr__(self):
+        return '<QueryPlan: {}>'.format(', '.join(self.filter_keys))
+
+    def get_filters(self, query):
+        """
+        Return the search condition for the query.
+        """
+        return Q(*((key, query) for key in self.filter_keys), _connector=Q.OR)
+
+
+def check_field_name(model, name):
+    """
+    Raise ImproperlyConfigured if the field name (that may span relations)
+    doesn't start with a field of the model.
+    """
+    opts = model._meta
+    for index, part in enumerate(name.split('__')):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            if index == 0:
+                raise ImproperlyConfigured(
+                    "Integrator: `{}` is not a field of the `{}` model".format(
+                        name, opts.label))
+            # Probably a transform, e.g. `name__unaccent`
+            return
+        if field.related_model is None:
+            return
+        opts = field.related_model._meta
+
+
+def compile_plan(model, fields):
+    """
+    Return the query plan of the fields, validated against the model, if
+    it's known.
+    """
+    plan = QueryPlan(fields)
+    if model is not None:
+        for _, name in plan.lookups:
+            check_field_name(model, name)
+    return plan
+
+
+# Compiled plans, per agnocomplete class
+_plans = {}
+
+
+def get_query_plan(klass, model, fields):
+    """
+    Return the (cached) query plan of an agnocomplete class.
+    """
+    plan = _plans.get(klass)
+    if plan is None:
+        plan = _plans[klass] = compile_plan(model, fields)
+    return plan
+
+
+def clear_query_plans():
+    _plans.clear()
+
+
+@receiver(setting_changed)
+def reset_query_plans(setting, **kwargs):
+    if setting.startswith('AGNOCOMPLETE_'):
+        clear_query_plans()
@@ -1,18 +1,234 @@
 """
 Registry handling
 """
+from hashlib import sha1
+import json
 import logging
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
 logger = logging.getLogger(__name__)
 
-AGNOCOMPLETE_REGISTRY = {}
+
+class AgnocompleteRegistry(dict):
+    """
+    The registered agnocomplete classes, by slug.
+
+    The registry is frozen once the apps are ready. Its slugs, the metadata
+    of its classes and its version are computed once, on first use, and
+    recomputed only if the registry is modified.
+
+    In lazy mode, the classes listed in the registry manifest are imported
+    the first time their slug is looked up. Listing the registry (e.g. its
+    ``items()``) imports all of them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frozen = False
+        # Dotted paths of the classes to import on first use, by slug
+        self.lazy = {}
+
+    def register(self, klass):
+        "Register a class into the registry."
+        if self.frozen and klass.slug not in self:
+            logger.warning(
+                "registering {} after the registry was frozen".format(
+                    klass.__name__))
+        self[klass.slug] = klass
+
+    def add_lazy(self, paths):
+        "Add classes to be imported on first use, as dotted paths by slug."
+        self.lazy.update(
+            (slug, path) for slug, path in paths.items()
+            if not dict.__contains__(self, slug))
+        self.clear_compiled()
+
+    def load(self, slug):
+        """
+        Import the class of a lazy slug. Its module usually registers it,
+        along with the other classes it defines.
+        """
+        path = self.lazy[slug]
+        try:
+            klass = import_string(path)
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "Cannot import the agnocomplete class `{}` ({}): the "
+                "registry manifest is outdated, rebuild it using the "
+                "`agnocomplete_build_registry_manifest` command".format(
+                    slug, path)) from exc
+        if not super().__contains__(slug):
+            self[slug] = klass
+        self.lazy.pop(slug, None)
+
+    def load_all(self):
+        "Import all the lazy classes."
+        for slug in list(self.lazy):
+            if slug in self.lazy:
+                self.load(slug)
+
+    def freeze(self):
+        "Mark the registry as complete."
+        self.frozen = True
+        self.clear_compiled()
+
+    def clear_compiled(self):
+        "Clear the computed slugs, metadata and version."
+        for name in ('slugs', 'metadata', 'version'):
+            self.__dict__.pop(name, None)
+
+    @cached_property
+    def slugs(self):
+        "Return the registered slugs."
+        return tuple(self.keys())
+
+    @cached_property
+    def metadata(self):
+        "Return the metadata of the registered classes, by slug."
+        return {slug: klass.get_metadata() for slug, klass in self.items()}
+
+    @cached_property
+    def version(self):
+        """
+        Return a hash of the registered classes and of their metadata.
+
+        It changes if a class is added, removed or reconfigured, e.g.
+        between two deployments.
+        """
+        content = sorted(
+            (slug, '{}.{}'.format(klass.__module__, klass.__qualname__),
+             self.metadata[slug])
+            for slug, klass in self.items()
+        )
+        return sha1(
+            json.dumps(content, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    # Looking up a lazy slug imports its class
+    def __missing__(self, key):
+        if key not in self.lazy:
+            raise KeyError(key)
+        self.load(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        return super().__contains__(key) or key in self.lazy
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    # Listing the registry imports all the lazy classes
+    def __iter__(self):
+        self.load_all()
+        return super().__iter__()
+
+    def __len__(self):
+        self.load_all()
+        return super().__len__()
+
+    def keys(self):
+        self.load_all()
+        return super().keys()
+
+    def values(self):
+        self.load_all()
+        return super().values()
+
+    def items(self):
+        self.load_all()
+        return super().items()
+
+    def copy(self):
+        self.load_all()
+        return super().copy()
+
+    # Modifying the registry clears the computed values
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.lazy.pop(key, None)
+        self.clear_compiled()
+
+    def __delitem__(self, key):
+        if key in self.lazy:
+            self.load(key)
+        super().__delitem__(key)
+        self.clear_compiled()
+
+    def clear(self):
+        super().clear()
+        self.lazy.clear()
+        self.clear_compiled()
+
+    def pop(self, key, *args):
+        if key in self.lazy:
+            self.load(key)
+        value = super().pop(key, *args)
+        self.clear_compiled()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self.clear_compiled()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self.clear_compiled()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.clear_compiled()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self.clear_compiled()
+        return result
+
+
+AGNOCOMPLETE_REGISTRY = AgnocompleteRegistry()
 
 
 def register(klass):
     "Register a class into the agnocomplete registry."
     logger.info("registering {}".format(klass.__name__))
-    AGNOCOMPLETE_REGISTRY[klass.slug] = klass
+    if apps.models_ready:
+        # Fail early if the class is misconfigured
+        klass.compile()
+    AGNOCOMPLETE_REGISTRY.register(klass)
 
 
 def get_agnocomplete_registry():
     "Get the registered agnostic autocompletes."
     return AGNOCOMPLETE_REGISTRY
+
+
+def load_registry_manifest(path):
+    """
+    Return the registry manifest content, or None if the file doesn't exist.
+
+    It contains the dotted paths of the classes by slug (``classes``), and
+    the labels of the models invalidating their result cache, by slug
+    (``cache_invalidation``).
+    """
+    try:
+        with open(path) as fd:
+            return json.load(fd)
+    except FileNotFoundError:
+        return None
+
+
+@receiver(setting_changed)
+def clear_registry_metadata(setting, **kwargs):
+    "The metadata depend on the size and URL settings."
+    if setting.startswith('AGNOCOMPLETE_') or setting == 'ROOT_URLCONF':
+        AGNOCOMPLETE_REGISTRY.clear_compiled()
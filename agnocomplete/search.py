@@ -0,0 +1,253 @@
+"""
+Agnocomplete search backends
+
+A search backend filters (and eventually orders) the queryset of an
+:class:`agnocomplete.core.AgnocompleteModel` using the search query. It may
+also provide the database indexes that speed up its lookups.
+"""
+from functools import lru_cache
+from hashlib import sha1
+import re
+
+import django
+from django.apps import apps
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, Q
+from django.db.models.functions import Greatest, Upper
+from django.utils.module_loading import import_string
+
+"Field name prefixes and their matching lookups"
+FIELD_LOOKUPS = {
+    '^': 'istartswith',
+    '=': 'iexact',
+    '@': 'search',
+}
+DEFAULT_LOOKUP = 'icontains'
+
+
+def split_field_name(field_name):
+    """
+    Return the lookup and the actual field name of a field name optionally
+    prefixed by `^`, `=`, `@`.
+    """
+    lookup = FIELD_LOOKUPS.get(field_name[:1])
+    if lookup:
+        return lookup, field_name[1:]
+    return DEFAULT_LOOKUP, field_name
+
+
+class SearchBackend:
+    """
+    Base class for the search backends.
+    """
+    # PostgreSQL extensions needed by this backend
+    extensions = ()
+
+    def filter(self, agnocomplete, queryset, query):
+        """
+        Return the queryset filtered using the search query.
+        """
+        raise NotImplementedError(
+            "Integrator: You must implement a `filter` method")
+
+    def get_indexes(self, model, fields):
+        """
+        Return the database indexes to create for these fields.
+        """
+        return []
+
+    def get_index_name(self, model, kind, names):
+        """
+        Return a deterministic index name, valid for Django indexes.
+        """
+        signature = '{}:{}:{}'.format(
+            model._meta.db_table, kind, ','.join(names))
+        return 'agno_{}_{}'.format(
+            kind, sha1(signature.encode('utf-8')).hexdigest()[:16])
+
+    def get_field_names(self, fields, local=False):
+        """
+        Return the field names, without their lookup prefix.
+
+        If ``local`` is True, the fields that span relations are skipped.
+        """
+        names = [split_field_name(field)[1] for field in fields]
+        if local:
+            names = [name for name in names if '__' not in name]
+        return names
+
+
+class QSearchBackend(SearchBackend):
+    """
+    Default search backend: the field lookups are joined using ``OR``.
+
+    See :meth:`agnocomplete.core.AgnocompleteModel.get_queryset_filters`.
+    """
+
+    def filter(self, agnocomplete, queryset, query):
+        return queryset.filter(agnocomplete.get_queryset_filters(query))
+
+
+class UpperTrigramIndex(GinIndex):
+    """
+    GIN trigram index on ``UPPER(field)``, for Django < 4.1 (no ``OpClass``).
+
+    Case-insensitive lookups compile to ``UPPER(field) LIKE ...`` on
+    PostgreSQL; this index is only created by raw SQL, it can't be used in
+    migrations.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        quote_name = schema_editor.quote_name
+        column = model._meta.get_field(self.fields[0]).column
+        sql = 'CREATE INDEX {}{} ON {} USING gin (UPPER({}) gin_trgm_ops)'
+        return sql.format(
+            'CONCURRENTLY ' if kwargs.get('concurrently') else '',
+            quote_name(self.name),
+            quote_name(model._meta.db_table),
+            quote_name(column),
+        )
+
+
+class TrigramSearchBackend(SearchBackend):
+    """
+    PostgreSQL search backend using the ``pg_trgm`` extension.
+
+    Rows matching the field lookups, or similar to the query (typo-tolerant),
+    are returned, the most similar first. Its GIN indexes support both the
+    ``LIKE`` lookups and the similarity operator.
+
+    Before Django 4.0, the similarity operator is the ``trigram_similar``
+    lookup, registered by ``django.contrib.postgres``.
+    """
+    extensions = ('pg_trgm',)
+
+    def get_similar_filter(self, name, query):
+        """
+        Return the condition matching the rows similar to the query.
+        """
+        if django.VERSION[:2] >= (4, 0):
+            from django.contrib.postgres.lookups import TrigramSimilar
+            return Q(TrigramSimilar(F(name), query))
+        if not apps.is_installed('django.contrib.postgres'):
+            raise ImproperlyConfigured(
+                "TrigramSearchBackend requires `django.contrib.postgres` in"
+                " INSTALLED_APPS before Django 4.0")
+        return Q(**{'{}__trigram_similar'.format(name): query})
+
+    def filter(self, agnocomplete, queryset, query):
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        names = self.get_field_names(agnocomplete.fields)
+        conditions = agnocomplete.get_queryset_filters(query)
+        for name in names:
+            conditions |= self.get_similar_filter(name, query)
+        similarities = [TrigramSimilarity(name, query) for name in names]
+        if len(similarities) > 1:
+            rank = Greatest(*similarities)
+        else:
+            rank = similarities[0]
+        return queryset.filter(conditions).annotate(
+            agnocomplete_rank=rank).order_by('-agnocomplete_rank')
+
+    def get_indexes(self, model, fields):
+        indexes = []
+        for name in self.get_field_names(fields, local=True):
+            # Similarity operator
+            indexes.append(GinIndex(
+                fields=[name],
+                opclasses=['gin_trgm_ops'],
+                name=self.get_index_name(model, 'trgm', [name]),
+            ))
+            # Case-insensitive LIKE lookups, i.e. UPPER(field) LIKE ...
+            indexes.append(self.get_upper_index(
+                name, self.get_index_name(model, 'utrgm', [name])))
+        return indexes
+
+    def get_upper_index(self, name, index_name):
+        """
+        Return the trigram index on ``UPPER(name)``.
+        """
+        if django.VERSION[:2] < (4, 1):
+            return UpperTrigramIndex(fields=[name], name=index_name)
+        from django.contrib.postgres.indexes import OpClass
+        return GinIndex(
+            OpClass(Upper(name), name='gin_trgm_ops'), name=index_name)
+
+
+class FullTextSearchBackend(SearchBackend):
+    """
+    PostgreSQL search backend using the full-text search.
+
+    Every word of the query is a prefix search in the search vector built
+    from the fields. Results are ordered by rank.
+    """
+    "Text search configuration"
+    config = 'simple'
+
+    def get_search_vector(self, names):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector(*names, config=self.config)
+
+    def get_search_query(self, query):
+        """
+        Return the search query, or None if the query has no word.
+        """
+        from django.contrib.postgres.search import SearchQuery
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        return SearchQuery(
+            ' & '.join('{}:*'.format(word) for word in words),
+            config=self.config,
+            search_type='raw',
+        )
+
+    def filter(self, agnocomplete, queryset, query):
+        from django.contrib.postgres.search import SearchRank
+
+        search_query = self.get_search_query(query)
+        if search_query is None:
+            return queryset.none()
+        vector = self.get_search_vector(
+            self.get_field_names(agnocomplete.fields))
+        return queryset.annotate(
+            agnocomplete_search=vector,
+        ).filter(
+            agnocomplete_search=search_query,
+        ).annotate(
+            agnocomplete_rank=SearchRank(vector, search_query),
+        ).order_by('-agnocomplete_rank')
+
+    def get_indexes(self, model, fields):
+        if django.VERSION[:2] < (3, 2):
+            raise ImproperlyConfigured(
+                "FullTextSearchBackend indexes require Django 3.2+"
+                " (functional indexes)")
+        names = self.get_field_names(fields)
+        if not names or names != self.get_field_names(fields, local=True):
+            # Fields spanning relations can't be indexed
+            return []
+        return [GinIndex(
+            self.get_search_vector(names),
+            name=self.get_index_name(model, 'fts', names + [self.config]),
+        )]
+
+
+@lru_cache(maxsize=None)
+def _load_search_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend(backend):
+    """
+    Return the search backend instance.
+
+    ``backend`` can be a dotted path, a backend class or a backend instance.
+    """
+    if isinstance(backend, str):
+        return _load_search_backend(backend)
+    if isinstance(backend, type):
+        return backend()
+    return backend
@@ -0,0 +1,17 @@
+"""
+Agnocomplete signals
+
+``agnocomplete_request_started`` is sent when an agnocomplete view starts
+handling a request. Arguments: ``request``, ``slug``.
+
+``agnocomplete_request_finished`` is sent when the response is ready.
+Arguments: ``request``, ``slug``, ``status``, ``timings`` (a dictionary of
+phase durations, in seconds), ``count`` (number of items returned) and
+``cache_hit`` (True, False, or None if the result cache is disabled).
+
+The ``sender`` is the view class.
+"""
+from django.dispatch import Signal
+
+agnocomplete_request_started = Signal()
+agnocomplete_request_finished = Signal()
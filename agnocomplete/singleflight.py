@@ -0,0 +1,166 @@
+"""
+Agnocomplete request coalescing ("single-flight")
+
+Identical concurrent computations wait for a single in-flight one and share
+its result.
+"""
+from threading import Event, Lock
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """
+    An in-flight computation.
+    """
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    In-process, thread-safe single-flight group.
+
+    While a computation is running for a key, the other callers for the same
+    key wait for it and get its result (or its exception).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, func):
+        """
+        Return the result of ``func()``, shared by the concurrent callers
+        using the same key.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight group for the coroutines of an event loop.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key, func):
+        """
+        Return the result of ``await func()``, shared by the concurrent
+        callers using the same key.
+
+        The computation runs in its own task: a cancelled caller (e.g. a
+        disconnected client) neither cancels it nor the other callers.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+class CacheSingleFlight:
+    """
+    Cross-process single-flight, using a cache-backed lock.
+
+    The first caller adds a lock key to the cache, holding a flight token,
+    and publishes its result under a key including this token. The other
+    callers poll this result key. If the lock disappears without a result
+    (e.g. the leader failed) or if the ``timeout`` expires, they compute the
+    result themselves.
+    """
+
+    def __init__(self, cache, timeout, interval=0.02):
+        self.cache = cache
+        self.timeout = timeout
+        self.interval = interval
+
+    def do(self, key, func):
+        lock_key = '{}:lock'.format(key)
+        token = uuid4().hex
+        if self.cache.add(lock_key, token, self.timeout):
+            try:
+                result = func()
+                self.cache.set(
+                    '{}:{}'.format(key, token), result, self.timeout)
+                return result
+            finally:
+                self.cache.delete(lock_key)
+
+        token = self.cache.get(lock_key)
+        deadline = time.monotonic() + self.timeout
+        while token is not None and time.monotonic() < deadline:
+            result = self.cache.get('{}:{}'.format(key, token))
+            if result is not None:
+                return result
+            if self.cache.get(lock_key) != token:
+                # The leader has finished: last chance to get its result
+                result = self.cache.get('{}:{}'.format(key, token))
+                if result is not None:
+                    return result
+                break
+            time.sleep(self.interval)
+        logger.info("Single-flight leader result unavailable for `%s`", key)
+        return func()
+
+
+# Process-wide groups
+_group = SingleFlight()
+_async_groups = WeakKeyDictionary()
+
+
+def get_single_flight_group():
+    """
+    Return the process-wide single-flight group.
+    """
+    return _group
+
+
+def get_async_single_flight_group():
+    """
+    Return the single-flight group of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    group = _async_groups.get(loop)
+    if group is None:
+        group = _async_groups[loop] = AsyncSingleFlight()
+    return group
@@ -2,9 +2,12 @@
 Agnostic Autocomplete URLS
 """
 from django.urls import path
-from .views import AgnocompleteView, CatalogView
+from .views import AgnocompleteView, CatalogView, ManifestView
 
 urlpatterns = [
+    path(
+        'manifest/<klass>/<version>.json', ManifestView.as_view(),
+        name='manifest'),
     path('<klass>/', AgnocompleteView.as_view(), name='agnocomplete'),
     path('', CatalogView.as_view(), name='catalog'),
 ]
@@ -2,13 +2,36 @@
 Agnocomplete views.
 """
 from abc import abstractmethod, ABCMeta
+from hashlib import sha1
+from itertools import chain, islice
+from time import perf_counter
+from asgiref.sync import sync_to_async
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.exceptions import PermissionDenied, SuspiciousOperation
-from django.http import Http404, JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.http import HttpResponseRedirect
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.utils.encoding import force_str as text
 from django.utils.functional import cached_property
+from django.utils.http import parse_etags, quote_etag
+from django.urls import reverse
 from django.views.generic import View
 
+from .constants import AGNOCOMPLETE_JSON_ENCODER
+from .constants import AGNOCOMPLETE_MANIFEST_MAX_AGE
+from .constants import AGNOCOMPLETE_SERVER_TIMING
+from .constants import AGNOCOMPLETE_STREAMING
+from .constants import AGNOCOMPLETE_STREAMING_CHUNK_SIZE
+from .encoders import get_json_encoder
+from .manifest import is_client_side
+from . import get_namespace
 from .register import get_agnocomplete_registry
+from .instrumentation import Timings, record_metrics
+from .signals import agnocomplete_request_started
+from .signals import agnocomplete_request_finished
 from .exceptions import (
     AuthenticationRequiredAgnocompleteException,
     ImproperlyConfiguredView
@@ -49,6 +72,10 @@ class AgnocompleteJSONView(View, metaclass=ABCMeta):
     """
     Generic toolbox for JSON-returning views
     """
+    # Stream the JSON payload, fallback to settings if unset
+    streaming = None
+    # JSON encoder: dotted path, class or instance, fallback to settings
+    json_encoder = None
 
     @property
     def content_type(self):
@@ -70,27 +97,297 @@ class AgnocompleteJSONView(View, metaclass=ABCMeta):
     def get_dataset(self, **kwargs):
         pass
 
+    def get_dataset_iterator(self, **kwargs):
+        """
+        Return an iterator over the dataset, used in streaming mode.
+        """
+        return iter(self.get_dataset(**kwargs))
+
+    def is_streaming(self):
+        """
+        Return True if the JSON payload is streamed.
+        """
+        if self.streaming is not None:
+            return self.streaming
+        return getattr(
+            settings, 'AGNOCOMPLETE_STREAMING', AGNOCOMPLETE_STREAMING)
+
     def get_extra_arguments(self):
-        extra = filter(lambda x: x[0] != 'q', self.request.GET.items())
+        extra = filter(
+            lambda x: x[0] not in ('q', 'cursor'), self.request.GET.items())
         return dict(extra)
 
-    def get(self, *args, **kwargs):
+    def get_json_encoder(self):
+        """
+        Return the JSON encoder of the responses.
+        """
+        encoder = self.json_encoder
+        if encoder is None:
+            encoder = getattr(
+                settings, 'AGNOCOMPLETE_JSON_ENCODER',
+                AGNOCOMPLETE_JSON_ENCODER)
+        return get_json_encoder(encoder)
+
+    def render_json(self, payload, status=200):
+        """
+        Return the response for the given JSON payload.
+        """
+        return HttpResponse(
+            self.get_json_encoder().encode(payload),
+            content_type=self.content_type,
+            status=status,
+        )
+
+    def get_payload(self, dataset):
+        """
+        Return the JSON payload for the given dataset.
+        """
+        return {'data': dataset}
+
+    def render_dataset(self, dataset):
+        """
+        Return the JSON response for the given dataset.
+        """
+        return self.render_json(self.get_payload(dataset))
+
+    def render_stream(self, items):
+        """
+        Return the streaming JSON response for the given items iterator.
+        """
+        return StreamingHttpResponse(
+            self.iter_json(items),
+            content_type=self.content_type,
+        )
+
+    def iter_json(self, items):
+        """
+        Yield the chunks of the JSON payload, encoding the items as they come.
+
+        The other keys of the payload are encoded after the items, since they
+        may depend on them (e.g. the next page cursor). The request is
+        recorded once the payload has been sent.
+        """
+        encoder = self.get_json_encoder()
+        chunk_size = getattr(
+            settings, 'AGNOCOMPLETE_STREAMING_CHUNK_SIZE',
+            AGNOCOMPLETE_STREAMING_CHUNK_SIZE)
+        start = perf_counter()
+        count = 0
+        status = 500
+        try:
+            chunk = [b'{"data":[']
+            for item in items:
+                if count:
+                    chunk.append(b',')
+                chunk.append(encoder.encode(item))
+                count += 1
+                if count % chunk_size == 0:
+                    yield b''.join(chunk)
+                    chunk = []
+            chunk.append(b']')
+            payload = self.get_payload(None)
+            del payload['data']
+            for key, value in payload.items():
+                chunk.extend((
+                    b',', encoder.encode(key), b':', encoder.encode(value)))
+            chunk.append(b'}')
+            yield b''.join(chunk)
+            status = 200
+        finally:
+            self.timings.count = count
+            self.timings.add('total', perf_counter() - start)
+            self.record_request(status)
+
+    def get_etag(self):
+        """
+        Return the ETag of the response if it can be computed before the
+        dataset, or None.
+        """
+        return None
+
+    def get_cache_control(self):
+        """
+        Return the ``Cache-Control`` directives of the successful responses,
+        as a dictionary, or None if they should not be cached.
+        """
+        return None
+
+    def get_vary_headers(self):
+        """
+        Return the request headers the response depends on.
+        """
+        # The content type depends on this header
+        return ('X-Requested-With',)
+
+    def is_not_modified(self, etag):
+        """
+        Return True if the ETag matches the ``If-None-Match`` request header.
+        """
+        header = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if etag is None or not header:
+            return False
+        etags = [
+            value[2:] if value.startswith('W/') else value
+            for value in parse_etags(header)
+        ]
+        return '*' in etags or quote_etag(etag) in etags
+
+    def get_content_etag(self, response):
+        """
+        Return the ETag of a response, computed from its content.
+        """
+        return sha1(response.content).hexdigest()
+
+    def patch_http_cache(self, response, etag=None):
+        """
+        Add the HTTP caching headers to a successful response.
+        """
+        cache_control = self.get_cache_control()
+        if cache_control is None or response.status_code not in (200, 304):
+            return
+        if etag is not None:
+            response['ETag'] = quote_etag(etag)
+        patch_cache_control(response, **cache_control)
+        patch_vary_headers(response, self.get_vary_headers())
+
+    def render_cached_dataset(self, dataset, etag=None):
+        """
+        Return the response for the given dataset, with the HTTP caching
+        headers.
+
+        If there's no precomputed ETag, it's computed from the response
+        content: a "304 Not Modified" response is returned if it matches.
+        """
+        response = self.render_dataset(dataset)
+        if etag is None and self.get_cache_control() is not None:
+            etag = self.get_content_etag(response)
+            if self.is_not_modified(etag):
+                response = HttpResponseNotModified()
+        self.patch_http_cache(response, etag)
+        return response
+
+    def get_not_modified(self, etag):
+        """
+        Return the "304 Not Modified" response for the given ETag.
+        """
+        response = HttpResponseNotModified()
+        self.patch_http_cache(response, etag)
+        return response
+
+    def render_error(self, exc):
+        """
+        Return the JSON error response for the given exception.
+        """
+        status, message = get_error(exc)
+        return self.render_json(
+            {"errors": [{
+                "title": "An error has occurred",
+                "detail": "{}".format(message)
+            }]},
+            status=status,
+        )
+
+    def get_slug(self):
+        """
+        Return the agnocomplete slug served by this view, if any.
+
+        It's used to identify the request in the instrumentation.
+        """
+        return None
+
+    def start_request(self):
+        """
+        Start the request instrumentation.
+        """
+        self.timings = Timings()
+        self.slug = self.get_slug()
+        agnocomplete_request_started.send(
+            sender=self.__class__, request=self.request, slug=self.slug)
+
+    def record_request(self, status):
+        """
+        Send the request timings to the signal receivers and to the metrics
+        sinks.
+        """
+        timings = self.timings
+        agnocomplete_request_finished.send(
+            sender=self.__class__,
+            request=self.request,
+            slug=self.slug,
+            status=status,
+            timings=dict(timings.phases),
+            count=timings.count,
+            cache_hit=timings.cache_hit,
+        )
+        record_metrics(self.slug, timings, status)
+
+    def set_server_timing(self, response):
+        """
+        Add the ``Server-Timing`` header if the ``AGNOCOMPLETE_SERVER_TIMING``
+        setting is True.
+        """
+        if getattr(settings, 'AGNOCOMPLETE_SERVER_TIMING',
+                   AGNOCOMPLETE_SERVER_TIMING):
+            response['Server-Timing'] = self.timings.as_server_timing()
+
+    def finish_request(self, response):
+        """
+        Send the request timings to the signal receivers and to the metrics
+        sinks, and return the response.
+
+        The ``Server-Timing`` header is added if the
+        ``AGNOCOMPLETE_SERVER_TIMING`` setting is True.
+        """
+        self.record_request(response.status_code)
+        self.set_server_timing(response)
+        return response
+
+    def get_stream(self):
+        """
+        Return the streaming response.
+
+        The first item is fetched before the response starts, so the errors
+        (e.g. a denied access) still get their error response. The timings
+        are sent once the payload has been streamed, but the
+        ``Server-Timing`` header only includes the phases that happened
+        before.
+        """
+        start = perf_counter()
         try:
-            dataset = self.get_dataset(**self.get_extra_arguments())
-            return JsonResponse(
-                {'data': dataset},
-                content_type=self.content_type,
-            )
+            etag = self.get_etag()
+            if self.is_not_modified(etag):
+                response = self.get_not_modified(etag)
+                self.timings.add('total', perf_counter() - start)
+                return self.finish_request(response)
+            items = self.get_dataset_iterator(**self.get_extra_arguments())
+            first = list(islice(items, 1))
         except Exception as exc:
-            status, message = get_error(exc)
-            return JsonResponse(
-                {"errors": [{
-                    "title": "An error has occurred",
-                    "detail": "{}".format(message)
-                }]},
-                content_type=self.content_type,
-                status=status,
-            )
+            response = self.render_error(exc)
+            self.timings.add('total', perf_counter() - start)
+            return self.finish_request(response)
+        self.timings.add('total', perf_counter() - start)
+        response = self.render_stream(chain(first, items))
+        self.patch_http_cache(response, etag)
+        self.set_server_timing(response)
+        return response
+
+    def get(self, *args, **kwargs):
+        self.start_request()
+        if self.is_streaming():
+            return self.get_stream()
+        with self.timings.phase('total'):
+            try:
+                etag = self.get_etag()
+                if self.is_not_modified(etag):
+                    response = self.get_not_modified(etag)
+                else:
+                    dataset = self.get_dataset(**self.get_extra_arguments())
+                    self.timings.count = len(dataset)
+                    with self.timings.phase('encode'):
+                        response = self.render_cached_dataset(dataset, etag)
+            except Exception as exc:
+                response = self.render_error(exc)
+        return self.finish_request(response)
 
 
 class RegistryMixin:
@@ -136,16 +433,100 @@ class UserContextFormViewMixin:
 class CatalogView(RegistryMixin, AgnocompleteJSONView):
     """
     The catalog view displays every available Agnocomplete slug available in
-    the registry.
+    the registry, along with their metadata and the registry version.
     """
     def get_dataset(self, **kwargs):
         """
         Return the registry key set.
         """
-        return tuple(self.registry.keys())
+        return self.registry.slugs
+
+    def get_dataset_iterator(self, **kwargs):
+        return iter(self.registry.slugs)
+
+    def get_payload(self, dataset):
+        payload = super().get_payload(dataset)
+        payload['version'] = self.registry.version
+        payload['metadata'] = self.registry.metadata
+        return payload
+
+    def get_etag(self):
+        return self.registry.version
+
+    def get_cache_control(self):
+        # To be revalidated, using the ETag
+        return {'public': True, 'no_cache': True}
+
+
+class ManifestView(RegistryMixin, AgnocompleteJSONView):
+    """
+    The manifest view returns every item of a registered ``client_side``
+    class, to be filtered by the browser.
+
+    Its URL includes the content version of the class, so the responses can
+    be cached "forever". Outdated versions are redirected to the current one.
+    """
+    # Agnocomplete instance, see get_instance()
+    agnocomplete_instance = None
+
+    def get_klass(self):
+        klass_name = self.kwargs.get('klass', None)
+        klass = self.registry.get(klass_name, None)
+        if not klass or not is_client_side(klass):
+            raise Http404("Unknown manifest `{}`".format(klass_name))
+        return klass
+
+    def get_slug(self):
+        try:
+            return self.get_klass().slug
+        except Http404:
+            return None
+
+    def get_instance(self):
+        if self.agnocomplete_instance is None:
+            self.agnocomplete_instance = self.get_klass()()
+        return self.agnocomplete_instance
+
+    def get_dataset(self, **kwargs):
+        return self.get_instance().get_manifest_items()
+
+    def get_dataset_iterator(self, **kwargs):
+        return iter(self.get_dataset(**kwargs))
+
+    def get_payload(self, dataset):
+        payload = super().get_payload(dataset)
+        payload['version'] = self.get_instance().get_content_version()
+        return payload
+
+    def get_etag(self):
+        return self.get_instance().get_content_version()
+
+    def get_cache_control(self):
+        max_age = getattr(
+            settings, 'AGNOCOMPLETE_MANIFEST_MAX_AGE',
+            AGNOCOMPLETE_MANIFEST_MAX_AGE)
+        return {'public': True, 'max_age': max_age, 'immutable': True}
+
+    def get(self, *args, **kwargs):
+        try:
+            instance = self.get_instance()
+        except Http404:
+            # Rendered as an error by the regular process
+            return super().get(*args, **kwargs)
+        version = instance.get_content_version()
+        if self.kwargs.get('version') != version:
+            return HttpResponseRedirect(reverse(
+                '{}:manifest'.format(get_namespace()),
+                args=[instance.slug, version]))
+        return super().get(*args, **kwargs)
 
 
 class AgnocompleteGenericView(AgnocompleteJSONView):
+    # Cursor of the next page, set by get_dataset()
+    next_cursor = None
+    # Agnocomplete instance serving the request, see get_instance()
+    agnocomplete_instance = None
+
     def get_klass(self):
         """
         Return the agnocomplete class to be used with the eventual query.
@@ -155,24 +536,95 @@ class AgnocompleteGenericView(AgnocompleteJSONView):
             return self.klass
         raise ImproperlyConfiguredView("Undefined autocomplete class")
 
+    def get_slug(self):
+        try:
+            return self.get_klass().slug
+        except Exception:
+            # Unknown or undefined class, the error is handled in get()
+            return None
+
+    def get_agnocomplete(self, klass, user, page_size, cursor=None):
+        """
+        Return the agnocomplete instance, instrumented with the view timings.
+        """
+        instance = klass(user=user, page_size=page_size, cursor=cursor)
+        instance.timings = getattr(self, 'timings', None)
+        return instance
+
+    def get_request_user(self):
+        """
+        Return the user passed to the agnocomplete instance.
+        """
+        return self.request.user
+
+    def get_instance(self):
+        """
+        Return the agnocomplete instance serving the request, created once.
+        """
+        if self.agnocomplete_instance is None:
+            self.agnocomplete_instance = self.get_agnocomplete(
+                self.get_klass(), self.get_request_user(),
+                self.get_page_size(), self.get_cursor())
+        return self.agnocomplete_instance
+
+    def get_etag(self):
+        """
+        Return the ETag computed by the agnocomplete instance, if the HTTP
+        caching is enabled.
+        """
+        query = self.request.GET.get('q', "")
+        if not query or self.get_cache_control() is None:
+            return None
+        return self.get_instance().get_etag(
+            query, **self.get_extra_arguments())
+
+    def get_cache_control(self):
+        return self.get_instance().get_http_cache_control()
+
+    def get_vary_headers(self):
+        headers = super().get_vary_headers()
+        if self.get_instance().is_vary_on_user():
+            headers += ('Cookie',)
+        return headers
+
+    def get_cursor(self):
+        """
+        Return the optional pagination cursor passed via the query arguments.
+        """
+        return self.request.GET.get('cursor', None)
+
+    def get_payload(self, dataset):
+        """
+        Return the JSON payload, with the cursor of the next page.
+        """
+        payload = super().get_payload(dataset)
+        payload['next'] = self.next_cursor
+        return payload
+
+    def get_page_size(self):
+        """
+        Return the optional page size passed via the query arguments.
+        """
+        try:
+            return int(self.request.GET.get('page_size', None))
+        except Exception:
+            return None
+
     def get_dataset(self, **kwargs):
-        klass = self.get_klass()
+        # Raise a 404 if the class is unknown, even without a query
+        self.get_klass()
         # Query passed via the argument
         query = self.request.GET.get('q', "")
         if not query:
             # Empty set, no value to complete
             return []
 
-        # Optional Page size
-        try:
-            page_size = int(self.request.GET.get('page_size', None))
-        except Exception:
-            page_size = None
-
         # Agnocomplete instance is ready
         try:
-            instance = klass(user=self.request.user, page_size=page_size)
-            return instance.items(query=query, **kwargs)
+            instance = self.get_instance()
+            dataset = instance.fetch_items(query=query, **kwargs)
+            self.next_cursor = instance.next_cursor
+            return dataset
         except AuthenticationRequiredAgnocompleteException:
             raise PermissionDenied(
                 "Unauthorized access to this Autocomplete")
@@ -180,6 +632,34 @@ class AgnocompleteGenericView(AgnocompleteJSONView):
             # re-raise the unknown exception
             raise
 
+    def get_dataset_iterator(self, **kwargs):
+        """
+        Return an iterator over the dataset, using the agnocomplete
+        :meth:`iter_items()` method.
+        """
+        # Raise a 404 if the class is unknown, even without a query
+        self.get_klass()
+        query = self.request.GET.get('q', "")
+        if not query:
+            return iter([])
+
+        try:
+            instance = self.get_instance()
+            items = instance.iter_items(query=query, **kwargs)
+            return self._iter_dataset(instance, items)
+        except AuthenticationRequiredAgnocompleteException:
+            raise PermissionDenied(
+                "Unauthorized access to this Autocomplete")
+
+    def _iter_dataset(self, instance, items):
+        try:
+            yield from items
+        except AuthenticationRequiredAgnocompleteException:
+            raise PermissionDenied(
+                "Unauthorized access to this Autocomplete")
+        # The next cursor is known once every item has been fetched
+        self.next_cursor = instance.next_cursor
+
 
 class AgnocompleteView(RegistryMixin, AgnocompleteGenericView):
 
@@ -193,3 +673,86 @@ class AgnocompleteView(RegistryMixin, AgnocompleteGenericView):
         if not klass:
             raise Http404("Unknown autocomplete class `{}`".format(klass_name))
         return klass
+
+
+class AsyncAgnocompleteGenericView(AgnocompleteGenericView):
+    """
+    Asynchronous version of :class:`AgnocompleteGenericView`.
+
+    The agnocomplete class asynchronous methods are used. This view must be
+    served by an ASGI server to be really asynchronous. It requires Django
+    3.1 or later.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if django.VERSION[:2] < (3, 1):
+            raise ImproperlyConfigured(
+                "{} requires Django 3.1 or later".format(cls.__name__))
+        return super().as_view(**initkwargs)
+
+    async def get_user(self):
+        """
+        Return the request user, evaluated out of the event loop if needed.
+        """
+        if hasattr(self.request, 'auser'):
+            return await self.request.auser()
+
+        def _get_user():
+            user = self.request.user
+            # Force the lazy object evaluation
+            user.is_authenticated
+            return user
+        return await sync_to_async(_get_user)()
+
+    async def aget_dataset(self, **kwargs):
+        # Raise a 404 if the class is unknown, even without a query
+        self.get_klass()
+        # Query passed via the argument
+        query = self.request.GET.get('q', "")
+        if not query:
+            # Empty set, no value to complete
+            return []
+
+        # Agnocomplete instance is ready
+        try:
+            if self.request_user is None:
+                self.request_user = await self.get_user()
+            instance = self.get_instance()
+            dataset = await instance.afetch_items(query=query, **kwargs)
+            self.next_cursor = instance.next_cursor
+            return dataset
+        except AuthenticationRequiredAgnocompleteException:
+            raise PermissionDenied(
+                "Unauthorized access to this Autocomplete")
+
+    # Request user, evaluated by get_user()
+    request_user = None
+
+    def get_request_user(self):
+        return self.request_user
+
+    async def get(self, *args, **kwargs):
+        self.start_request()
+        with self.timings.phase('total'):
+            try:
+                self.request_user = await self.get_user()
+                etag = await sync_to_async(self.get_etag)()
+                if self.is_not_modified(etag):
+                    response = self.get_not_modified(etag)
+                else:
+                    dataset = await self.aget_dataset(
+                        **self.get_extra_arguments())
+                    self.timings.count = len(dataset)
+                    with self.timings.phase('encode'):
+                        response = self.render_cached_dataset(dataset, etag)
+            except Exception as exc:
+                response = self.render_error(exc)
+        return self.finish_request(response)
+
+
+class AsyncAgnocompleteView(RegistryMixin, AsyncAgnocompleteGenericView):
+    """
+    Asynchronous version of :class:`AgnocompleteView`.
+    """
+    get_klass = AgnocompleteView.get_klass
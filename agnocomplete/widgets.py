@@ -9,6 +9,7 @@ from django.conf import settings
 
 from . import get_namespace
 from .constants import AGNOCOMPLETE_DATA_ATTRIBUTE
+from .manifest import get_manifest_url, is_client_side
 
 __all__ = [
     'AgnocompleteSelect',
@@ -18,6 +19,22 @@ __all__ = [
 
 
 class AgnocompleteWidgetMixin:
+    # Shared resolver of the selected values, see forms.SelectedPrefetcher
+    selected_prefetcher = None
+    # Field providing the agnocomplete, unless it's set on the widget
+    agnocomplete_field = None
+    _agnocomplete = None
+
+    @property
+    def agnocomplete(self):
+        if self._agnocomplete is None and self.agnocomplete_field is not None:
+            return self.agnocomplete_field.agnocomplete
+        return self._agnocomplete
+
+    @agnocomplete.setter
+    def agnocomplete(self, instance):
+        self._agnocomplete = instance
+
     def _agnocomplete_build_attrs(self, attrs):
         data_url = reverse_lazy(
             '{}:agnocomplete'.format(get_namespace()),
@@ -35,6 +52,9 @@ class AgnocompleteWidgetMixin:
             'data-query-size': self.agnocomplete.get_query_size(),
             data_attribute: 'on',
         })
+        # The front-end may filter the whole list of choices locally
+        if is_client_side(self.agnocomplete):
+            attrs['data-manifest-url'] = get_manifest_url(self.agnocomplete)
 
         return attrs
 
@@ -50,7 +70,11 @@ class AgnocompleteWidgetMixin:
     """
     def optgroups(self, name, value, attrs=None):
         selected_ids = {text(v) for v in value}
-        selected_choices = self.agnocomplete.selected(selected_ids)
+        if self.selected_prefetcher is not None:
+            selected_choices = self.selected_prefetcher.selected(
+                self.agnocomplete, selected_ids)
+        else:
+            selected_choices = self.agnocomplete.selected(selected_ids)
         options = []
         groups = [
             (None, options, 0)  # single unnamed group
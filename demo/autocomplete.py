@@ -130,7 +130,10 @@ class AutocompletePersonDomainSpecial(AutocompletePersonDomain):
     def selected(self, ids):
         # Introducing a new variable here, to make sure the
         # "account_registrations" property is able to fetch the matricules.
-        self._selected_queryset = self.get_queryset()
+        # Without user context (e.g. the form is displayed to an anonymous
+        # user), there's no queryset.
+        if self.user:
+            self._selected_queryset = self.get_queryset()
         return super().selected(ids)
 
 
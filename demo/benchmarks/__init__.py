@@ -0,0 +1,9 @@
+"""
+Agnocomplete benchmark suite.
+
+Run it using::
+
+    python -m demo.benchmarks --sizes 1k,100k
+
+See ``docs/benchmarks.rst`` for details.
+"""
@@ -0,0 +1,124 @@
+"""
+Run the agnocomplete benchmarks.
+
+Usage::
+
+    python -m demo.benchmarks --sizes 1k,100k --output baseline.json
+    python -m demo.benchmarks --sizes 1k,100k --compare baseline.json
+
+"""
+import argparse
+import os
+import sys
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m demo.benchmarks',
+        description="Benchmark the agnocomplete classes and views.")
+    parser.add_argument(
+        '--sizes', default='1k',
+        help="Comma-separated dataset sizes (1k, 10k, 100k, 1m or a number)"
+             " [default: %(default)s]")
+    parser.add_argument(
+        '--scenarios', default=None,
+        help="Comma-separated scenario name patterns, e.g. 'model.*'")
+    parser.add_argument(
+        '--iterations', type=int, default=200,
+        help="Timed calls per scenario [default: %(default)s]")
+    parser.add_argument(
+        '--warmup', type=int, default=20,
+        help="Untimed calls per scenario [default: %(default)s]")
+    parser.add_argument(
+        '--alloc-iterations', type=int, default=50,
+        help="Calls traced for allocations [default: %(default)s]")
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help="Random seed of the data generators [default: %(default)s]")
+    parser.add_argument(
+        '--output', default=None,
+        help="Save the results as a JSON baseline in this file")
+    parser.add_argument(
+        '--compare', default=None,
+        help="Compare the results with this JSON baseline")
+    parser.add_argument(
+        '--threshold', type=float, default=None,
+        help="With --compare, exit with an error if a p50 is slower than"
+             " the baseline by more than this percentage")
+    parser.add_argument(
+        '--list', action='store_true', help="List the scenarios and exit")
+    return parser
+
+
+def run(options):
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.test.utils import teardown_test_environment
+
+    from agnocomplete.core import AgnocompleteUrlProxy
+    from . import data, runner
+    from .scenarios import BenchmarkContext, get_scenarios
+    from .stub_server import StubAPIServer
+
+    patterns = options.scenarios.split(',') if options.scenarios else None
+    scenarios = get_scenarios(patterns)
+    if options.list:
+        for name, _ in scenarios:
+            print(name)
+        return 0
+
+    results = []
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        for size_name in options.sizes.split(','):
+            size = data.parse_size(size_name)
+            print("Generating {} rows...".format(size), file=sys.stderr)
+            data.populate_persons(size, options.seed)
+            context = BenchmarkContext(size, options.seed)
+            with StubAPIServer(context.choices) as server:
+                context.server_url = server.url
+                for name, func in scenarios:
+                    print("Running {} ({})...".format(name, size_name),
+                          file=sys.stderr)
+                    result = runner.measure(
+                        func(context),
+                        iterations=options.iterations,
+                        warmup=options.warmup,
+                        alloc_iterations=options.alloc_iterations,
+                    )
+                    result.update(scenario=name, size=size_name)
+                    results.append(result)
+                AgnocompleteUrlProxy.close_http_sessions()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(runner.format_results(results))
+    if options.output:
+        runner.save_baseline(options.output, results)
+
+    status = 0
+    if options.compare:
+        baseline = runner.load_baseline(options.compare)
+        for change in runner.compare(results, baseline):
+            print("{scenario} ({size}): ".format(**change) + ", ".join(
+                "{} {:+.1%}".format(metric, change[metric])
+                for metric in ('p50_ms', 'p95_ms', 'p99_ms')
+                if metric in change))
+            if options.threshold is not None \
+                    and change.get('p50_ms', 0) * 100 > options.threshold:
+                status = 1
+    return status
+
+
+def main(argv=None):
+    options = get_parser().parse_args(argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'demo.settings')
+    import django
+    django.setup()
+    return run(options)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
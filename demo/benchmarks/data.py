@@ -0,0 +1,103 @@
+"""
+Synthetic, reproducible data generators.
+"""
+import random
+
+FIRST_NAMES = (
+    'Alice', 'Bob', 'Carol', 'Dave', 'Eve', 'Frank', 'Grace', 'Heidi',
+    'Ivan', 'Judy', 'Mallory', 'Niaj', 'Olivia', 'Peggy', 'Rupert',
+    'Sybil', 'Trent', 'Victor', 'Walter', 'Zoe',
+)
+SYLLABLES = (
+    'ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'an', 'el', 'or', 'ba',
+    'de', 'gu', 'hi', 'jo',
+)
+LOCATIONS = ('Paris', 'Lyon', 'Nantes', 'Lille', 'Brest')
+
+"Named dataset sizes"
+SIZES = {
+    '1k': 1000,
+    '10k': 10000,
+    '100k': 100000,
+    '1m': 1000000,
+}
+
+
+def parse_size(size):
+    """
+    Return the number of rows for a named (``100k``) or numeric size.
+    """
+    size = str(size).lower()
+    if size in SIZES:
+        return SIZES[size]
+    return int(size)
+
+
+def get_random(seed=0):
+    return random.Random(seed)
+
+
+def make_word(rng, syllables=3):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+def make_choices(size, seed=0):
+    """
+    Return ``size`` (value, label) choices, with unique values.
+    """
+    rng = get_random(seed)
+    return [
+        ('choice-{}'.format(i), '{} {}'.format(
+            make_word(rng).capitalize(), make_word(rng, 2)))
+        for i in range(size)
+    ]
+
+
+def make_person_rows(size, seed=0):
+    """
+    Yield ``size`` person dictionaries.
+    """
+    rng = get_random(seed)
+    for i in range(size):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = make_word(rng).capitalize()
+        yield {
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': '{}.{}{}@example.com'.format(
+                first_name.lower(), last_name.lower(), i),
+            'location': rng.choice(LOCATIONS),
+        }
+
+
+def populate_persons(size, seed=0, batch_size=5000):
+    """
+    Replace the ``Person`` table content by ``size`` synthetic rows.
+    """
+    from ..models import Person
+
+    Person.objects.all().delete()
+    batch = []
+    for row in make_person_rows(size, seed):
+        batch.append(Person(**row))
+        if len(batch) >= batch_size:
+            Person.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Person.objects.bulk_create(batch)
+    return Person.objects.count()
+
+
+def make_queries(count, seed=0):
+    """
+    Return ``count`` search terms: name prefixes and syllable fragments.
+    """
+    rng = get_random(seed)
+    queries = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            name = rng.choice(FIRST_NAMES).lower()
+            queries.append(name[:rng.randint(3, len(name))])
+        else:
+            queries.append(make_word(rng, 2))
+    return queries
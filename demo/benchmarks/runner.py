@@ -0,0 +1,162 @@
+"""
+Benchmark runner: latency percentiles, throughput, allocations and
+baselines.
+"""
+from datetime import datetime, timezone
+from time import perf_counter_ns
+import json
+import platform
+import statistics
+import tracemalloc
+
+import django
+
+
+def percentile(values, rank):
+    """
+    Return the ``rank`` percentile of the values (nearest-rank method).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, -(-rank * len(ordered) // 100) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def _reset_peak():
+    """
+    Reset the traced memory peak.
+
+    ``tracemalloc.reset_peak()`` is only available with Python 3.9+, restart
+    the tracing otherwise.
+    """
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.stop()
+        tracemalloc.start()
+
+
+def measure(func, iterations=200, warmup=20, alloc_iterations=50):
+    """
+    Call ``func(i)`` and return its statistics.
+
+    Timings and allocations are measured in separate passes, since tracing
+    the allocations slows the calls down.
+    """
+    for i in range(warmup):
+        func(i)
+
+    durations = []
+    for i in range(iterations):
+        start = perf_counter_ns()
+        func(i)
+        durations.append(perf_counter_ns() - start)
+
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    try:
+        for i in range(alloc_iterations):
+            _reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            snapshot = tracemalloc.take_snapshot()
+            func(i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            stats = tracemalloc.take_snapshot().compare_to(
+                snapshot, 'filename')
+            blocks.append(sum(
+                stat.count_diff for stat in stats if stat.count_diff > 0))
+    finally:
+        tracemalloc.stop()
+
+    total = sum(durations)
+    return {
+        'iterations': iterations,
+        'p50_ms': percentile(durations, 50) / 1e6,
+        'p95_ms': percentile(durations, 95) / 1e6,
+        'p99_ms': percentile(durations, 99) / 1e6,
+        'mean_ms': total / iterations / 1e6,
+        'throughput_ops': iterations / (total / 1e9) if total else None,
+        'alloc_peak_kib': statistics.median(peaks) / 1024 if peaks else None,
+        'alloc_blocks': statistics.median(blocks) if blocks else None,
+    }
+
+
+def get_environment():
+    """
+    Return the description of the benchmark environment.
+    """
+    from django.db import connection
+    return {
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def save_baseline(path, results):
+    """
+    Save the results as a JSON baseline.
+    """
+    with open(path, 'w') as fd:
+        json.dump({
+            'environment': get_environment(),
+            'results': results,
+        }, fd, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as fd:
+        return json.load(fd)
+
+
+def compare(results, baseline, metrics=('p50_ms', 'p95_ms', 'p99_ms')):
+    """
+    Return the relative change of each metric, by (scenario, size).
+
+    A positive change means slower than the baseline.
+    """
+    previous = {
+        (result['scenario'], result['size']): result
+        for result in baseline['results']
+    }
+    changes = []
+    for result in results:
+        reference = previous.get((result['scenario'], result['size']))
+        if reference is None:
+            continue
+        change = {'scenario': result['scenario'], 'size': result['size']}
+        for metric in metrics:
+            if reference.get(metric):
+                change[metric] = (
+                    result[metric] - reference[metric]) / reference[metric]
+        changes.append(change)
+    return changes
+
+
+def format_results(results):
+    """
+    Return the results as a text table.
+    """
+    columns = (
+        ('scenario', 24, '{}'),
+        ('size', 8, '{}'),
+        ('p50_ms', 9, '{:.3f}'),
+        ('p95_ms', 9, '{:.3f}'),
+        ('p99_ms', 9, '{:.3f}'),
+        ('throughput_ops', 14, '{:.1f}'),
+        ('alloc_peak_kib', 14, '{:.1f}'),
+        ('alloc_blocks', 12, '{:.0f}'),
+    )
+    lines = [' '.join(name.rjust(width) for name, width, _ in columns)]
+    for result in results:
+        lines.append(' '.join(
+            fmt.format(result[name]).rjust(width)
+            if result[name] is not None else '-'.rjust(width)
+            for name, width, fmt in columns))
+    return '\n'.join(lines)
@@ -0,0 +1,178 @@
+"""
+Benchmark scenarios, one per agnocomplete class family and the JSON view.
+
+A scenario is a function receiving the benchmark context and returning the
+function to measure. This function is called with the iteration number.
+"""
+from fnmatch import fnmatch
+
+from django.test import Client
+from django.urls import reverse
+
+from agnocomplete import get_namespace
+from agnocomplete.core import AgnocompleteChoices, AgnocompleteUrlProxy
+
+from ..autocomplete import AutocompletePerson
+from ..models import Person
+from . import data
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    "Register a benchmark scenario."
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def get_scenarios(patterns=None):
+    """
+    Return the (name, scenario) pairs matching the glob patterns.
+    """
+    return [
+        (name, func) for name, func in SCENARIOS.items()
+        if not patterns or any(fnmatch(name, pattern) for pattern in patterns)
+    ]
+
+
+class BenchmarkContext:
+    """
+    Data shared by the scenarios of a given dataset size.
+    """
+
+    def __init__(self, size, seed=0, query_count=100, server_url=None):
+        self.size = size
+        self.seed = seed
+        self.queries = data.make_queries(query_count, seed)
+        self.choices = data.make_choices(size, seed)
+        self.server_url = server_url
+
+    def query(self, i):
+        return self.queries[i % len(self.queries)]
+
+    def sample(self, values, count, i):
+        """
+        Return ``count`` values, different for each iteration.
+        """
+        start = (i * count) % max(1, len(values) - count)
+        return values[start:start + count]
+
+
+class BenchAutocompletePersonValues(AutocompletePerson):
+    label_fields = ['first_name', 'last_name']
+
+
+class BenchAutocompleteUrlProxy(AgnocompleteUrlProxy):
+    base_url = None
+
+    def get_search_url(self):
+        return self.base_url + '/search'
+
+    def get_item_url(self, pk):
+        return '{}/item/{}'.format(self.base_url, pk)
+
+
+class BenchAutocompleteUrlProxyBatch(BenchAutocompleteUrlProxy):
+
+    def get_items_url(self, ids):
+        return self.base_url + '/items'
+
+    def get_batch_http_call_kwargs(self, ids):
+        return {'ids': ','.join(ids)}
+
+
+def _choices_class(context):
+    return type('BenchAutocompleteChoices', (AgnocompleteChoices,), {
+        'choices': context.choices,
+        'query_size_min': 2,
+    })
+
+
+@scenario('choices.items')
+def choices_items(context):
+    klass = _choices_class(context)
+
+    def run(i):
+        return klass().items(query=context.query(i))
+    return run
+
+
+@scenario('choices.selected')
+def choices_selected(context):
+    klass = _choices_class(context)
+    values = [value for value, _ in context.choices]
+
+    def run(i):
+        return klass().selected(context.sample(values, 10, i))
+    return run
+
+
+@scenario('model.items')
+def model_items(context):
+    def run(i):
+        return AutocompletePerson().items(query=context.query(i))
+    return run
+
+
+@scenario('model.items.values')
+def model_items_values(context):
+    def run(i):
+        return BenchAutocompletePersonValues().items(query=context.query(i))
+    return run
+
+
+@scenario('model.selected')
+def model_selected(context):
+    pks = [str(pk) for pk in Person.objects.values_list('pk', flat=True)]
+
+    def run(i):
+        return AutocompletePerson().selected(context.sample(pks, 10, i))
+    return run
+
+
+def _url_proxy_class(context, base):
+    return type(base.__name__, (base,), {'base_url': context.server_url})
+
+
+@scenario('url_proxy.items')
+def url_proxy_items(context):
+    klass = _url_proxy_class(context, BenchAutocompleteUrlProxy)
+
+    def run(i):
+        return klass().items(query=context.query(i))
+    return run
+
+
+@scenario('url_proxy.selected')
+def url_proxy_selected(context):
+    klass = _url_proxy_class(context, BenchAutocompleteUrlProxy)
+    values = [value for value, _ in context.choices]
+
+    def run(i):
+        return klass().selected(context.sample(values, 5, i))
+    return run
+
+
+@scenario('url_proxy.selected.batch')
+def url_proxy_selected_batch(context):
+    klass = _url_proxy_class(context, BenchAutocompleteUrlProxyBatch)
+    values = [value for value, _ in context.choices]
+
+    def run(i):
+        return klass().selected(context.sample(values, 5, i))
+    return run
+
+
+@scenario('view.model')
+def view_model(context):
+    client = Client()
+    url = reverse(
+        get_namespace() + ':agnocomplete', args=['AutocompletePerson'])
+
+    def run(i):
+        response = client.get(url, data={'q': context.query(i)})
+        assert response.status_code == 200, response.content
+        return response
+    return run
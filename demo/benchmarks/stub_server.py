@@ -0,0 +1,98 @@
+"""
+Local HTTP server standing in for a 3rd party API.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs, urlparse
+import json
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """
+    Search and item endpoints over the server ``records``:
+
+    * ``/search?q=term``: the first ``page_size`` records containing the term,
+    * ``/item/<pk>``: a single record,
+    * ``/items?ids=1,2``: several records.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep the benchmark output clean
+        pass
+
+    def send_json(self, data, status=200):
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        args = parse_qs(url.query)
+        records = self.server.records
+        if url.path == '/search':
+            term = args.get('q', [''])[0].lower()
+            data = []
+            if term:
+                for record in records.values():
+                    if term in record['label'].lower():
+                        data.append(record)
+                        if len(data) >= self.server.page_size:
+                            break
+            return self.send_json({'data': data})
+        if url.path.startswith('/item/'):
+            record = records.get(url.path[len('/item/'):])
+            if record is None:
+                return self.send_json({'data': []}, status=404)
+            return self.send_json({'data': [record]})
+        if url.path == '/items':
+            ids = args.get('ids', [''])[0].split(',')
+            return self.send_json(
+                {'data': [records[pk] for pk in ids if pk in records]})
+        return self.send_json({}, status=404)
+
+
+class StubAPIServer:
+    """
+    Threaded stub API server, listening on a random local port.
+
+    Usage::
+
+        with StubAPIServer(choices) as server:
+            server.url  # e.g. http://127.0.0.1:43210
+    """
+
+    def __init__(self, choices, page_size=15):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubAPIHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.records = {
+            value: {'value': value, 'label': label}
+            for value, label in choices
+        }
+        self.httpd.page_size = page_size
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self):
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -1,8 +1,22 @@
 import json
 
-from django.test import TestCase, LiveServerTestCase
+from django.test import TestCase
+from django.test import LiveServerTestCase as DjangoLiveServerTestCase
 from django.core.management import call_command
 
+from agnocomplete.core import AgnocompleteUrlProxy
+
+
+class LiveServerTestCase(DjangoLiveServerTestCase):
+    """
+    LiveServer test class that closes the URL proxies HTTP sessions.
+
+    Otherwise, the kept-alive connections would outlive the live server.
+    """
+    def tearDown(self):
+        AgnocompleteUrlProxy.close_http_sessions()
+        super().tearDown()
+
 
 class LoaddataMixin:
     def setUp(self):
@@ -0,0 +1,186 @@
+from unittest import skipIf
+
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.encoding import force_str as text
+
+import mock
+
+from agnocomplete.core import httpx
+from agnocomplete.views import AsyncAgnocompleteView
+
+from ..autocomplete import (
+    AutocompleteColor,
+    AutocompletePerson,
+    AutocompletePersonDomainSpecial,
+    AutocompleteUrlSimple,
+    AutocompleteUrlSimpleWithExtra,
+)
+from . import LiveServerTestCase, LoaddataTestCase, get_json
+from .test_url_proxy import RESULT_DICT, AutocompleteUrlPool
+
+ASYNC_ORM = hasattr(QuerySet, '__aiter__')
+
+
+class AsyncChoicesTest(TestCase):
+
+    @override_settings(AGNOCOMPLETE_MIN_QUERYSIZE=2)
+    def test_aitems(self):
+        instance = AutocompleteColor()
+        self.assertEqual(
+            async_to_sync(instance.aitems)(query='gre'),
+            instance.items(query='gre')
+        )
+
+    def test_aselected(self):
+        instance = AutocompleteColor()
+        self.assertEqual(
+            async_to_sync(instance.aselected)(['grey']),
+            [('grey', 'Grey')]
+        )
+
+
+@skipIf(not ASYNC_ORM, "Asynchronous ORM is not available")
+class AsyncModelTest(LoaddataTestCase):
+
+    def test_is_async_native(self):
+        self.assertTrue(AutocompletePerson().is_async_native())
+        # selected() is overridden, fallback to the sync version
+        self.assertFalse(
+            AutocompletePersonDomainSpecial().is_async_native())
+
+    async def test_aitems(self):
+        instance = AutocompletePerson()
+        items = await instance.aitems(query='ali')
+        self.assertEqual(len(items), 4)
+        self.assertEqual(await instance.aitems(query='a'), [])
+
+    async def test_aselected(self):
+        instance = AutocompletePerson()
+        result = await instance.aselected(['2'])
+        self.assertEqual(result, [(text('2'), text('Alice Inchains'))])
+        self.assertEqual(await instance.aselected(['MEUH']), [])
+
+
+@skipIf(httpx is None, "httpx is not installed")
+@override_settings(HTTP_HOST='')
+class AsyncUrlProxyTest(LiveServerTestCase):
+
+    def test_is_async_native(self):
+        self.assertTrue(AutocompleteUrlSimple().is_async_native())
+        # items() is overridden, fallback to the sync version
+        self.assertFalse(AutocompleteUrlSimpleWithExtra().is_async_native())
+
+    def test_aitems(self):
+        instance = AutocompleteUrlSimple()
+        search_url = instance.search_url
+        with mock.patch('demo.autocomplete.AutocompleteUrlSimple'
+                        '.get_search_url') as mock_auto:
+            mock_auto.return_value = self.live_server_url + search_url
+            self.assertEqual(
+                async_to_sync(instance.aitems)(query='person'), RESULT_DICT)
+            self.assertEqual(async_to_sync(instance.aitems)(query='p'), [])
+
+    def test_aselected(self):
+        instance = AutocompleteUrlSimple()
+        item_url = instance.get_item_url(1)
+        with mock.patch('demo.autocomplete.AutocompleteUrlSimple'
+                        '.get_item_url') as mock_auto:
+            mock_auto.return_value = self.live_server_url + item_url
+            result = async_to_sync(instance.aselected)([1])
+            self.assertEqual(result, [('1', 'first person')])
+
+
+@skipIf(httpx is None, "httpx is not installed")
+class AsyncHTTPClientTest(TestCase):
+
+    def tearDown(self):
+        AutocompleteUrlSimple.close_http_session()
+        AutocompleteUrlPool.close_http_session()
+        super().tearDown()
+
+    def test_shared_client(self):
+        async def get_clients():
+            return (
+                await AutocompleteUrlSimple.aget_http_client(),
+                await AutocompleteUrlSimple().aget_http_client(),
+                await AutocompleteUrlPool.aget_http_client(),
+            )
+
+        first, second, other = async_to_sync(get_clients)()
+        self.assertIs(first, second)
+        # One client per class
+        self.assertIsNot(first, other)
+        # Closed with its event loop
+        self.assertTrue(first.is_closed)
+        self.assertTrue(other.is_closed)
+        # One client per event loop, the closed loops clients are dropped
+        self.assertIsNot(async_to_sync(get_clients)()[0], first)
+        self.assertEqual(
+            len(AutocompleteUrlSimple._async_http_clients), 1)
+
+    def test_close_client(self):
+        async def close():
+            client = await AutocompleteUrlPool.aget_http_client()
+            await AutocompleteUrlPool.aclose_http_client()
+            self.assertTrue(client.is_closed)
+            self.assertIsNot(
+                await AutocompleteUrlPool.aget_http_client(), client)
+
+        async_to_sync(close)()
+
+    def test_no_cookies(self):
+        client = AutocompleteUrlPool.build_async_http_client()
+        response = httpx.Response(
+            200, headers={'Set-Cookie': 'session=secret'},
+            request=httpx.Request('GET', 'https://api.example.com/'))
+        client.cookies.extract_cookies(response)
+        self.assertEqual(len(client.cookies), 0)
+
+    @override_settings(AGNOCOMPLETE_HTTP_POOL_CONNECTIONS=2)
+    def test_pool_configuration(self):
+        client = AutocompleteUrlPool.build_async_http_client()
+        pool = client._transport._pool
+        self.assertEqual(pool._max_keepalive_connections, 84)
+        self.assertEqual(pool._retries, 3)
+
+
+class AsyncViewVersionTest(TestCase):
+
+    def test_old_django(self):
+        with mock.patch('django.VERSION', (3, 0, 14, 'final', 0)):
+            with self.assertRaises(ImproperlyConfigured):
+                AsyncAgnocompleteView.as_view()
+        self.assertTrue(callable(AsyncAgnocompleteView.as_view()))
+
+
+@skipIf(not ASYNC_ORM, "Asynchronous ORM is not available")
+class AsyncAgnocompleteViewTest(LoaddataTestCase):
+
+    def get_url(self, klass):
+        return reverse('async-agnocomplete', args=[klass])
+
+    async def test_get(self):
+        response = await self.async_client.get(
+            self.get_url('AutocompletePerson'), data={'q': 'ali'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(get_json(response)), 4)
+
+    async def test_empty_query(self):
+        response = await self.async_client.get(
+            self.get_url('AutocompletePerson'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_json(response), [])
+
+    async def test_404(self):
+        response = await self.async_client.get(self.get_url('MEUH'))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(
+            self.get_url('AutocompletePersonDomain'), data={'q': 'ali'})
+        self.assertEqual(response.status_code, 403)
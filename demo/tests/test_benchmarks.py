@@ -0,0 +1,100 @@
+import tracemalloc
+
+from django.test import TestCase
+
+import mock
+
+from agnocomplete.core import AgnocompleteUrlProxy
+
+from ..benchmarks import data, runner
+from ..benchmarks.scenarios import BenchmarkContext, get_scenarios
+from ..benchmarks.stub_server import StubAPIServer
+from ..models import Person
+
+
+class DataTest(TestCase):
+
+    def test_parse_size(self):
+        self.assertEqual(data.parse_size('100k'), 100000)
+        self.assertEqual(data.parse_size('1M'), 1000000)
+        self.assertEqual(data.parse_size(42), 42)
+
+    def test_reproducible(self):
+        self.assertEqual(data.make_choices(10), data.make_choices(10))
+        self.assertNotEqual(
+            data.make_choices(10), data.make_choices(10, seed=1))
+        self.assertEqual(data.make_queries(10), data.make_queries(10))
+
+    def test_populate_persons(self):
+        self.assertEqual(data.populate_persons(120, batch_size=50), 120)
+        self.assertEqual(Person.objects.count(), 120)
+
+
+class RunnerTest(TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(runner.percentile(values, 50), 50)
+        self.assertEqual(runner.percentile(values, 95), 95)
+        self.assertEqual(runner.percentile(values, 99), 99)
+        self.assertEqual(runner.percentile([3], 99), 3)
+        self.assertIsNone(runner.percentile([], 50))
+
+    def test_measure(self):
+        calls = []
+        result = runner.measure(
+            calls.append, iterations=10, warmup=2, alloc_iterations=3)
+        self.assertEqual(len(calls), 15)
+        self.assertEqual(result['iterations'], 10)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertIsNotNone(result['alloc_peak_kib'])
+
+    def test_measure_without_reset_peak(self):
+        # Python < 3.9
+        with mock.patch.object(tracemalloc, 'reset_peak', create=True):
+            del tracemalloc.reset_peak
+            result = runner.measure(
+                lambda i: [0] * 1000, iterations=2, warmup=0,
+                alloc_iterations=3)
+        self.assertGreater(result['alloc_peak_kib'], 0)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_compare(self):
+        baseline = {'results': [
+            {'scenario': 'model.items', 'size': '1k', 'p50_ms': 2.0,
+             'p95_ms': 4.0, 'p99_ms': 5.0},
+        ]}
+        results = [
+            {'scenario': 'model.items', 'size': '1k', 'p50_ms': 3.0,
+             'p95_ms': 4.0, 'p99_ms': 4.0},
+            {'scenario': 'view.model', 'size': '1k', 'p50_ms': 3.0,
+             'p95_ms': 4.0, 'p99_ms': 4.0},
+        ]
+        changes = runner.compare(results, baseline)
+        self.assertEqual(changes, [{
+            'scenario': 'model.items', 'size': '1k',
+            'p50_ms': 0.5, 'p95_ms': 0.0, 'p99_ms': -0.2,
+        }])
+
+
+class ScenariosTest(TestCase):
+
+    def tearDown(self):
+        AgnocompleteUrlProxy.close_http_sessions()
+        super().tearDown()
+
+    def test_get_scenarios(self):
+        names = [name for name, _ in get_scenarios(['model.*'])]
+        self.assertIn('model.items', names)
+        self.assertNotIn('view.model', names)
+
+    def test_run(self):
+        data.populate_persons(50)
+        context = BenchmarkContext(50)
+        with StubAPIServer(context.choices) as server:
+            context.server_url = server.url
+            for name, func in get_scenarios():
+                run = func(context)
+                # Every scenario runs against the synthetic data
+                run(0)
+                run(1)
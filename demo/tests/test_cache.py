@@ -0,0 +1,175 @@
+from django.core.cache import caches
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import get_namespace
+from agnocomplete.cache import LRUCache, get_cache, get_lru_cache
+from agnocomplete.cache import connect_cache_invalidation
+from agnocomplete.cache import get_cache_invalidation_models
+
+from ..autocomplete import (
+    AutocompleteColor,
+    AutocompletePerson,
+    AutocompletePersonDomain,
+)
+from ..models import Person
+from . import LoaddataTestCase, MockRequestUser
+
+
+class AutocompleteColorCached(AutocompleteColor):
+    cache_backend = LRUCache(maxsize=10)
+
+
+class AutocompletePersonCached(AutocompletePerson):
+    cache_backend = 'default'
+
+
+class AutocompletePersonDomainCached(AutocompletePersonDomain):
+    cache_backend = 'default'
+
+
+connect_cache_invalidation(AutocompletePersonCached)
+
+
+class LRUCacheTest(TestCase):
+
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get('key'))
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertTrue(cache.delete('key'))
+        self.assertIsNone(cache.get('key'))
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # "a" is now the most recently used
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_timeout(self):
+        cache = LRUCache()
+        with mock.patch('agnocomplete.cache.time.monotonic') as monotonic:
+            monotonic.return_value = 100
+            cache.set('key', 'value', 10)
+            self.assertEqual(cache.get('key'), 'value')
+            monotonic.return_value = 111
+            self.assertIsNone(cache.get('key'))
+
+    def test_add(self):
+        cache = LRUCache()
+        self.assertTrue(cache.add('key', 1))
+        self.assertFalse(cache.add('key', 2))
+        self.assertEqual(cache.get('key'), 1)
+
+    @override_settings(AGNOCOMPLETE_CACHE_LRU_MAXSIZE=5)
+    def test_maxsize_settings(self):
+        self.assertEqual(LRUCache().maxsize, 5)
+
+
+class GetCacheTest(TestCase):
+
+    def test_disabled(self):
+        self.assertIsNone(get_cache(None))
+
+    def test_alias(self):
+        self.assertIs(get_cache('default'), caches['default'])
+
+    def test_unknown_alias(self):
+        self.assertIs(get_cache('MEUH'), get_lru_cache())
+
+    def test_object(self):
+        cache = LRUCache()
+        self.assertIs(get_cache(cache), cache)
+
+
+@override_settings(AGNOCOMPLETE_MIN_QUERYSIZE=2)
+class CachedItemsTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        AutocompleteColorCached.cache_backend.clear()
+
+    def test_no_cache(self):
+        instance = AutocompleteColor()
+        self.assertIsNone(instance.get_cache())
+        with mock.patch.object(
+                AutocompleteColor, 'items', return_value=[]) as items:
+            instance.fetch_items(query='gre')
+            instance.fetch_items(query='gre')
+        self.assertEqual(items.call_count, 2)
+
+    def test_cache_hit(self):
+        instance = AutocompleteColorCached()
+        expected = instance.items(query='gre')
+        with mock.patch.object(
+                AutocompleteColor, 'items', return_value=expected) as items:
+            self.assertEqual(instance.fetch_items(query='gre'), expected)
+            self.assertEqual(instance.fetch_items(query='gre'), expected)
+            # Another query, another key
+            instance.fetch_items(query='gra')
+            # Another page size, another key
+            AutocompleteColorCached(page_size=3).fetch_items(query='gre')
+            # Extra arguments are part of the key
+            instance.fetch_items(query='gre', extra='argument')
+        self.assertEqual(items.call_count, 4)
+
+    def test_invalid_query(self):
+        instance = AutocompleteColorCached()
+        self.assertEqual(instance.fetch_items(query=''), [])
+        self.assertEqual(len(AutocompleteColorCached.cache_backend), 0)
+
+    def test_invalidate(self):
+        instance = AutocompleteColorCached()
+        with mock.patch.object(
+                AutocompleteColor, 'items', return_value=[]) as items:
+            instance.fetch_items(query='gre')
+            AutocompleteColorCached.invalidate_cache()
+            instance.fetch_items(query='gre')
+        self.assertEqual(items.call_count, 2)
+
+    def test_model_invalidation(self):
+        instance = AutocompletePersonCached()
+        self.assertEqual(len(instance.fetch_items(query='ali')), 4)
+        Person.objects.create(
+            first_name='Alicia', last_name='Keys', email='alicia@demo.com')
+        self.assertEqual(len(instance.fetch_items(query='ali')), 5)
+        Person.objects.filter(first_name='Alicia').get().delete()
+        self.assertEqual(len(instance.fetch_items(query='ali')), 4)
+        self.assertEqual(
+            get_cache_invalidation_models(AutocompletePersonCached),
+            ['demo.person'])
+        self.assertEqual(get_cache_invalidation_models(AutocompletePerson), [])
+
+    def test_user_dependent(self):
+        instance = AutocompletePersonDomainCached()
+        self.assertTrue(instance.is_user_dependent())
+        # No user identifier, no cache key
+        instance.user = MockRequestUser('joe@example.com', True)
+        self.assertIsNone(instance.get_cache_key('ali'))
+        # Different users, different keys
+        instance.user = Person.objects.get(pk=1)
+        key = instance.get_cache_key('ali')
+        instance.user = Person.objects.get(pk=2)
+        self.assertNotEqual(instance.get_cache_key('ali'), key)
+
+    def test_view(self):
+        url = reverse(
+            get_namespace() + ':agnocomplete', args=['AutocompletePerson'])
+        with mock.patch.object(
+                AutocompletePerson, 'cache_backend', 'default'):
+            with mock.patch.object(
+                    AutocompletePerson, 'items', return_value=[]) as items:
+                self.client.get(url, data={'q': 'ali'})
+                self.client.get(url, data={'q': 'ali'})
+        self.assertEqual(items.call_count, 1)
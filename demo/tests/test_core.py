@@ -1,12 +1,20 @@
 from django.conf import settings
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase
 from django.utils.encoding import force_str as text
 from django.test import override_settings
+from django.utils import translation
+from django.utils.translation import gettext_lazy
 
 from agnocomplete import constants
 from agnocomplete.core import AgnocompleteModelBase, AgnocompleteBase
+from agnocomplete.core import AgnocompleteChoices
 from agnocomplete.core import AgnocompleteUrlProxy
 from agnocomplete.exceptions import AuthenticationRequiredAgnocompleteException
+from agnocomplete.index import ChoicesIndex
 
 from ..autocomplete import (
     AutocompleteColor,
@@ -20,6 +28,7 @@ from ..autocomplete import (
     AutocompletePersonMisconfigured,
     AutocompletePersonDomain,
 )
+from ..common import COLORS
 from ..models import Person
 
 from . import MockRequestUser, LoaddataTestCase
@@ -66,6 +75,60 @@ class AutocompleteColorTest(TestCase):
         self.assertEqual(result, [])
 
 
+class ChoicesIndexTest(TestCase):
+
+    def test_search_keeps_choices_order(self):
+        index = ChoicesIndex(COLORS)
+        self.assertEqual(
+            index.search('gr', 10),
+            [('green', 'Green'), ('gray', 'Gray'), ('grey', 'Grey')]
+        )
+        # Paginated results are the first matches, in the choices order
+        self.assertEqual(
+            index.search('gr', 2),
+            [('green', 'Green'), ('gray', 'Gray')]
+        )
+        self.assertEqual(index.search('zzz', 10), [])
+
+    def test_selected(self):
+        index = ChoicesIndex(COLORS)
+        self.assertEqual(
+            index.selected(['grey', 'green', 'MEUH']),
+            [('green', 'Green'), ('grey', 'Grey')]
+        )
+
+    def test_index_is_built_once(self):
+        instance = AutocompleteColor()
+        index = instance.get_choices_index()
+        self.assertIs(AutocompleteColor().get_choices_index(), index)
+
+    def test_index_per_language(self):
+        choices = (('red', gettext_lazy('Red')),)
+
+        class AutocompleteLazyColor(AgnocompleteChoices):
+            pass
+        AutocompleteLazyColor.choices = choices
+        with translation.override('en'):
+            english = AutocompleteLazyColor().get_choices_index()
+        with translation.override('fr'):
+            french = AutocompleteLazyColor().get_choices_index()
+        self.assertIsNot(french, english)
+        # Switching back to a language reuses its index
+        with translation.override('en'):
+            self.assertIs(
+                AutocompleteLazyColor().get_choices_index(), english)
+        with translation.override('fr'):
+            self.assertIs(
+                AutocompleteLazyColor().get_choices_index(), french)
+
+    def test_instance_choices(self):
+        instance = AutocompleteColor()
+        instance.choices = (('red', 'Red'),)
+        self.assertEqual(instance.selected(['red']), [('red', 'Red')])
+        # The class index is untouched
+        self.assertEqual(AutocompleteColor().selected(['red']), [])
+
+
 # Using the default settings based on constants
 @override_settings(
     AGNOCOMPLETE_DEFAULT_PAGESIZE=None,
@@ -317,6 +380,108 @@ class AutocompletePersonTest(LoaddataTestCase):
         )
 
 
+class AutocompletePersonValues(AutocompletePerson):
+    label_fields = ['first_name', 'last_name']
+
+
+class AutocompletePersonExpression(AutocompletePerson):
+    label_expression = Concat('first_name', Value(' '), 'last_name')
+
+
+class AutocompletePersonOnly(AutocompletePerson):
+    only_fields = ['first_name', 'last_name']
+
+
+class AutocompletePersonLabelValues(AutocompletePersonLabel):
+    label_fields = ['first_name', 'last_name']
+
+
+class ValuesModeTest(LoaddataTestCase):
+
+    def _get_sql(self, instance, *args):
+        with CaptureQueriesContext(connection) as context:
+            result = instance(*args)
+        self.assertEqual(len(context.captured_queries), 1)
+        return result, context.captured_queries[0]['sql']
+
+    def test_values_mode(self):
+        self.assertFalse(AutocompletePerson().is_values_mode())
+        self.assertTrue(AutocompletePersonValues().is_values_mode())
+        self.assertTrue(AutocompletePersonExpression().is_values_mode())
+        # label() is overridden, it needs the model instance
+        self.assertFalse(AutocompletePersonLabelValues().is_values_mode())
+
+    def test_items(self):
+        expected = AutocompletePerson().items(query='ali')
+        for klass in (AutocompletePersonValues, AutocompletePersonExpression):
+            items, sql = self._get_sql(klass().items, 'ali')
+            self.assertEqual(items, expected)
+            self.assertNotIn('email', sql)
+
+    def test_items_only(self):
+        expected = AutocompletePerson().items(query='ali')
+        items, sql = self._get_sql(AutocompletePersonOnly().items, 'ali')
+        self.assertEqual(items, expected)
+        self.assertNotIn('email', sql)
+
+    def test_selected(self):
+        instance = AutocompletePersonValues()
+        result, sql = self._get_sql(instance.selected, ['2'])
+        self.assertEqual(result, [(text('2'), text('Alice Inchains'))])
+        self.assertNotIn('email', sql)
+
+
+class AutocompletePersonRanked(AutocompletePerson):
+    ranking = True
+
+
+class AutocompletePersonRankedWeights(AutocompletePersonRanked):
+    field_weights = {'last_name': 3}
+
+
+class RankingTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for first_name, last_name in (
+                ('Bobbington', 'Smith'),
+                ('Anna', 'Bobbington'),
+                ('Jean', 'Le Bobo'),
+                ('Jimbob', 'Jones')):
+            Person.objects.create(
+                first_name=first_name, last_name=last_name,
+                email='{}@example.com'.format(first_name.lower()))
+
+    def _labels(self, klass):
+        with CaptureQueriesContext(connection) as context:
+            items = klass(page_size=10).items(query='bob')
+        self.assertEqual(len(context.captured_queries), 1)
+        return [item['label'] for item in items]
+
+    def test_no_ranking(self):
+        instance = AutocompletePerson()
+        qs = instance.get_items_queryset(query='bob')
+        self.assertNotIn('agnocomplete_relevance', qs.query.annotations)
+
+    def test_ranking(self):
+        labels = self._labels(AutocompletePersonRanked)
+        # Exact match first, then prefix, word prefix and substring matches
+        self.assertEqual(labels[0], 'Bob Hope')
+        self.assertEqual(
+            set(labels[1:3]), {'Bobbington Smith', 'Anna Bobbington'})
+        self.assertEqual(labels[3:], ['Jean Le Bobo', 'Jimbob Jones'])
+
+    def test_weights(self):
+        labels = self._labels(AutocompletePersonRankedWeights)
+        self.assertEqual(labels, [
+            'Anna Bobbington',
+            'Bob Hope',
+            'Jean Le Bobo',
+            'Bobbington Smith',
+            'Jimbob Jones',
+        ])
+
+
 class RequiresAuthenticationTest(LoaddataTestCase):
 
     def test_does_not_require(self):
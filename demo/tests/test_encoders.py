@@ -0,0 +1,94 @@
+from decimal import Decimal
+import json
+import uuid
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+import mock
+
+from agnocomplete import encoders, get_namespace
+from agnocomplete.encoders import (
+    DjangoEncoder,
+    OrjsonEncoder,
+    PlainEncoder,
+    get_json_encoder,
+)
+
+from . import LoaddataTestCase, get_json
+
+PAYLOAD = {'data': [{'value': '1', 'label': 'Alice Iñtërnâtiônàlizætiøn'}]}
+
+
+class EncodersTest(SimpleTestCase):
+
+    def test_encoders(self):
+        for klass in (DjangoEncoder, PlainEncoder, OrjsonEncoder):
+            encoded = klass().encode(PAYLOAD)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(json.loads(encoded), PAYLOAD)
+
+    def test_rich_types(self):
+        payload = {
+            'label': gettext_lazy('Hello'),
+            'value': Decimal('1.5'),
+            'uuid': uuid.UUID(int=1),
+        }
+        for klass in (DjangoEncoder, OrjsonEncoder):
+            data = json.loads(klass().encode(payload))
+            self.assertEqual(data['label'], 'Hello')
+            self.assertEqual(data['value'], '1.5')
+            self.assertEqual(data['uuid'], str(uuid.UUID(int=1)))
+        with self.assertRaises(TypeError):
+            PlainEncoder().encode(payload)
+
+    def test_orjson_fallback(self):
+        with mock.patch.object(encoders, 'orjson', None):
+            with self.assertLogs('agnocomplete.encoders', 'WARNING'):
+                encoder = OrjsonEncoder()
+        self.assertEqual(json.loads(encoder.encode(PAYLOAD)), PAYLOAD)
+
+    def test_get_json_encoder(self):
+        path = 'agnocomplete.encoders.PlainEncoder'
+        self.assertIsInstance(get_json_encoder(path), PlainEncoder)
+        self.assertIs(get_json_encoder(path), get_json_encoder(path))
+        self.assertIsInstance(get_json_encoder(PlainEncoder), PlainEncoder)
+        encoder = PlainEncoder()
+        self.assertIs(get_json_encoder(encoder), encoder)
+
+
+@override_settings(
+    AGNOCOMPLETE_JSON_ENCODER='agnocomplete.encoders.OrjsonEncoder')
+class EncoderViewTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            get_namespace() + ':agnocomplete', args=['AutocompletePerson'])
+
+    def test_view(self):
+        with mock.patch.object(
+                OrjsonEncoder, 'encode',
+                autospec=True, side_effect=OrjsonEncoder.encode) as encode:
+            response = self.client.get(self.url, data={'q': 'ali'})
+        self.assertTrue(encode.called)
+        data = get_json(response, None)
+        with override_settings(
+                AGNOCOMPLETE_JSON_ENCODER=(
+                    'agnocomplete.encoders.DjangoEncoder')):
+            expected = get_json(
+                self.client.get(self.url, data={'q': 'ali'}), None)
+        self.assertEqual(data, expected)
+
+    def test_errors(self):
+        url = reverse(get_namespace() + ':agnocomplete', args=['MEUH'])
+        response = self.client.get(url, data={'q': 'ali'})
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('errors', get_json(response, None))
+
+    @override_settings(AGNOCOMPLETE_STREAMING=True)
+    def test_streaming(self):
+        response = self.client.get(self.url, data={'q': 'ali'})
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['data']), 4)
@@ -144,7 +144,7 @@ class ErrorHandlingURLProxyTimeoutTest(LoaddataLiveTestCase):
     def test_timeout(self):
         # Search using the URL proxy view
         search_url = get_namespace() + ':agnocomplete'
-        with mock.patch('requests.get', raise_timeout):
+        with mock.patch('requests.Session.get', raise_timeout):
             response = self.client.get(
                 reverse(
                     search_url, args=[self.klass.__name__]),
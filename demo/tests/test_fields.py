@@ -1,7 +1,11 @@
+import copy
+
 from django import forms
+from django.db import connection
 from django.urls import reverse
-from django.test import LiveServerTestCase, TestCase, override_settings
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
+from django.test.utils import CaptureQueriesContext
 import mock
 
 from agnocomplete import fields
@@ -12,17 +16,19 @@ from agnocomplete.fields import (
     AgnocompleteModelMultipleField,
 )
 from agnocomplete.forms import UserContextFormMixin
+from agnocomplete.instrumentation import Timings
 from demo.autocomplete import (
     AutocompleteColor,
     HiddenAutocompleteURL,
     HiddenAutocompleteURLReverse,
     AutocompleteTag,
+    AutocompletePerson,
     AutocompletePersonDomain,
     AutocompleteUrlSkipItem,
 )
-from demo.fields import AgnocompleteUrlProxyField
+from demo.fields import AgnocompleteUrlProxyField, ModelMultipleObjectsField
 from demo.models import Tag, Person
-from demo.tests import LoaddataTestCase
+from demo.tests import LiveServerTestCase, LoaddataTestCase
 
 
 class AgnocompleteInstanceTest(TestCase):
@@ -71,6 +77,74 @@ class AgnocompleteInstanceTest(TestCase):
         )
 
 
+class LazyAgnocompleteTest(TestCase):
+
+    class _Form(forms.Form):
+        color = AgnocompleteField(AutocompleteColor)
+        tags = AgnocompleteModelMultipleField('AutocompleteTag')
+
+    def test_lazy_instance(self):
+        with mock.patch.object(
+                AutocompleteColor, '__init__', return_value=None) as init:
+            field = AgnocompleteField(AutocompleteColor, user='user')
+            self.assertFalse(init.called)
+            self.assertIsInstance(field.agnocomplete, AutocompleteColor)
+        init.assert_called_once_with(user='user')
+        self.assertIs(field.agnocomplete, field.agnocomplete)
+        self.assertIs(field.widget.agnocomplete, field.agnocomplete)
+        self.assertIs(field.agnocomplete.agnocomplete_field, field)
+
+    def test_lazy_queryset(self):
+        field = AgnocompleteModelMultipleField(AutocompleteTag)
+        self.assertIsNone(field._agnocomplete)
+        self.assertEqual(field.queryset.model, Tag)
+        self.assertIsInstance(field._agnocomplete, AutocompleteTag)
+
+    def test_form_copies(self):
+        first, second = self._Form(), self._Form()
+        for name in ('color', 'tags'):
+            field = first.fields[name]
+            self.assertIsNot(
+                field.agnocomplete, second.fields[name].agnocomplete)
+            self.assertIs(field.agnocomplete.agnocomplete_field, field)
+            self.assertIs(field.widget.agnocomplete, field.agnocomplete)
+        # The user context isn't shared between the forms
+        first.fields['tags'].agnocomplete.user = 'user'
+        self.assertIsNone(second.fields['tags'].agnocomplete.user)
+
+    def test_choices_not_copied(self):
+        field = AgnocompleteField(AutocompleteColor)
+        field.agnocomplete
+        with mock.patch.object(
+                AutocompleteColor, 'get_choices',
+                return_value=AutocompleteColor.choices) as get_choices:
+            form = self._Form(data={'color': 'green'})
+            self.assertFalse(get_choices.called)
+            self.assertNotIn('color', form.errors)
+            self.assertTrue(get_choices.called)
+        copied = copy.deepcopy(field)
+        self.assertIs(copied.agnocomplete.choices, AutocompleteColor.choices)
+        self.assertIs(copied.agnocomplete.agnocomplete_field, copied)
+
+    def test_instance_copy(self):
+        instance = AutocompleteColor(page_size=3, cursor='cursor')
+        instance.next_cursor = 'next'
+        instance.timings = Timings()
+        copied = copy.deepcopy(instance)
+        self.assertIsNot(copied, instance)
+        self.assertEqual(copied.get_page_size(), 3)
+        self.assertIsNone(copied.get_cursor())
+        self.assertIsNone(copied.next_cursor)
+        self.assertIsNone(copied.timings)
+
+    def test_model_instance_copy(self):
+        instance = AutocompletePerson()
+        instance.items(query='ali')
+        self.assertIsNotNone(instance.final_raw_queryset)
+        copied = copy.copy(instance)
+        self.assertIsNone(copied.final_raw_queryset)
+
+
 class ModelSelectTest(LoaddataTestCase):
     class _Form(UserContextFormMixin, forms.Form):
         person = fields.AgnocompleteModelField(AutocompletePersonDomain,
@@ -128,6 +202,29 @@ class ModelSelectTest(LoaddataTestCase):
         self.assertNotIn('<option', html_form)
 
 
+class ModelChoicesIterationTest(LoaddataTestCase):
+
+    def test_refused(self):
+        field = fields.AgnocompleteModelField(AutocompletePersonDomain)
+        with self.assertLogs('agnocomplete.fields', 'WARNING'):
+            with CaptureQueriesContext(connection) as queries:
+                choices = list(field.choices)
+        self.assertEqual(choices, [('', field.empty_label)])
+        # Only the first rows are fetched
+        self.assertIn('LIMIT 1', queries[0]['sql'])
+        self.assertEqual(len(field.choices), 1)
+
+    @override_settings(AGNOCOMPLETE_CHOICES_ITERATION_LIMIT=100)
+    def test_limit(self):
+        field = fields.AgnocompleteModelMultipleField(AutocompletePersonDomain)
+        self.assertEqual(len(list(field.choices)), Person.objects.count())
+        self.assertEqual(len(field.choices), Person.objects.count())
+
+    def test_validation(self):
+        field = fields.AgnocompleteModelField(AutocompletePersonDomain)
+        self.assertEqual(field.clean('3'), Person.objects.get(pk=3))
+
+
 class MultipleSelectTest(TestCase):
     def test_empty(self):
         field = AgnocompleteMultipleField(
@@ -232,6 +329,56 @@ class MultipleModelSelectTest(LoaddataTestCase):
         self.assertNotIn('<option', html_form)
 
 
+class BulkCreateField(AgnocompleteModelMultipleField):
+    bulk_create = True
+
+
+class CreateNewValuesTest(TestCase):
+
+    def get_field(self, klass=AgnocompleteModelMultipleField):
+        field = klass(AutocompleteTag, create_field="name", required=False)
+        field.clean(['first', 'second', 'first', 'third'])
+        return field
+
+    def test_default(self):
+        Tag.objects.create(name='second')
+        field = self.get_field()
+        self.assertFalse(field.is_bulk_create())
+        with mock.patch('django.db.models.signals.post_save.send') as send:
+            tags = field.create_new_values()
+        # One post_save per created tag
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(
+            sorted(tag.name for tag in tags), ['first', 'second', 'third'])
+
+    def test_bulk_create(self):
+        Tag.objects.create(name='second')
+        field = self.get_field(BulkCreateField)
+        self.assertTrue(field.is_bulk_create())
+        with CaptureQueriesContext(connection) as queries:
+            tags = field.create_new_values()
+        # select + insert + re-fetch (and the savepoint queries)
+        sql = [q['sql'] for q in queries]
+        self.assertLessEqual(
+            len([q for q in sql if 'SAVEPOINT' not in q]), 3)
+        # Everything runs in the transaction
+        self.assertTrue(sql[-1].startswith('RELEASE SAVEPOINT'))
+        with self.assertNumQueries(0):
+            tags = list(tags)
+        self.assertEqual(
+            sorted(tag.name for tag in tags), ['first', 'second', 'third'])
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_create_item_override(self):
+        Tag.objects.create(name='second')
+        field = self.get_field(ModelMultipleObjectsField)
+        self.assertFalse(field.is_bulk_create())
+        field.create_new_values()
+        # The per-item hook is still used, allowing duplicates
+        self.assertEqual(Tag.objects.filter(name='second').count(), 2)
+        self.assertEqual(Tag.objects.filter(name='first').count(), 2)
+
+
 @override_settings(HTTP_HOST='')
 class FieldUrlProxyTest(LiveServerTestCase):
 
@@ -0,0 +1,133 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import get_namespace
+from agnocomplete.cache import LRUCache
+
+from ..autocomplete import (
+    AutocompleteColor,
+    AutocompletePerson,
+    AutocompletePersonDomain,
+)
+from . import LoaddataTestCase, get_json
+
+
+def get_url(slug):
+    return reverse(get_namespace() + ':agnocomplete', args=[slug])
+
+
+class HttpCacheDisabledTest(TestCase):
+
+    def test_no_headers(self):
+        response = self.client.get(
+            get_url('AutocompleteColor'), data={'q': 'gre'})
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Cache-Control', response)
+
+
+@mock.patch.object(AutocompleteColor, 'http_cache_max_age', 60)
+class ChoicesHttpCacheTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = get_url('AutocompleteColor')
+
+    def test_headers(self):
+        response = self.client.get(self.url, data={'q': 'gre'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('X-Requested-With', response['Vary'])
+        self.assertNotIn('Cookie', response['Vary'])
+        etag = response['ETag']
+        # Deterministic, and depending on the query
+        response = self.client.get(self.url, data={'q': 'gre'})
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, data={'q': 'gree'})
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url, data={'q': 'gre'})
+        etag = response['ETag']
+        with mock.patch.object(AutocompleteColor, 'items') as items:
+            response = self.client.get(
+                self.url, data={'q': 'gre'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('max-age=60', response['Cache-Control'])
+        # The items have been neither computed nor serialized
+        self.assertFalse(items.called)
+        response = self.client.get(
+            self.url, data={'q': 'gre'}, HTTP_IF_NONE_MATCH='W/' + etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            self.url, data={'q': 'gre'}, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_content_version(self):
+        instance = AutocompleteColor()
+        version = instance.get_content_version()
+        self.assertEqual(AutocompleteColor().get_content_version(), version)
+        instance.choices = (('red', 'Red'),)
+        self.assertNotEqual(instance.get_content_version(), version)
+
+    def test_async_view(self):
+        url = reverse('async-agnocomplete', args=['AutocompleteColor'])
+        response = self.client.get(url, data={'q': 'gre'})
+        etag = response['ETag']
+        response = self.client.get(
+            url, data={'q': 'gre'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+@mock.patch.object(AutocompletePerson, 'http_cache_max_age', 60)
+class ModelHttpCacheTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = get_url('AutocompletePerson')
+
+    def test_content_etag(self):
+        # No result cache: the ETag is computed from the content
+        response = self.client.get(self.url, data={'q': 'ali'})
+        etag = response['ETag']
+        response = self.client.get(
+            self.url, data={'q': 'ali'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_cache_generation(self):
+        with mock.patch.object(
+                AutocompletePerson, 'cache_backend', LRUCache()):
+            response = self.client.get(self.url, data={'q': 'ali'})
+            etag = response['ETag']
+            response = self.client.get(
+                self.url, data={'q': 'ali'}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            AutocompletePerson.invalidate_cache()
+            response = self.client.get(
+                self.url, data={'q': 'ali'}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_error(self):
+        response = self.client.get(
+            get_url('AutocompletePersonDomain'), data={'q': 'ali'})
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('ETag', response)
+
+
+@mock.patch.object(AutocompletePersonDomain, 'http_cache_max_age', 60)
+class UserHttpCacheTest(LoaddataTestCase):
+
+    def test_private(self):
+        User.objects.create_user('bob', 'bob@example.com', 'bobpassword')
+        self.client.login(username='bob', password='bobpassword')
+        response = self.client.get(
+            get_url('AutocompletePersonDomain'), data={'q': 'ali'})
+        self.assertTrue(get_json(response))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
@@ -0,0 +1,116 @@
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import get_namespace
+from agnocomplete.instrumentation import Timings, MetricsSink
+from agnocomplete.instrumentation import get_metrics_sinks
+from agnocomplete.signals import agnocomplete_request_started
+from agnocomplete.signals import agnocomplete_request_finished
+
+from ..autocomplete import AutocompletePerson
+from . import LoaddataTestCase
+
+
+class RecordingSink(MetricsSink):
+    records = []
+
+    def record(self, slug, timings, status):
+        self.records.append((slug, timings, status))
+
+
+class FailingSink(MetricsSink):
+
+    def record(self, slug, timings, status):
+        raise Exception("Nothing exceptional")
+
+
+class TimingsTest(TestCase):
+
+    def test_phase(self):
+        timings = Timings()
+        with mock.patch('agnocomplete.instrumentation.perf_counter') as clock:
+            clock.side_effect = [1, 1.5, 2, 2.25]
+            with timings.phase('db'):
+                pass
+            with timings.phase('db'):
+                pass
+        self.assertEqual(timings.phases, {'db': 0.75})
+        self.assertEqual(timings.as_server_timing(), 'db;dur=750.000')
+
+    def test_not_instrumented(self):
+        instance = AutocompletePerson()
+        self.assertIsNone(instance.timings)
+        # No-op context manager
+        with instance.timing('db'):
+            pass
+
+
+class InstrumentedViewTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            get_namespace() + ':agnocomplete', args=['AutocompletePerson'])
+        RecordingSink.records = []
+
+    def test_signals(self):
+        started = mock.Mock()
+        finished = mock.Mock()
+        agnocomplete_request_started.connect(started)
+        agnocomplete_request_finished.connect(finished)
+        try:
+            self.client.get(self.url, data={'q': 'ali'})
+        finally:
+            agnocomplete_request_started.disconnect(started)
+            agnocomplete_request_finished.disconnect(finished)
+
+        self.assertEqual(started.call_count, 1)
+        self.assertEqual(started.call_args[1]['slug'], 'AutocompletePerson')
+        self.assertEqual(finished.call_count, 1)
+        kwargs = finished.call_args[1]
+        self.assertEqual(kwargs['slug'], 'AutocompletePerson')
+        self.assertEqual(kwargs['status'], 200)
+        self.assertEqual(kwargs['count'], 4)
+        self.assertIsNone(kwargs['cache_hit'])
+        self.assertEqual(
+            set(kwargs['timings']),
+            {'query', 'db', 'serialize', 'encode', 'total'}
+        )
+
+    def test_unknown_slug(self):
+        finished = mock.Mock()
+        agnocomplete_request_finished.connect(finished)
+        try:
+            url = reverse(get_namespace() + ':agnocomplete', args=['MEUH'])
+            self.client.get(url, data={'q': 'ali'})
+        finally:
+            agnocomplete_request_finished.disconnect(finished)
+        kwargs = finished.call_args[1]
+        self.assertIsNone(kwargs['slug'])
+        self.assertEqual(kwargs['status'], 404)
+
+    def test_server_timing(self):
+        response = self.client.get(self.url, data={'q': 'ali'})
+        self.assertNotIn('Server-Timing', response)
+        with override_settings(AGNOCOMPLETE_SERVER_TIMING=True):
+            response = self.client.get(self.url, data={'q': 'ali'})
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    @override_settings(AGNOCOMPLETE_METRICS_SINKS=[
+        'demo.tests.test_instrumentation.FailingSink',
+        'demo.tests.test_instrumentation.RecordingSink',
+    ])
+    def test_metrics_sinks(self):
+        self.assertEqual(len(get_metrics_sinks()), 2)
+        response = self.client.get(self.url, data={'q': 'ali'})
+        # The failing sink doesn't break the response
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(RecordingSink.records), 1)
+        slug, timings, status = RecordingSink.records[0]
+        self.assertEqual(slug, 'AutocompletePerson')
+        self.assertEqual(status, 200)
+        self.assertEqual(timings.count, 4)
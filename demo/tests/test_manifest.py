@@ -0,0 +1,134 @@
+from io import StringIO
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import get_namespace
+from agnocomplete.manifest import (
+    get_client_side_classes,
+    get_manifest_filename,
+    get_manifest_url,
+    is_client_side,
+)
+
+from ..autocomplete import AutocompleteColor, AutocompletePerson
+from ..forms import SearchForm
+from . import get_json
+
+
+def get_url(slug, version):
+    return reverse(get_namespace() + ':manifest', args=[slug, version])
+
+
+class ManifestTest(TestCase):
+
+    def test_not_client_side(self):
+        self.assertFalse(is_client_side(AutocompleteColor))
+        self.assertFalse(is_client_side(AutocompletePerson))
+        response = self.client.get(get_url('AutocompleteColor', 'abc'))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('errors', get_json(response, None))
+
+    def test_no_widget_attribute(self):
+        form = SearchForm()
+        self.assertNotIn('data-manifest-url', str(form['search_color']))
+
+
+@mock.patch.object(AutocompleteColor, 'client_side', True)
+class ClientSideManifestTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.version = AutocompleteColor().get_content_version()
+        self.url = get_url('AutocompleteColor', self.version)
+
+    def test_client_side(self):
+        self.assertTrue(is_client_side(AutocompleteColor))
+        self.assertTrue(is_client_side(AutocompleteColor()))
+        # Subclasses inherit the flag
+        classes = get_client_side_classes()
+        self.assertIn('AutocompleteColor', classes)
+        self.assertIn('AutocompleteColorExtra', classes)
+        self.assertNotIn('AutocompletePerson', classes)
+
+    def test_view(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = get_json(response, None)
+        self.assertEqual(data['version'], self.version)
+        self.assertEqual(
+            len(data['data']), len(AutocompleteColor.choices))
+        self.assertEqual(data['data'][0], {'value': 'green', 'label': 'Green'})
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_outdated_version(self):
+        response = self.client.get(get_url('AutocompleteColor', 'outdated'))
+        self.assertRedirects(response, self.url)
+
+    def test_widget_attribute(self):
+        form = SearchForm()
+        self.assertIn(
+            'data-manifest-url="{}"'.format(self.url),
+            str(form['search_color']))
+
+    @override_settings(AGNOCOMPLETE_MANIFEST_STATIC=True)
+    def test_static_url(self):
+        self.assertEqual(
+            get_manifest_url(AutocompleteColor()),
+            '/static/agnocomplete/manifests/AutocompleteColor.{}.json'.format(
+                self.version))
+
+
+@mock.patch.object(AutocompleteColor, 'client_side', True)
+class BuildManifestsTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.directory = os.path.join(self.root, 'agnocomplete', 'manifests')
+
+    def test_no_output(self):
+        with self.assertRaises(CommandError):
+            call_command('agnocomplete_build_manifests')
+
+    def test_build(self):
+        call_command(
+            'agnocomplete_build_manifests', output=self.root,
+            stdout=StringIO())
+        instance = AutocompleteColor()
+        path = os.path.join(self.directory, get_manifest_filename(instance))
+        with open(path) as fd:
+            data = json.load(fd)
+        self.assertEqual(data['version'], instance.get_content_version())
+        self.assertEqual(data['data'], instance.get_manifest_items())
+        self.assertEqual(
+            len(os.listdir(self.directory)), len(get_client_side_classes()))
+
+    def test_clear(self):
+        stale = os.path.join(self.directory, 'AutocompleteColor.old.json')
+        os.makedirs(self.directory)
+        open(stale, 'w').close()
+        with override_settings(AGNOCOMPLETE_MANIFEST_ROOT=self.root):
+            call_command('agnocomplete_build_manifests', stdout=StringIO())
+            self.assertTrue(os.path.exists(stale))
+            call_command(
+                'agnocomplete_build_manifests', '--clear', stdout=StringIO())
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(
+            len(os.listdir(self.directory)), len(get_client_side_classes()))
@@ -0,0 +1,130 @@
+from django import forms
+from django.test import RequestFactory, SimpleTestCase
+
+from agnocomplete import fields
+from agnocomplete.memo import (
+    SelectedMemoMiddleware,
+    get_selected_memo,
+    memoize_selected,
+    selected_memo,
+)
+
+from ..autocomplete import AutocompletePerson
+from ..forms import SearchContextForm
+from ..models import Person
+from . import LoaddataTestCase
+
+
+class PeopleForm(forms.Form):
+    person = fields.AgnocompleteModelField(AutocompletePerson)
+    others = fields.AgnocompleteModelMultipleField(AutocompletePerson)
+    email = forms.EmailField()
+
+
+class AutocompletePersonValues(AutocompletePerson):
+    label_fields = ['first_name', 'last_name']
+
+
+class PeopleValuesForm(forms.Form):
+    person = fields.AgnocompleteModelField(AutocompletePersonValues)
+    others = fields.AgnocompleteModelMultipleField(AutocompletePersonValues)
+    email = forms.EmailField()
+
+
+class SelectedMemoTest(SimpleTestCase):
+
+    def test_memoize(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        self.assertIsNone(get_selected_memo())
+        self.assertEqual(memoize_selected('key', fetch), 1)
+        self.assertEqual(memoize_selected('key', fetch), 2)
+        with selected_memo():
+            self.assertEqual(memoize_selected('key', fetch), 3)
+            self.assertEqual(memoize_selected('key', fetch), 3)
+        self.assertIsNone(get_selected_memo())
+
+    def test_middleware(self):
+        memos = []
+
+        def get_response(request):
+            memos.append(get_selected_memo())
+            return 'response'
+
+        middleware = SelectedMemoMiddleware(get_response)
+        request = RequestFactory().get('/')
+        self.assertEqual(middleware(request), 'response')
+        self.assertEqual(memos, [{}])
+        self.assertIsNone(get_selected_memo())
+
+
+class SelectedMemoFormTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = {'person': '1', 'others': ['2', '3'], 'email': 'invalid'}
+
+    def test_no_memo(self):
+        form = PeopleForm(data=self.data)
+        with self.assertNumQueries(4):
+            self.assertFalse(form.is_valid())
+            str(form['person'])
+            str(form['others'])
+
+    def test_invalid_form(self):
+        with selected_memo():
+            form = PeopleForm(data=self.data)
+            with self.assertNumQueries(2):
+                self.assertFalse(form.is_valid())
+                str(form['person'])
+                str(form['others'])
+                # Rendered twice
+                str(form['person'])
+        self.assertEqual(form.cleaned_data['person'].pk, 1)
+        self.assertEqual(
+            sorted(p.pk for p in form.cleaned_data['others']), [2, 3])
+
+    def test_invalid_form_values_mode(self):
+        expected = PeopleValuesForm(data=self.data)
+        expected.is_valid()
+        expected = str(expected)
+        with selected_memo():
+            form = PeopleValuesForm(data=self.data)
+            # One query per id set
+            with self.assertNumQueries(2):
+                self.assertFalse(form.is_valid())
+                rendered = str(form)
+        self.assertEqual(rendered, expected)
+        self.assertIn('Alice Inchains', rendered)
+
+    def test_invalid_choice(self):
+        pk = Person.objects.order_by('pk').last().pk + 1
+        self.data.update(person=str(pk), others=['2', str(pk)])
+        with selected_memo():
+            form = PeopleForm(data=self.data)
+            self.assertFalse(form.is_valid())
+        self.assertIn('person', form.errors)
+        self.assertIn('others', form.errors)
+
+    def test_user_context(self):
+        alice = Person.objects.get(pk=1)
+        with selected_memo():
+            form = SearchContextForm(
+                user=alice, data={'search_person': alice.pk})
+            self.assertTrue(form.is_valid())
+            # The field queryset has been filtered, it's not using the memo
+            self.assertFalse(form.fields['search_person'].use_selected_memo())
+
+    def test_memo_key(self):
+        instance = AutocompletePerson()
+        key = instance.get_selected_memo_key('objects', ['1', 2])
+        self.assertEqual(
+            key, (AutocompletePerson, 'pk', None, 'objects',
+                  frozenset(['1', '2'])))
+        instance.user = Person.objects.get(pk=1)
+        self.assertNotEqual(
+            instance.get_selected_memo_key('objects', ['1', 2]), key)
@@ -0,0 +1,159 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from agnocomplete.narrowing import CandidateSet, get_narrowing_cache
+
+from ..autocomplete import AutocompletePerson, AutocompleteLastNameStartsWith
+from ..models import Person
+from . import LoaddataTestCase
+from .test_pagination import fetch_all
+
+
+class AutocompletePersonNarrowing(AutocompletePerson):
+    narrowing = True
+
+
+class AutocompletePersonNarrowingValues(AutocompletePersonNarrowing):
+    label_fields = ['first_name', 'last_name']
+
+
+class AutocompletePersonNarrowingPages(AutocompletePersonNarrowing):
+    page_size = 2
+    page_size_min = 2
+
+
+class AutocompletePersonNarrowingSmall(AutocompletePersonNarrowing):
+    narrowing_threshold = 2
+
+
+class AutocompletePersonNarrowingPartial(AutocompletePersonNarrowing):
+    narrowing_threshold = 5
+    page_size = 3
+    page_size_min = 3
+
+
+class AutocompletePersonNarrowingRanked(AutocompletePersonNarrowing):
+    ranking = True
+
+
+class AutocompleteLastNameNarrowing(AutocompleteLastNameStartsWith):
+    narrowing = True
+    query_size_min = 2
+
+
+class CandidateSetTest(SimpleTestCase):
+
+    def setUp(self):
+        self.candidates = CandidateSet(
+            ['icontains', 'istartswith'],
+            [
+                ('a', [1], ['Alice', 'Cooper']),
+                ('b', [2], ['Bob', 'Alison']),
+                ('c', [3], ['Malice', None]),
+            ],
+        )
+
+    def test_page(self):
+        page, more = self.candidates.page('ALI', 10)
+        self.assertEqual([c.item for c in page], ['a', 'b', 'c'])
+        self.assertFalse(more)
+        page, more = self.candidates.page('oper', 10)
+        # "istartswith" on the second field only
+        self.assertEqual([c.item for c in page], [])
+
+    def test_pagination(self):
+        page, more = self.candidates.page('ali', 1)
+        self.assertEqual([c.item for c in page], ['a'])
+        self.assertTrue(more)
+        page, more = self.candidates.page('ali', 1, after=[1])
+        self.assertEqual([c.item for c in page], ['b'])
+        self.assertTrue(more)
+        page, more = self.candidates.page('ali', 2, after=[2])
+        self.assertEqual([c.item for c in page], ['c'])
+        self.assertFalse(more)
+        self.assertIsNone(self.candidates.page('ali', 1, after=[42]))
+
+
+class NarrowingTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_narrowing_cache().clear()
+
+    def assertNarrowed(self, klass, reference, queries):
+        for query in queries:
+            self.assertEqual(
+                klass().items(query), reference().items(query), query)
+
+    def test_is_narrowing(self):
+        self.assertTrue(AutocompletePersonNarrowing().is_narrowing('ali'))
+        self.assertFalse(AutocompletePersonNarrowing().is_narrowing('a'))
+        self.assertFalse(AutocompletePerson().is_narrowing('ali'))
+        self.assertFalse(
+            AutocompletePersonNarrowingRanked().is_narrowing('ali'))
+
+    def test_narrowed_queries(self):
+        AutocompletePersonNarrowing().items('al')
+        with CaptureQueriesContext(connection) as queries:
+            items = AutocompletePersonNarrowing().items('alic')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(items, AutocompletePerson().items('alic'))
+        self.assertNarrowed(
+            AutocompletePersonNarrowing, AutocompletePerson,
+            ['ali', 'ALICE', 'bo', 'hope', 'sky', 'zz'])
+
+    def test_values_mode(self):
+        self.assertNarrowed(
+            AutocompletePersonNarrowingValues, AutocompletePerson,
+            ['al', 'alic', 'alice', 'lu', 'luke'])
+
+    def test_startswith(self):
+        self.assertNarrowed(
+            AutocompleteLastNameNarrowing, AutocompleteLastNameStartsWith,
+            ['sk', 'sky', 'ky'])
+
+    def test_threshold(self):
+        AutocompletePersonNarrowingSmall().items('al')
+        with CaptureQueriesContext(connection) as queries:
+            items = AutocompletePersonNarrowingSmall().items('ali')
+        # Too many candidates, they haven't been remembered
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(items, AutocompletePerson().items('ali'))
+
+    def test_threshold_over_page(self):
+        for index in range(10):
+            Person.objects.create(
+                first_name='xa{}'.format(index), last_name='q',
+                email='xa{}@example.com'.format(index))
+        Person.objects.create(
+            first_name='xazz', last_name='q', email='xazz@example.com')
+        AutocompletePersonNarrowingPartial().items('xa')
+        with CaptureQueriesContext(connection) as queries:
+            items = AutocompletePersonNarrowingPartial().items('xaz')
+        # Only the first page was fetched, it hasn't been remembered
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items, AutocompletePerson().items('xaz'))
+
+    def test_pages(self):
+        AutocompletePersonNarrowingPages().items('al')
+        with CaptureQueriesContext(connection) as queries:
+            pages = fetch_all(AutocompletePersonNarrowingPages, 'alice')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual([len(page) for page in pages], [2, 2])
+        self.assertEqual(
+            [item['label'] for item in sum(pages, [])],
+            [item['label'] for item in AutocompletePerson().items('alice')])
+
+    def test_invalidate_cache(self):
+        AutocompletePersonNarrowing().items('al')
+        Person.objects.create(
+            first_name='Alicia', last_name='Keys', email='alicia@example.com')
+        self.assertNotEqual(
+            AutocompletePersonNarrowing().items('alic'),
+            AutocompletePerson().items('alic'))
+        AutocompletePersonNarrowing.invalidate_cache()
+        self.assertEqual(
+            AutocompletePersonNarrowing().items('alic'),
+            AutocompletePerson().items('alic'))
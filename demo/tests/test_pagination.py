@@ -0,0 +1,269 @@
+from django.core import signing
+from django.db.models import Max, Q
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import get_namespace
+from agnocomplete.cache import LRUCache
+from agnocomplete.pagination import InvalidCursor
+from agnocomplete.pagination import decode_cursor, encode_cursor
+from agnocomplete.pagination import get_keyset_filter
+
+from ..autocomplete import (
+    AutocompleteChoicesPages,
+    AutocompletePerson,
+    AutocompleteUrlSimple,
+)
+from ..models import Person, PersonTag
+from . import LoaddataTestCase, get_json
+
+
+class AutocompletePersonPages(AutocompletePerson):
+    page_size = 2
+    page_size_min = 2
+
+
+class AutocompletePersonPagesValues(AutocompletePersonPages):
+    label_fields = ['first_name', 'last_name']
+
+
+class AutocompletePersonPagesRanked(AutocompletePersonPages):
+    ranking = True
+
+
+class AutocompletePersonPagesCached(AutocompletePersonPages):
+    cache_backend = LRUCache()
+
+
+class AutocompletePersonPagesNullable(AutocompletePersonPages):
+    # The tag is NULL for the untagged persons
+    ordering = ('-tag',)
+
+    def get_queryset(self):
+        return Person.objects.annotate(
+            tag=Max('persontag__pk')).order_by(*self.ordering)
+
+
+class AutocompletePersonPagesNullableAsc(AutocompletePersonPagesNullable):
+    ordering = ('tag',)
+
+
+class AutocompleteUrlPages(AutocompleteUrlSimple):
+    page_key = 'page'
+    next_page_key = 'next_page'
+
+
+def fetch_all(klass, query, **kwargs):
+    """
+    Return every page of results, following the cursors.
+    """
+    pages = []
+    cursor = None
+    while True:
+        instance = klass(cursor=cursor, **kwargs)
+        pages.append(instance.fetch_items(query=query))
+        cursor = instance.next_cursor
+        if cursor is None:
+            return pages
+
+
+class CursorTest(TestCase):
+
+    def test_encode_decode(self):
+        cursor = encode_cursor([3, 'Alice'])
+        self.assertEqual(decode_cursor(cursor), [3, 'Alice'])
+
+    def test_tampered(self):
+        cursor = signing.dumps([3], salt='something-else')
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(cursor)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('MEUH')
+
+    def test_keyset_filter(self):
+        condition = get_keyset_filter(['-rank', 'pk'], [4, 12])
+        self.assertEqual(len(condition.children), 2)
+        self.assertEqual(condition.connector, 'OR')
+        self.assertIn(('rank__lt', 4), condition.children)
+
+
+class KeysetNullTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for pk in (2, 4, 5):
+            PersonTag.objects.create(person_id=pk)
+        self.queryset = Person.objects.annotate(tag=Max('persontag__pk'))
+
+    def get_sorted(self, ordering, nulls_largest):
+        """
+        Return the (tag, pk) positions, sorted in Python.
+        """
+        def key(position):
+            tag, pk = position
+            # (is null, value) sorts the NULLs last
+            is_null = tag is None
+            if not nulls_largest:
+                is_null = not is_null
+            tag_key = (is_null, tag or 0)
+            if ordering == '-tag':
+                tag_key = (not is_null, -(tag or 0))
+            return tag_key, pk
+
+        return sorted(self.queryset.values_list('tag', 'pk'), key=key)
+
+    def test_filter(self):
+        for nulls_largest in (True, False):
+            for ordering in ('tag', '-tag'):
+                positions = self.get_sorted(ordering, nulls_largest)
+                self.assertIn(None, [tag for tag, _ in positions])
+                for index, position in enumerate(positions):
+                    condition = get_keyset_filter(
+                        [ordering, 'pk'], list(position), ['tag'],
+                        nulls_largest)
+                    self.assertEqual(
+                        set(self.queryset.filter(condition).values_list(
+                            'tag', 'pk')),
+                        set(positions[index + 1:]),
+                        (ordering, nulls_largest, position))
+
+
+class ChoicesPaginationTest(TestCase):
+
+    def test_pages(self):
+        expected = AutocompleteChoicesPages(page_size=120).items('choice1')
+        self.assertEqual(len(expected), 111)
+        pages = fetch_all(AutocompleteChoicesPages, 'choice1', page_size=50)
+        self.assertEqual([len(page) for page in pages], [50, 50, 11])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_invalid_cursor(self):
+        instance = AutocompleteChoicesPages(cursor=encode_cursor(['a']))
+        with self.assertRaises(InvalidCursor):
+            instance.items('choice1')
+
+
+class ModelPaginationTest(LoaddataTestCase):
+
+    def test_pages(self):
+        expected = list(
+            Person.objects.filter(first_name='Alice').values_list(
+                'pk', flat=True).order_by('pk'))
+        pages = fetch_all(AutocompletePersonPages, 'ali')
+        # The last page is empty: the previous one was full
+        self.assertEqual([len(page) for page in pages], [2, 2, 0])
+        self.assertEqual(
+            [int(item['value']) for item in sum(pages, [])], expected)
+
+    def test_nullable_ordering(self):
+        for pk in (2, 4):
+            PersonTag.objects.create(person_id=pk)
+        for klass in (AutocompletePersonPagesNullable,
+                      AutocompletePersonPagesNullableAsc):
+            expected = list(
+                klass().get_queryset()
+                .filter(Q(first_name__icontains='ali')
+                        | Q(last_name__icontains='ali'))
+                .order_by(*klass.ordering, 'pk')
+                .values_list('pk', flat=True))
+            pages = fetch_all(klass, 'ali')
+            self.assertEqual(
+                [int(item['value']) for item in sum(pages, [])], expected)
+
+    def test_values_mode(self):
+        self.assertEqual(
+            fetch_all(AutocompletePersonPagesValues, 'ali'),
+            fetch_all(AutocompletePersonPages, 'ali'))
+
+    def test_ranking(self):
+        Person.objects.create(
+            first_name='Bobby', last_name='Ali', email='bobby@example.com')
+        Person.objects.create(
+            first_name='Ali', last_name='Baba', email='ali@example.com')
+        items = sum(fetch_all(AutocompletePersonPagesRanked, 'ali'), [])
+        labels = [item['label'] for item in items]
+        # Exact matches first
+        self.assertEqual(set(labels[:2]), {'Ali Baba', 'Bobby Ali'})
+        self.assertEqual(len(labels), len(set(labels)))
+        self.assertEqual(len(labels), 6)
+
+    def test_deep_page_query(self):
+        first = AutocompletePersonPages()
+        first.items('ali')
+        instance = AutocompletePersonPages(cursor=first.next_cursor)
+        qs = instance.get_items_queryset('ali')
+        # The following page is selected using the keyset, not an offset
+        self.assertEqual(instance.final_queryset.query.low_mark, 0)
+        self.assertIn('"id" >', str(qs.query).split('WHERE')[1])
+
+    def test_cache(self):
+        AutocompletePersonPagesCached.cache_backend.clear()
+        instance = AutocompletePersonPagesCached()
+        items = instance.fetch_items(query='ali')
+        cursor = instance.next_cursor
+        self.assertIsNotNone(cursor)
+        with mock.patch.object(
+                AutocompletePersonPages, 'items') as mock_items:
+            instance = AutocompletePersonPagesCached()
+            self.assertEqual(instance.fetch_items(query='ali'), items)
+        self.assertFalse(mock_items.called)
+        self.assertEqual(instance.next_cursor, cursor)
+
+
+class UrlProxyPaginationTest(TestCase):
+
+    def test_pages(self):
+        result = {'data': [{'value': 1, 'label': 'one'}], 'next_page': 2}
+        with mock.patch.object(
+                AutocompleteUrlPages, 'http_call',
+                return_value=result) as http_call:
+            instance = AutocompleteUrlPages()
+            instance.items('person')
+            self.assertNotIn('page', http_call.call_args[1])
+            instance = AutocompleteUrlPages(cursor=instance.next_cursor)
+            instance.items('person')
+        self.assertEqual(http_call.call_args[1]['page'], 2)
+
+    def test_no_pagination(self):
+        with mock.patch.object(
+                AutocompleteUrlSimple, 'http_call',
+                return_value={'data': [], 'next_page': 2}):
+            instance = AutocompleteUrlSimple()
+            instance.items('person')
+            self.assertIsNone(instance.next_cursor)
+            instance = AutocompleteUrlSimple(cursor=encode_cursor(2))
+            with self.assertRaises(InvalidCursor):
+                instance.items('person')
+
+
+@override_settings(AGNOCOMPLETE_DEFAULT_PAGESIZE=2)
+class PaginationViewTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            get_namespace() + ':agnocomplete', args=['AutocompletePerson'])
+
+    def test_next(self):
+        response = self.client.get(self.url, data={'q': 'ali'})
+        data = get_json(response, None)
+        self.assertEqual(len(data['data']), 2)
+        self.assertIsNotNone(data['next'])
+        response = self.client.get(
+            self.url, data={'q': 'ali', 'cursor': data['next']})
+        following = get_json(response, None)
+        self.assertEqual(len(following['data']), 2)
+        self.assertNotEqual(following['data'], data['data'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            self.url, data={'q': 'ali', 'cursor': 'MEUH'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_async_view(self):
+        url = reverse('async-agnocomplete', args=['AutocompletePerson'])
+        data = get_json(self.client.get(url, data={'q': 'ali'}), None)
+        self.assertIsNotNone(data['next'])
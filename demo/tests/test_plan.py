@@ -0,0 +1,88 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.test import TestCase, override_settings
+
+import mock
+
+from agnocomplete import register
+from agnocomplete.core import AgnocompleteModel, load_settings_sizes
+from agnocomplete.plan import QueryPlan
+
+from ..autocomplete import AutocompletePerson, AutocompletePersonDomain
+from ..models import Person
+
+
+class AutocompletePersonTypo(AgnocompleteModel):
+    model = Person
+    fields = ['first_name', '^lastname']
+
+
+class AutocompletePersonRelated(AgnocompleteModel):
+    model = Person
+    fields = ['first_name', 'email__unaccent']
+
+
+class AutocompletePersonCustomFilter(AutocompletePerson):
+
+    def _construct_qs_filter(self, field_name):
+        return "%s__iexact" % field_name
+
+
+class QueryPlanTest(TestCase):
+
+    def test_filters(self):
+        plan = QueryPlan(['name', '^last_name', '=first_name', '@bio'])
+        self.assertEqual(plan.filter_keys, (
+            'name__icontains', 'last_name__istartswith',
+            'first_name__iexact', 'bio__search',
+        ))
+        conditions = plan.get_filters('ali')
+        self.assertEqual(conditions.connector, Q.OR)
+        self.assertIn(('last_name__istartswith', 'ali'), conditions.children)
+
+    def test_immutable(self):
+        plan = QueryPlan(['name'])
+        with self.assertRaises(AttributeError):
+            plan.filter_keys = ()
+
+    def test_cached(self):
+        plan = AutocompletePerson.get_query_plan()
+        self.assertIs(AutocompletePerson.get_query_plan(), plan)
+        with override_settings(AGNOCOMPLETE_DEFAULT_PAGESIZE=5):
+            self.assertIsNot(AutocompletePerson.get_query_plan(), plan)
+
+    def test_same_filters(self):
+        instance = AutocompletePersonDomain()
+        self.assertEqual(
+            str(Person.objects.filter(instance.get_queryset_filters('ali'))
+                .query),
+            str(Person.objects.filter(
+                Q(first_name__icontains='ali')
+                | Q(last_name__icontains='ali')).query))
+
+    def test_instance_fields(self):
+        instance = AutocompletePerson()
+        instance.fields = ['^last_name']
+        self.assertEqual(
+            instance.get_queryset_filters('ali'),
+            Q(last_name__istartswith='ali'))
+
+    def test_overridden_filter(self):
+        self.assertIsNone(AutocompletePersonCustomFilter.get_query_plan())
+        conditions = AutocompletePersonCustomFilter().get_queryset_filters(
+            'ali')
+        self.assertIn(('first_name__iexact', 'ali'), conditions.children)
+
+    def test_misconfigured(self):
+        with self.assertRaises(ImproperlyConfigured):
+            AutocompletePersonTypo.compile()
+        with mock.patch.dict(register.AGNOCOMPLETE_REGISTRY, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                register.register(AutocompletePersonTypo)
+        # Transforms are accepted
+        AutocompletePersonRelated.compile()
+
+    def test_settings_sizes(self):
+        self.assertIs(load_settings_sizes(), load_settings_sizes())
+        with override_settings(AGNOCOMPLETE_DEFAULT_PAGESIZE=5):
+            self.assertEqual(load_settings_sizes()[0], 5)
@@ -0,0 +1,115 @@
+from django import forms
+from django.test import TestCase
+
+import mock
+
+from agnocomplete import fields
+from agnocomplete.forms import (
+    SelectedPrefetchFormMixin,
+    SelectedPrefetchFormSetMixin,
+)
+
+from ..autocomplete import AutocompleteColor, AutocompletePerson
+from ..models import Tag
+from . import LoaddataTestCase
+
+
+class PeopleForm(forms.Form):
+    color = fields.AgnocompleteField(AutocompleteColor, required=False)
+    first = fields.AgnocompleteModelField(AutocompletePerson, required=False)
+    second = fields.AgnocompleteModelField(AutocompletePerson, required=False)
+    others = fields.AgnocompleteModelMultipleField(
+        AutocompletePerson, required=False)
+
+
+class PrefetchPeopleForm(SelectedPrefetchFormMixin, PeopleForm):
+    pass
+
+
+class PrefetchFormSet(SelectedPrefetchFormSetMixin, forms.BaseFormSet):
+    pass
+
+
+class SelectedPrefetchTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = {
+            'color': 'green',
+            'first': '1',
+            'second': '3',
+            'others': ['2', '3'],
+        }
+
+    def get_form(self, form_class, **kwargs):
+        form = form_class(data=self.data, **kwargs)
+        # Validation queries aside
+        self.assertTrue(form.is_valid())
+        return form
+
+    def test_form(self):
+        form = self.get_form(PeopleForm)
+        with self.assertNumQueries(3):
+            expected = str(form)
+        form = self.get_form(PrefetchPeopleForm)
+        with self.assertNumQueries(1):
+            rendered = str(form)
+        self.assertEqual(rendered, expected)
+        self.assertIn('Bob Hope', rendered)
+
+    def test_selected_calls(self):
+        with mock.patch.object(
+                AutocompletePerson, 'selected',
+                autospec=True, side_effect=AutocompletePerson.selected) as sel:
+            str(self.get_form(PrefetchPeopleForm))
+        self.assertEqual(sel.call_count, 1)
+        self.assertEqual(sel.call_args[0][1], {'1', '2', '3'})
+
+    def test_initial(self):
+        form = PrefetchPeopleForm(initial={'first': 1})
+        with self.assertNumQueries(1):
+            rendered = str(form)
+        self.assertEqual(rendered, str(PeopleForm(initial={'first': 1})))
+
+    def test_empty(self):
+        with self.assertNumQueries(0):
+            str(PrefetchPeopleForm())
+
+    def test_other_value(self):
+        form = self.get_form(PrefetchPeopleForm)
+        widget = form.fields['first'].widget
+        with self.assertNumQueries(2):
+            rendered = widget.render('first', '4')
+        self.assertIn('value="4"', rendered)
+
+    def test_shared(self):
+        first = self.get_form(PrefetchPeopleForm)
+        self.data = {'first': '4'}
+        second = self.get_form(
+            PrefetchPeopleForm, selected_prefetcher=first.selected_prefetcher)
+        with self.assertNumQueries(1):
+            str(second)
+            str(first)
+
+    def test_formset(self):
+        FormSet = forms.formset_factory(
+            PeopleForm, formset=PrefetchFormSet, extra=0)
+        initial = [{'first': pk, 'others': [pk, 3]} for pk in (1, 2, 4, 5)]
+        formset = FormSet(initial=initial)
+        with self.assertNumQueries(1):
+            rendered = str(formset)
+        for pk in (1, 2, 4, 5):
+            self.assertIn('value="{}" selected'.format(pk), rendered)
+
+
+class SelectedPrefetchKeyTest(TestCase):
+
+    def test_key(self):
+        self.assertIsNone(AutocompleteColor().get_selected_prefetch_key())
+        self.assertEqual(
+            AutocompletePerson().get_selected_prefetch_key(),
+            (AutocompletePerson, None, 'pk'))
+        tag = Tag.objects.create(name='tag')
+        self.assertEqual(
+            AutocompletePerson(user=tag).get_selected_prefetch_key(),
+            (AutocompletePerson, tag.pk, 'pk'))
@@ -0,0 +1,230 @@
+from io import StringIO
+import json
+import os
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import cache, get_namespace, register
+from agnocomplete.cache import LRUCache
+from agnocomplete.register import (
+    AgnocompleteRegistry,
+    get_agnocomplete_registry,
+)
+
+from ..autocomplete import (
+    AutocompleteColor,
+    AutocompletePerson,
+    AutocompletePersonDomain,
+    AutocompleteUrlSimple,
+)
+from ..models import Person
+from . import get_json
+
+
+class AutocompletePersonCachedLazy(AutocompletePerson):
+    cache_backend = LRUCache(maxsize=10)
+
+
+class RegistryTest(TestCase):
+
+    def test_frozen(self):
+        registry = get_agnocomplete_registry()
+        self.assertTrue(registry.frozen)
+        self.assertIs(registry['AutocompleteColor'], AutocompleteColor)
+        self.assertEqual(registry.slugs, tuple(registry))
+        self.assertIs(registry.metadata, registry.metadata)
+
+    def test_late_registration(self):
+        registry = AgnocompleteRegistry()
+        registry.register(AutocompleteColor)
+        registry.freeze()
+        with self.assertLogs('agnocomplete.register', 'WARNING'):
+            registry.register(AutocompletePerson)
+        self.assertEqual(
+            registry.slugs, ('AutocompleteColor', 'AutocompletePerson'))
+
+    def test_version(self):
+        registry = AgnocompleteRegistry(AutocompleteColor=AutocompleteColor)
+        version = registry.version
+        self.assertEqual(
+            AgnocompleteRegistry(AutocompleteColor=AutocompleteColor).version,
+            version)
+        # Modifying the registry changes its version
+        registry['AutocompletePerson'] = AutocompletePerson
+        self.assertNotEqual(registry.version, version)
+        del registry['AutocompletePerson']
+        self.assertEqual(registry.version, version)
+        with mock.patch.object(AutocompleteColor, 'page_size', 3):
+            registry.clear_compiled()
+            self.assertNotEqual(registry.version, version)
+        registry.clear()
+        self.assertEqual(registry.slugs, ())
+
+    def test_settings_changed(self):
+        registry = get_agnocomplete_registry()
+        version = registry.version
+        with override_settings(AGNOCOMPLETE_DEFAULT_PAGESIZE=3):
+            self.assertNotEqual(registry.version, version)
+            self.assertEqual(
+                registry.metadata['AutocompleteColor']['page_size'], 3)
+        self.assertEqual(registry.version, version)
+
+    def test_metadata(self):
+        metadata = get_agnocomplete_registry().metadata
+        self.assertEqual(metadata['AutocompleteColor']['kind'], 'choices')
+        self.assertFalse(metadata['AutocompleteColor']['client_side'])
+        self.assertEqual(
+            metadata['AutocompleteColor']['url'],
+            reverse(
+                get_namespace() + ':agnocomplete',
+                args=['AutocompleteColor']))
+        person = metadata['AutocompletePerson']
+        self.assertEqual(person['kind'], 'model')
+        self.assertEqual(person['model'], 'demo.Person')
+        self.assertEqual(person['fields'], AutocompletePerson.fields)
+        self.assertFalse(person['requires_authentication'])
+        self.assertTrue(
+            metadata[AutocompletePersonDomain.slug]['requires_authentication'])
+        self.assertEqual(
+            metadata[AutocompleteUrlSimple.slug]['kind'], 'url-proxy')
+
+
+class CatalogTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(get_namespace() + ':catalog')
+        self.registry = get_agnocomplete_registry()
+
+    def test_catalog(self):
+        response = self.client.get(self.url)
+        data = get_json(response, None)
+        self.assertEqual(data['data'], list(self.registry.slugs))
+        self.assertEqual(data['version'], self.registry.version)
+        self.assertEqual(
+            data['metadata']['AutocompletePerson']['model'], 'demo.Person')
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with mock.patch.object(
+                AgnocompleteRegistry, 'metadata',
+                new_callable=mock.PropertyMock) as metadata:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(metadata.called)
+
+
+class LazyRegistryTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.registry = AgnocompleteRegistry()
+        self.registry.add_lazy({
+            'AutocompleteColor': 'demo.autocomplete.AutocompleteColor',
+            'AutocompletePerson': 'demo.autocomplete.AutocompletePerson',
+        })
+        self.registry.freeze()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'registry.json')
+
+    def test_lookup(self):
+        self.assertIn('AutocompleteColor', self.registry)
+        self.assertNotIn('MEUH', self.registry)
+        self.assertIsNone(self.registry.get('MEUH'))
+        with mock.patch.object(
+                register, 'import_string',
+                side_effect=register.import_string) as import_string:
+            self.assertIs(
+                self.registry['AutocompleteColor'], AutocompleteColor)
+            self.assertIs(
+                self.registry.get('AutocompleteColor'), AutocompleteColor)
+        import_string.assert_called_once_with(
+            'demo.autocomplete.AutocompleteColor')
+        self.assertEqual(list(self.registry.lazy), ['AutocompletePerson'])
+        with self.assertRaises(KeyError):
+            self.registry['MEUH']
+
+    def test_listing(self):
+        self.assertEqual(
+            sorted(self.registry.keys()),
+            ['AutocompleteColor', 'AutocompletePerson'])
+        self.assertEqual(self.registry.lazy, {})
+        self.assertEqual(
+            self.registry.metadata['AutocompletePerson']['kind'], 'model')
+
+    def test_outdated(self):
+        self.registry.add_lazy({'Gone': 'demo.autocomplete.Gone'})
+        with self.assertRaises(ImproperlyConfigured):
+            self.registry['Gone']
+
+    def test_build_manifest(self):
+        with self.assertRaises(CommandError):
+            call_command('agnocomplete_build_registry_manifest')
+        watched = {AutocompletePerson: {'demo.person', 'demo.tag'}}
+        with mock.patch.dict(cache._cache_invalidation_models, watched):
+            call_command(
+                'agnocomplete_build_registry_manifest', output=self.path,
+                stdout=StringIO())
+        with open(self.path) as fd:
+            manifest = json.load(fd)
+        self.assertEqual(
+            sorted(manifest['classes']), sorted(get_agnocomplete_registry()))
+        self.assertEqual(
+            manifest['classes']['AutocompleteColor'],
+            'demo.autocomplete.AutocompleteColor')
+        self.assertEqual(
+            manifest['cache_invalidation'],
+            {'AutocompletePerson': ['demo.person', 'demo.tag']})
+
+    def test_ready(self):
+        slug = 'AutocompletePersonCachedLazy'
+        with open(self.path, 'w') as fd:
+            json.dump({
+                'classes': {
+                    'AutocompleteColor': 'demo.autocomplete.AutocompleteColor',
+                    slug: 'demo.tests.test_registry.' + slug,
+                },
+                'cache_invalidation': {slug: ['demo.person']},
+            }, fd)
+        dispatch_uid = 'agnocomplete-cache-{}-demo.person'.format(slug)
+        for signal in (post_save, post_delete):
+            self.addCleanup(
+                signal.disconnect, sender=Person, dispatch_uid=dispatch_uid)
+        registry = AgnocompleteRegistry()
+        config = apps.get_app_config('agnocomplete')
+        with mock.patch.object(register, 'AGNOCOMPLETE_REGISTRY', registry), \
+                mock.patch('agnocomplete.autodiscover') as autodiscover:
+            with override_settings(AGNOCOMPLETE_REGISTRY_MANIFEST=self.path):
+                config.ready()
+            self.assertFalse(autodiscover.called)
+            self.assertTrue(registry.frozen)
+            self.assertEqual(
+                sorted(registry.lazy), ['AutocompleteColor', slug])
+            # Saving a watched model imports the class and invalidates it
+            with mock.patch.object(
+                    AutocompletePersonCachedLazy,
+                    'invalidate_cache') as invalidate_cache:
+                Person.objects.create(
+                    first_name='Lazy', last_name='Person',
+                    email='lazy@example.com')
+            self.assertEqual(invalidate_cache.call_count, 1)
+            self.assertEqual(registry.lazy, {
+                'AutocompleteColor': 'demo.autocomplete.AutocompleteColor'})
+            # Missing manifest
+            with override_settings(
+                    AGNOCOMPLETE_REGISTRY_MANIFEST=self.path + '.missing'):
+                with self.assertLogs('agnocomplete.apps', 'WARNING'):
+                    config.ready()
+            self.assertTrue(autodiscover.called)
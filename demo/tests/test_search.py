@@ -0,0 +1,161 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.db import connection
+from django.db.models import Q
+from django.test import override_settings
+
+import mock
+
+from agnocomplete.management.commands.agnocomplete_create_indexes import (
+    Command,
+)
+from agnocomplete.search import (
+    FullTextSearchBackend,
+    QSearchBackend,
+    SearchBackend,
+    TrigramSearchBackend,
+    UpperTrigramIndex,
+    get_search_backend,
+    split_field_name,
+)
+
+from ..autocomplete import AutocompletePerson
+from ..models import Person
+from . import LoaddataTestCase
+
+
+class AutocompletePersonTrigram(AutocompletePerson):
+    search_backend = TrigramSearchBackend
+
+
+class AutocompletePersonFullText(AutocompletePerson):
+    search_backend = 'agnocomplete.search.FullTextSearchBackend'
+
+
+class CustomSearchBackend(SearchBackend):
+    def filter(self, agnocomplete, queryset, query):
+        return queryset.filter(email__istartswith=query)
+
+
+class SearchBackendTest(TestCase):
+
+    def test_split_field_name(self):
+        self.assertEqual(
+            split_field_name('name'), ('icontains', 'name'))
+        self.assertEqual(
+            split_field_name('^name'), ('istartswith', 'name'))
+        self.assertEqual(split_field_name('=name'), ('iexact', 'name'))
+        self.assertEqual(split_field_name('@name'), ('search', 'name'))
+
+    def test_get_search_backend(self):
+        backend = QSearchBackend()
+        self.assertIs(get_search_backend(backend), backend)
+        self.assertIsInstance(
+            get_search_backend(TrigramSearchBackend), TrigramSearchBackend)
+        self.assertIsInstance(
+            get_search_backend('agnocomplete.search.FullTextSearchBackend'),
+            FullTextSearchBackend)
+
+    def test_default(self):
+        self.assertIsInstance(
+            AutocompletePerson.get_search_backend(), QSearchBackend)
+
+    @override_settings(
+        AGNOCOMPLETE_SEARCH_BACKEND='agnocomplete.search.TrigramSearchBackend'
+    )
+    def test_settings(self):
+        self.assertIsInstance(
+            AutocompletePerson.get_search_backend(), TrigramSearchBackend)
+
+    def test_trigram_queryset(self):
+        qs = AutocompletePersonTrigram().build_filtered_queryset('ali')
+        self.assertIn('agnocomplete_rank', qs.query.annotations)
+        self.assertEqual(qs.query.order_by, ('-agnocomplete_rank',))
+
+    def test_fulltext_queryset(self):
+        instance = AutocompletePersonFullText()
+        search_query = FullTextSearchBackend().get_search_query('ali  ba')
+        self.assertEqual(
+            search_query.source_expressions[-1].value, 'ali:* & ba:*')
+        # No word, no result
+        self.assertIsNone(
+            FullTextSearchBackend().get_search_query(' & !'))
+        self.assertFalse(instance.build_filtered_queryset(' & !').exists())
+
+    def test_trigram_indexes(self):
+        indexes = TrigramSearchBackend().get_indexes(
+            Person, ['first_name', '^last_name', 'tags__name'])
+        # Two indexes per local field
+        self.assertEqual(len(indexes), 4)
+        for index in indexes:
+            self.assertIsInstance(index, GinIndex)
+            self.assertLessEqual(len(index.name), 30)
+        # Names are deterministic
+        self.assertEqual(
+            [index.name for index in indexes],
+            [index.name for index in TrigramSearchBackend().get_indexes(
+                Person, ['first_name', 'last_name'])])
+
+    def test_trigram_old_django(self):
+        backend = TrigramSearchBackend()
+        with mock.patch('django.VERSION', (3, 2, 0, 'final', 0)):
+            with self.assertRaises(ImproperlyConfigured):
+                backend.get_similar_filter('first_name', 'ali')
+            with mock.patch(
+                    'agnocomplete.search.apps.is_installed',
+                    return_value=True):
+                self.assertEqual(
+                    backend.get_similar_filter('first_name', 'ali'),
+                    Q(first_name__trigram_similar='ali'))
+            indexes = backend.get_indexes(Person, ['first_name'])
+        self.assertIsInstance(indexes[1], UpperTrigramIndex)
+        editor = mock.Mock(quote_name=connection.ops.quote_name)
+        sql = indexes[1].create_sql(Person, editor, concurrently=True)
+        self.assertEqual(
+            sql,
+            'CREATE INDEX CONCURRENTLY "{}" ON "demo_person"'
+            ' USING gin (UPPER("first_name") gin_trgm_ops)'.format(
+                indexes[1].name))
+
+    def test_fulltext_indexes(self):
+        indexes = FullTextSearchBackend().get_indexes(
+            Person, ['first_name', 'last_name'])
+        self.assertEqual(len(indexes), 1)
+        # Fields spanning relations can't be indexed
+        self.assertEqual(
+            FullTextSearchBackend().get_indexes(
+                Person, ['first_name', 'tags__name']),
+            [])
+        with mock.patch('django.VERSION', (3, 1, 0, 'final', 0)):
+            with self.assertRaises(ImproperlyConfigured):
+                FullTextSearchBackend().get_indexes(
+                    Person, ['first_name'])
+
+
+class CustomSearchBackendTest(LoaddataTestCase):
+
+    def test_filter(self):
+        with mock.patch.object(
+                AutocompletePerson, 'search_backend', CustomSearchBackend):
+            items = AutocompletePerson().items(query='alice3')
+        self.assertEqual(len(items), 1)
+
+
+class CreateIndexesCommandTest(TestCase):
+
+    def test_not_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('agnocomplete_create_indexes', '--dry-run')
+
+    def test_get_indexes(self):
+        # Default search backend, no index
+        self.assertEqual(Command().get_indexes(), ([], []))
+        with mock.patch.object(
+                AutocompletePerson, 'search_backend', TrigramSearchBackend):
+            indexes, extensions = Command().get_indexes()
+        # Subclasses sharing the same fields share the same indexes
+        self.assertEqual(len(indexes), 4)
+        self.assertEqual(extensions, ['pg_trgm'])
@@ -0,0 +1,237 @@
+from threading import Barrier, Event, Thread
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+import mock
+
+from agnocomplete.cache import LRUCache
+from agnocomplete.singleflight import (
+    AsyncSingleFlight,
+    CacheSingleFlight,
+    SingleFlight,
+)
+
+from ..autocomplete import AutocompletePersonDomain, AutocompleteUrlSimple
+
+
+class AutocompleteUrlCoalesced(AutocompleteUrlSimple):
+    single_flight = True
+
+
+class AutocompleteUrlCoalescedCache(AutocompleteUrlCoalesced):
+    single_flight_cache = LRUCache()
+
+
+def run_concurrently(func, count):
+    """
+    Call ``func()`` in ``count`` threads at once and return the results.
+    """
+    barrier = Barrier(count)
+    results = [None] * count
+
+    def target(index):
+        barrier.wait()
+        results[index] = func()
+
+    threads = [Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightTest(SimpleTestCase):
+
+    def test_coalesce(self):
+        group = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return ['result']
+
+        results = run_concurrently(lambda: group.do('key', compute), 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['result']] * 5)
+        self.assertEqual(len(group), 0)
+
+    def test_sequential(self):
+        group = SingleFlight()
+        calls = []
+        group.do('key', lambda: calls.append(1))
+        group.do('key', lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+    def test_error(self):
+        group = SingleFlight()
+        started = Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('MEUH')
+
+        def follower():
+            started.wait()
+            try:
+                group.do('key', lambda: 'unused')
+            except ValueError as exc:
+                errors.append(exc)
+
+        thread = Thread(target=follower)
+        thread.start()
+        with self.assertRaises(ValueError):
+            group.do('key', fail)
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(group), 0)
+
+
+class AsyncSingleFlightTest(SimpleTestCase):
+
+    def test_coalesce(self):
+        group = AsyncSingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            return await asyncio.gather(
+                *(group.do('key', compute) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ['result'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(group), 0)
+
+    def test_leader_cancelled(self):
+        group = AsyncSingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            leader = asyncio.ensure_future(group.do('key', compute))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(group.do('key', compute))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            result = await follower
+            self.assertTrue(leader.cancelled())
+            return result
+
+        self.assertEqual(asyncio.run(main()), 'result')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(group), 0)
+
+    def test_failure(self):
+        group = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+        async def main():
+            return await asyncio.gather(
+                *(group.do('key', fail) for _ in range(3)),
+                return_exceptions=True)
+
+        errors = asyncio.run(main())
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+        self.assertEqual(len(group), 0)
+
+
+class CacheSingleFlightTest(SimpleTestCase):
+
+    def test_leader(self):
+        cache = LRUCache()
+        flight = CacheSingleFlight(cache, timeout=1)
+        self.assertEqual(flight.do('key', lambda: 'result'), 'result')
+        # The lock is released
+        self.assertIsNone(cache.get('key:lock'))
+
+    def test_follower(self):
+        cache = LRUCache()
+        # Another process is computing the result
+        cache.add('key:lock', 'token')
+
+        def publish():
+            time.sleep(0.1)
+            cache.set('key:token', 'shared')
+            cache.delete('key:lock')
+
+        thread = Thread(target=publish)
+        thread.start()
+        flight = CacheSingleFlight(cache, timeout=1, interval=0.01)
+        result = flight.do('key', lambda: 'computed')
+        thread.join()
+        self.assertEqual(result, 'shared')
+
+    def test_leader_failure(self):
+        cache = LRUCache()
+        cache.add('key:lock', 'token')
+
+        def release():
+            time.sleep(0.05)
+            cache.delete('key:lock')
+
+        thread = Thread(target=release)
+        thread.start()
+        flight = CacheSingleFlight(cache, timeout=1, interval=0.01)
+        result = flight.do('key', lambda: 'computed')
+        thread.join()
+        self.assertEqual(result, 'computed')
+
+    def test_timeout(self):
+        cache = LRUCache()
+        cache.add('key:lock', 'token')
+        flight = CacheSingleFlight(cache, timeout=0.05, interval=0.01)
+        self.assertEqual(flight.do('key', lambda: 'computed'), 'computed')
+
+
+class CoalescedItemsTest(SimpleTestCase):
+
+    def _slow_http_call(self, **kwargs):
+        time.sleep(0.1)
+        return {'data': [{'value': '1', 'label': 'first person'}]}
+
+    def _fetch_concurrently(self, klass, count=5):
+        with mock.patch.object(
+                AutocompleteUrlSimple, 'http_call',
+                side_effect=self._slow_http_call) as http_call:
+            results = run_concurrently(
+                lambda: klass().fetch_items(query='person'), count)
+        return http_call.call_count, results
+
+    def test_disabled(self):
+        self.assertFalse(AutocompleteUrlSimple().is_single_flight())
+        calls, _ = self._fetch_concurrently(AutocompleteUrlSimple)
+        self.assertEqual(calls, 5)
+
+    def test_coalesced(self):
+        calls, results = self._fetch_concurrently(AutocompleteUrlCoalesced)
+        self.assertEqual(calls, 1)
+        self.assertEqual(
+            results, [[{'value': '1', 'label': 'first person'}]] * 5)
+
+    def test_coalesced_cache(self):
+        calls, _ = self._fetch_concurrently(AutocompleteUrlCoalescedCache)
+        self.assertEqual(calls, 1)
+
+    @override_settings(AGNOCOMPLETE_SINGLE_FLIGHT=True)
+    def test_settings(self):
+        self.assertTrue(AutocompleteUrlSimple().is_single_flight())
+        # User-dependent requests are never coalesced
+        self.assertFalse(AutocompletePersonDomain().is_single_flight())
@@ -0,0 +1,109 @@
+import json
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import mock
+
+from agnocomplete import get_namespace
+from agnocomplete.signals import agnocomplete_request_finished
+
+from ..autocomplete import AutocompletePerson
+from . import LoaddataTestCase, get_json
+
+
+class AutocompletePersonValues(AutocompletePerson):
+    page_size = 2
+    page_size_min = 2
+    label_fields = ['first_name', 'last_name']
+
+
+def get_streamed_json(response):
+    return json.loads(b''.join(response.streaming_content).decode())
+
+
+class IterItemsTest(LoaddataTestCase):
+
+    def test_same_items(self):
+        for klass in (AutocompletePerson, AutocompletePersonValues):
+            instance = klass()
+            items = list(instance.iter_items('ali'))
+            reference = klass()
+            self.assertEqual(items, reference.items('ali'))
+            self.assertEqual(instance.next_cursor, reference.next_cursor)
+
+    def test_lazy(self):
+        instance = AutocompletePerson()
+        with CaptureQueriesContext(connection) as queries:
+            items = instance.iter_items('ali')
+            self.assertEqual(len(queries), 0)
+            next(items)
+        self.assertEqual(len(queries), 1)
+
+    def test_invalid_query(self):
+        self.assertEqual(list(AutocompletePerson().iter_items('a')), [])
+
+
+@override_settings(AGNOCOMPLETE_STREAMING=True)
+class StreamingViewTest(LoaddataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse(
+            get_namespace() + ':agnocomplete', args=['AutocompletePerson'])
+
+    def test_payload(self):
+        response = self.client.get(self.url, data={'q': 'ali'})
+        self.assertTrue(response.streaming)
+        data = get_streamed_json(response)
+        with override_settings(AGNOCOMPLETE_STREAMING=False):
+            expected = get_json(
+                self.client.get(self.url, data={'q': 'ali'}), None)
+        self.assertEqual(data, expected)
+
+    @override_settings(AGNOCOMPLETE_STREAMING_CHUNK_SIZE=2)
+    def test_chunks(self):
+        response = self.client.get(self.url, data={'q': 'ali'})
+        chunks = list(response.streaming_content)
+        # 2 chunks of 2 items, then the end of the payload
+        self.assertEqual(len(chunks), 3)
+        data = json.loads(b''.join(chunks).decode())
+        self.assertEqual(len(data['data']), 4)
+
+    def test_empty(self):
+        response = self.client.get(self.url, data={'q': ''})
+        self.assertEqual(
+            get_streamed_json(response), {'data': [], 'next': None})
+
+    def test_errors(self):
+        url = reverse(get_namespace() + ':agnocomplete', args=['MEUH'])
+        response = self.client.get(url, data={'q': 'ali'})
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.status_code, 404)
+        url = reverse(
+            get_namespace() + ':agnocomplete',
+            args=['AutocompletePersonDomain'])
+        response = self.client.get(url, data={'q': 'ali'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_catalog(self):
+        response = self.client.get(reverse(get_namespace() + ':catalog'))
+        data = get_streamed_json(response)
+        self.assertIn('AutocompletePerson', data['data'])
+
+    def test_instrumentation(self):
+        finished = mock.Mock()
+        agnocomplete_request_finished.connect(finished)
+        try:
+            response = self.client.get(self.url, data={'q': 'ali'})
+            self.assertFalse(finished.called)
+            get_streamed_json(response)
+        finally:
+            agnocomplete_request_finished.disconnect(finished)
+        self.assertEqual(finished.call_count, 1)
+        kwargs = finished.call_args[1]
+        self.assertEqual(kwargs['status'], 200)
+        self.assertEqual(kwargs['count'], 4)
+        self.assertIn('total', kwargs['timings'])
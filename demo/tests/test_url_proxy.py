@@ -1,8 +1,9 @@
 """
 Tests for URL Proxy views
 """
-from django.test import LiveServerTestCase
+from django.test import TestCase
 from django.test import override_settings
+from django.urls import reverse
 from django.utils.encoding import force_str as text
 
 import mock
@@ -21,7 +22,9 @@ from ..autocomplete import (
     AutocompleteUrlSimpleWithExtra,
     AutocompleteUrlSkipItem,
 )
+from agnocomplete.core import AgnocompleteUrlProxy
 from .. import DATABASE, GOODAUTHTOKEN
+from . import LiveServerTestCase
 RESULT_DICT = [{'value': text(item['pk']), 'label': text(item['name'])} for item in DATABASE]  # noqa
 
 
@@ -315,3 +318,98 @@ class AutocompleteUrlSkipItemTest(LiveServerTestCase):
                     {"value": '7', 'label': 'seventh person'}
                 ],
             )
+
+
+class AutocompleteUrlPool(AgnocompleteUrlProxy):
+    http_pool_maxsize = 42
+    http_max_retries = 3
+
+
+class HTTPSessionTest(TestCase):
+
+    def test_shared_session(self):
+        session = AutocompleteUrlSimple.get_http_session()
+        self.assertIs(AutocompleteUrlSimple().get_http_session(), session)
+        # One session per class
+        self.assertIsNot(AutocompleteUrlConvert.get_http_session(), session)
+        instance = AutocompleteUrlSimple()
+        http_func, arg_name = instance.get_http_method_arg_name()
+        self.assertEqual(http_func, session.get)
+        self.assertEqual(arg_name, 'params')
+
+    def test_close_session(self):
+        session = AutocompleteUrlPool.get_http_session()
+        AutocompleteUrlPool.close_http_session()
+        self.assertIsNot(AutocompleteUrlPool.get_http_session(), session)
+
+    @override_settings(AGNOCOMPLETE_HTTP_POOL_CONNECTIONS=7)
+    def test_pool_configuration(self):
+        session = AutocompleteUrlPool.build_http_session()
+        adapter = session.get_adapter('https://api.example.com/')
+        self.assertEqual(adapter._pool_connections, 7)
+        self.assertEqual(adapter._pool_maxsize, 42)
+        self.assertEqual(adapter.max_retries.total, 3)
+
+    def test_no_cookies(self):
+        session = AutocompleteUrlPool.build_http_session()
+        self.assertFalse(
+            session.cookies.get_policy().set_ok_domain(
+                mock.Mock(domain='api.example.com'), mock.Mock()))
+
+
+class AutocompleteUrlBatch(AutocompleteUrlSimple):
+
+    def get_items_url(self, ids):
+        return reverse('url-proxy:items')
+
+    def get_batch_http_call_kwargs(self, ids):
+        return {'ids': ','.join(str(_id) for _id in ids)}
+
+
+@override_settings(HTTP_HOST='')
+class SelectedBatchTest(LiveServerTestCase):
+
+    def test_selected_batch(self):
+        instance = AutocompleteUrlBatch()
+        items_url = instance.get_items_url([])
+        with mock.patch.object(
+                AutocompleteUrlBatch, 'get_items_url') as mock_auto:
+            mock_auto.return_value = self.live_server_url + items_url
+            self.assertEqual(instance.selected([]), [])
+            # One single call, results in the ids order
+            with mock.patch.object(
+                    AutocompleteUrlBatch, 'http_call',
+                    wraps=instance.http_call) as http_call:
+                result = instance.selected([3, '', 1, 42])
+            self.assertEqual(http_call.call_count, 1)
+            self.assertEqual(result, [
+                ('3', 'third person'),
+                ('1', 'first person'),
+            ])
+
+    def test_selected_concurrent(self):
+        instance = AutocompleteUrlSimple()
+        get_item_url = instance.get_item_url
+        with mock.patch('demo.autocomplete.AutocompleteUrlSimple'
+                        '.get_item_url') as mock_auto:
+            mock_auto.side_effect = lambda pk: \
+                self.live_server_url + get_item_url(pk)
+            result = instance.selected([5, 2, 7, 1])
+            self.assertEqual(result, [
+                ('5', 'fifth person'),
+                ('2', 'second person'),
+                ('7', 'seventh person'),
+                ('1', 'first person'),
+            ])
+
+    @override_settings(AGNOCOMPLETE_SELECTED_CONCURRENCY=1)
+    def test_selected_sequential(self):
+        instance = AutocompleteUrlSimple()
+        self.assertEqual(instance.get_selected_concurrency(), 1)
+        with mock.patch.object(
+                AutocompleteUrlSimple, 'http_call',
+                return_value={'data': []}) as http_call:
+            with mock.patch('agnocomplete.core.ThreadPoolExecutor') as pool:
+                instance.selected([1, 2])
+        self.assertFalse(pool.called)
+        self.assertEqual(http_call.call_count, 2)
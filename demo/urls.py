@@ -6,6 +6,7 @@ from django.urls import path
 from django.contrib import admin
 
 from agnocomplete import get_namespace
+from agnocomplete.views import AsyncAgnocompleteView
 from . import views
 
 
@@ -21,6 +22,10 @@ urlpatterns = [
         )
     ),
 
+    # Asynchronous agnocomplete view
+    path('async-agnocomplete/<klass>/', AsyncAgnocompleteView.as_view(),
+         name='async-agnocomplete'),
+
     # Agnocomplete Custom view
     path(r'^hidden-autocomplete/$', views.hidden_autocomplete,
         name='hidden-autocomplete'),
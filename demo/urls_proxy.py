@@ -7,6 +7,7 @@ from . import views_proxy
 
 urlpatterns = [
     path(r'^item/(?P<pk>[0-9]+)$', views_proxy.item, name='item'),
+    path(r'^items/$', views_proxy.items, name='items'),
     path(r'^atomicitem/(?P<pk>[0-9]+)$', views_proxy.atomic_item,
         name='atomic-item'),
     path(r'^simple/$', views_proxy.simple, name='simple'),
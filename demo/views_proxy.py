@@ -182,6 +182,23 @@ def item(request, pk):
     return HttpResponse(response)
 
 
+@require_GET
+def items(request, *args, **kwargs):
+    """
+    Return several items at once, using a comma-separated list of ids.
+
+    Items are returned in the database order, not in the query order.
+    """
+    ids = request.GET.get('ids', '').split(',')
+    data = filter(lambda item: text(item['pk']) in ids, DATABASE)
+    data = map(convert_data, data)
+    logger.debug('3rd multiple items search: `%s`', ids)
+    result = {'data': list(data)}
+    response = json.dumps(result)
+    logger.debug('response: `%s`', response)
+    return HttpResponse(response)
+
+
 @require_GET
 def atomic_item(request, pk):
     """